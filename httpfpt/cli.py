@@ -8,26 +8,33 @@ from dataclasses import dataclass
 import cappa
 
 from cappa import Subcommands
-from pydantic import ValidationError
 from rich.prompt import Confirm
+from rich.table import Table
 from rich.traceback import install as rich_install
-from typing_extensions import Annotated
+from typing_extensions import Annotated, Literal
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from httpfpt import __version__
-from httpfpt.common.json_handler import read_json_file
-from httpfpt.common.yaml_handler import read_yaml
 from httpfpt.core.get_conf import httpfpt_config
 from httpfpt.core.path_conf import httpfpt_path
-from httpfpt.enums.case_data_type import CaseDataType
+from httpfpt.db.storage import storage_client
 from httpfpt.run import run
-from httpfpt.schemas.case_data import CaseData
 from httpfpt.utils.case_auto_generator import auto_generate_testcases
+from httpfpt.utils.case_data_file import case_data_file_loader
+from httpfpt.utils.case_validation import case_validation_cache
 from httpfpt.utils.data_manage.apifox import ApiFoxParser
 from httpfpt.utils.data_manage.git_repo import GitRepoPaser
 from httpfpt.utils.data_manage.openapi import SwaggerParser
-from httpfpt.utils.file_control import get_file_property, search_all_case_data_files
+from httpfpt.utils.file_control import search_all_case_data_files
+from httpfpt.utils.load_test.runner import (
+    LoadRunner,
+    OpenLoadRunner,
+    export_load_result,
+    merge_load_results,
+)
+from httpfpt.utils.load_test.schedule import ArrivalSchedule
+from httpfpt.utils.request import case_data_parse as case_data
 from httpfpt.utils.rich_console import console
 
 
@@ -39,31 +46,24 @@ def testcase_data_verify(verify: str) -> None:
         if verify.lower() == 'all':
             console.print('\n🔥 开始验证所有测试数据结构...')
             file_list = search_all_case_data_files()
-            for file in file_list:
-                file_type = get_file_property(file)[2]
-                if file_type == CaseDataType.JSON:
-                    file_data = read_json_file(file)
-                else:
-                    file_data = read_yaml(file)
-                CaseData.model_validate(file_data)
         else:
             console.print(f'🔥 开始验证 {verify} 测试数据结构...')
-            file_type = get_file_property(verify)[2]
             if os.path.isfile(verify):
-                data_path = os.path.join(httpfpt_path.case_data_dir, httpfpt_config.PROJECT_NAME)
-                if file_type == CaseDataType.JSON:
-                    file_data = read_json_file(str(data_path), verify)
-                else:
-                    file_data = read_yaml(str(data_path), verify)
+                file_list = [verify]
             else:
-                if file_type == CaseDataType.JSON:
-                    file_data = read_json_file(verify)
-                else:
-                    file_data = read_yaml(verify)
-            CaseData.model_validate(file_data)
-    except ValidationError as e:
-        count = e.error_count()
-        msg += str(e)
+                file_list = [os.path.join(httpfpt_path.case_data_dir, httpfpt_config.PROJECT_NAME, verify)]
+        passed = {}
+        failed = []
+        for file in file_list:
+            file_data, file_hash = case_data_file_loader.load(file)
+            error, error_count, validation_key = case_validation_cache.validate(file, file_data, file_hash)
+            if error is not None:
+                count += error_count
+                msg += error
+                failed.append(file)
+            elif validation_key is not None:
+                passed[file] = validation_key
+        case_validation_cache.update(passed, failed)
     except Exception as e:
         console.print(f'\n❌ 验证测试数据 {verify} 结构失败: {e}')
         raise e
@@ -153,6 +153,78 @@ def import_git_case_data(src: str) -> None:
         raise e
 
 
+def load_test(
+    target: str,
+    requests: int,
+    duration: float,
+    concurrency: int,
+    rate: str | None = None,
+    schedule: str = 'constant',
+    steps: int = 5,
+    max_in_flight: int = 0,
+    output: str | None = None,
+) -> None:
+    """压测"""
+    try:
+        # 与运行测试用例相同, 初始化存储及用例数据, 关联用例及 case_id 查找依赖此数据
+        storage_client.init()
+        case_data.case_data_init(pydantic_verify=True)
+        case_data.case_id_unique_verify()
+        case_data.case_relate_verify()
+        if rate:
+            arrival_schedule = ArrivalSchedule.parse(schedule, duration, rate, steps)
+            console.print(f'\n🔥 开始开环压测 {target}, 速率计划: {schedule} {rate} req/s...')
+            runner: LoadRunner = OpenLoadRunner(
+                target, arrival_schedule, requests=requests, max_in_flight=max_in_flight
+            )
+        else:
+            console.print(f'\n🔥 开始压测 {target}, 并发数: {concurrency}...')
+            runner = LoadRunner(target, requests=requests, duration=duration, concurrency=concurrency)
+        result = runner.run()
+    except Exception as e:
+        console.print(f'\n❌ 压测失败: {e}')
+        raise e
+    load_result_print(target, result)
+    if output:
+        export_load_result(result, output)
+        console.print(f'✅ 压测结果已导出至 {output}')
+
+
+def load_result_merge(filepaths: list[str], output: str | None = None) -> None:
+    """合并压测结果"""
+    console.print(f'\n🔥 开始合并 {len(filepaths)} 份压测结果...')
+    try:
+        result = merge_load_results(filepaths)
+    except Exception as e:
+        console.print(f'\n❌ 合并压测结果失败: {e}')
+        raise e
+    load_result_print('合并结果', result)
+    if output:
+        export_load_result(result, output)
+        console.print(f'✅ 合并结果已导出至 {output}')
+
+
+def load_result_print(target: str, result: dict) -> None:
+    """打印压测结果"""
+    table = Table(title=f'压测结果: {target}')
+    table.add_column('指标')
+    table.add_column('结果', justify='right')
+    table.add_row('请求总数', str(result['total']))
+    table.add_row('成功数', str(result['success']))
+    table.add_row('错误数', str(result['errors']))
+    table.add_row('错误率', f'{result["error_rate"]} %')
+    table.add_row('跳过数', str(result['skipped']))
+    table.add_row('持续时间', f'{result["duration"]} s')
+    table.add_row('吞吐量', f'{result["throughput"]} req/s')
+    for k, v in result['latency'].items():
+        table.add_row(f'延迟 {k}', f'{v} ms')
+    if 'schedule' in result:
+        table.add_row('发送端最大滞后', f'{result["schedule"]["max_lag"]} ms')
+    console.print(table)
+    for err_msg, count in result['error_detail'].items():
+        console.print(f'❌ [{count}] {err_msg}')
+
+
 @cappa.command(name='httpfpt-cli')
 @dataclass
 class HttpFptCLI:
@@ -169,7 +241,7 @@ class HttpFptCLI:
             num_args=-1,
         ),
     ]
-    subcmd: Subcommands[TestCaseCLI | ImportCLI | None] = None
+    subcmd: Subcommands[TestCaseCLI | ImportCLI | LoadCLI | None] = None
 
     def __call__(self) -> None:
         if self.run_test is not None:
@@ -298,6 +370,136 @@ class ImportCLI:
             import_git_case_data(self.git)
 
 
+@cappa.command(name='load', help='Load test tools.')
+@dataclass
+class LoadCLI:
+    target: Annotated[
+        str,
+        cappa.Arg(
+            value_name='<FILENAME / CASE_ID>',
+            short='-t',
+            long=True,
+            default='',
+            help='压测目标; 指定数据文件（文件名/绝对路径）时, 轮流压测文件中所有用例, 指定 case_id 时仅压测此用例.',
+            required=False,
+        ),
+    ]
+    requests: Annotated[
+        int,
+        cappa.Arg(
+            short='-n',
+            long=True,
+            default=0,
+            help='请求总数.',
+            required=False,
+        ),
+    ]
+    duration: Annotated[
+        float,
+        cappa.Arg(
+            short='-d',
+            long=True,
+            default=0,
+            help='压测持续时间（秒）, 与请求总数同时指定时, 以先达到者为准.',
+            required=False,
+        ),
+    ]
+    concurrency: Annotated[
+        int,
+        cappa.Arg(
+            short='-c',
+            long=True,
+            default=1,
+            help='并发数.',
+            required=False,
+        ),
+    ]
+    rate: Annotated[
+        str | None,
+        cappa.Arg(
+            value_name='<RATE / START:END>',
+            short='-r',
+            long=True,
+            default=None,
+            help='开环压测请求速率（次/秒）, 指定后按速率计划发送请求, 不受并发数限制, 需指定持续时间.',
+            required=False,
+        ),
+    ]
+    schedule: Annotated[
+        Literal['constant', 'ramp', 'step'],
+        cappa.Arg(
+            short='-s',
+            long=True,
+            default='constant',
+            help='开环压测速率计划, ramp / step 需以 START:END 格式指定请求速率.',
+            required=False,
+        ),
+    ]
+    steps: Annotated[
+        int,
+        cappa.Arg(
+            long=True,
+            default=5,
+            help='step 速率计划的阶梯数.',
+            required=False,
+        ),
+    ]
+    max_in_flight: Annotated[
+        int,
+        cappa.Arg(
+            long=True,
+            default=0,
+            help='开环压测最大在途请求数, 0 为不限制, 排队时间计入延迟.',
+            required=False,
+        ),
+    ]
+    output: Annotated[
+        str | None,
+        cappa.Arg(
+            value_name='<FILEPATH>',
+            short='-o',
+            long=True,
+            default=None,
+            help='导出压测结果（含延迟直方图）至 json 文件.',
+            required=False,
+        ),
+    ]
+    merge: Annotated[
+        list[str] | None,
+        cappa.Arg(
+            value_name='<FILEPATH>',
+            short='-m',
+            long=True,
+            default=None,
+            help='合并多份导出的压测结果, 不能与压测目标同时使用.',
+            num_args=-1,
+            required=False,
+        ),
+    ]
+
+    def __call__(self) -> None:
+        if self.target and self.merge:
+            console.print('\n❌ 不支持 -t/--target 命令与 -m/--merge 命令同时使用')
+            raise cappa.Exit(code=1)
+        if not self.target and not self.merge:
+            console.print('\n❌ 请指定压测目标 -t/--target 或需合并的压测结果 -m/--merge')
+            raise cappa.Exit(code=1)
+        if self.merge:
+            load_result_merge(self.merge, self.output)
+        else:
+            load_test(
+                self.target,
+                self.requests,
+                self.duration,
+                self.concurrency,
+                self.rate,
+                self.schedule,
+                self.steps,
+                self.max_in_flight,
+                self.output,
+            )
+
+
 def main() -> None:
     """cli 执行程序"""
     rich_install()
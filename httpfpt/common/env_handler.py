@@ -2,19 +2,26 @@ import os
 
 import dotenv
 
+from httpfpt.common.file_cache import FileCache
 from httpfpt.common.log import log
 
 
+def _load_env_dict(filepath: str) -> dict:
+    dotenv.find_dotenv(filepath, raise_error_if_not_found=True)
+    return dict(dotenv.dotenv_values(filepath))
+
+
+_env_cache = FileCache(_load_env_dict)
+
+
 def get_env_dict(filepath: str) -> dict:
     """
-    获取 env 字典信息
+    获取 env 字典信息, 文件未变更时使用缓存
 
     :param filepath:
     :return:
     """
-    dotenv.find_dotenv(filepath, raise_error_if_not_found=True)
-    env_dict = dict(dotenv.dotenv_values(filepath))
-    return env_dict
+    return dict(_env_cache.get(filepath))
 
 
 def write_env_vars(filepath: str, filename: str, key: str, value: str) -> None:
@@ -36,3 +43,5 @@ def write_env_vars(filepath: str, filename: str, key: str, value: str) -> None:
         raise e
     else:
         log.info(f'写入环境变量成功: {filename} -> {key_upper}={value}')
+    finally:
+        _env_cache.invalidate(_file)
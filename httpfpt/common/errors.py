@@ -76,3 +76,10 @@ class AssertError(HttpFptErrorMixin, AssertionError):
 
     def __init__(self, msg: str) -> None:
         super().__init__(msg)
+
+
+class HookError(HttpFptErrorMixin, ValueError):
+    """hook函数错误"""
+
+    def __init__(self, msg: str) -> None:
+        super().__init__(msg)
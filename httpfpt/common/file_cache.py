@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from typing import Any, Callable
+
+
+class FileCache:
+    """
+    文件内容缓存
+
+    通过文件 mtime 与 size 判断文件是否变更, 未变更时直接返回缓存内容; 框架内写入文件后应主动调用 invalidate,
+    避免同一时间戳内写入且大小不变时读取到旧内容
+    """
+
+    def __init__(self, loader: Callable[[str], Any]) -> None:
+        self._loader = loader
+        self._cache: dict[str, tuple[int, int, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str) -> Any:
+        """
+        获取文件内容
+
+        :param filepath:
+        :return:
+        """
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        cached = self._cache.get(filepath)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        data = self._loader(filepath)
+        with self._lock:
+            self._cache[filepath] = (stat.st_mtime_ns, stat.st_size, data)
+        return data
+
+    def invalidate(self, filepath: str | None = None) -> None:
+        """
+        使缓存失效
+
+        :param filepath: 文件路径, 为空时清空所有缓存
+        :return:
+        """
+        with self._lock:
+            if filepath is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(filepath), None)
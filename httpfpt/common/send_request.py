@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # _*_ coding:utf-8 _*_
+import asyncio
 import time
 
-from json import JSONDecodeError
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
 
 import allure
 import httpx
@@ -11,56 +13,77 @@ import stamina
 
 from _pytest.outcomes import Skipped
 from httpx import Response as HttpxResponse
+from jsonschema.exceptions import ValidationError
 from requests import Response as RequestsResponse
 
-from httpfpt.common.errors import AssertError, SendRequestError
+from httpfpt.common.errors import AssertError, JsonPathFindError, SendRequestError
 from httpfpt.common.log import log
+from httpfpt.common.variable_cache import variable_cache
 from httpfpt.core.get_conf import httpfpt_config
 from httpfpt.db.mysql import mysql_client
 from httpfpt.enums.query_fetch_type import QueryFetchType
 from httpfpt.enums.request.body import BodyType
 from httpfpt.enums.request.engin import EnginType
 from httpfpt.enums.setup_type import SetupType
+from httpfpt.enums.sql_type import SqlType
 from httpfpt.enums.teardown_type import TeardownType
 from httpfpt.utils.allure_control import allure_attach_file, allure_step
 from httpfpt.utils.assert_control import asserter
 from httpfpt.utils.enum_control import get_enum_values
 from httpfpt.utils.relate_testcase_executor import exec_setup_testcase
 from httpfpt.utils.request.hook_executor import hook_executor
+from httpfpt.utils.request.poller import Poller
 from httpfpt.utils.request.request_data_parse import RequestDataParse
-from httpfpt.utils.request.vars_extractor import var_extractor
+from httpfpt.utils.request.request_trace import RequestTrace
+from httpfpt.utils.request.response_data import ResponseData
+from httpfpt.utils.request.session_manager import session_manager
+from httpfpt.utils.request.stream_download import StreamDownload
+from httpfpt.utils.request.upload_file import FileBody, open_upload_files
+from httpfpt.utils.request.vars_extractor import STR_REQUEST_FIELDS, var_extractor
 from httpfpt.utils.time_control import get_current_time
 
+_T = TypeVar('_T')
+
+# 轮询断言中可重试的错误, 数据尚未就绪时断言失败或取值失败
+_POLL_RETRY_ERRORS = (AssertionError, JsonPathFindError, ValidationError)
+
 
 class SendRequests:
     """发送请求"""
 
     @property
-    def init_response_metadata(self) -> dict:
+    def init_response_metadata(self) -> ResponseData:
         """
         :return: 响应元数据
         """
-        response_metadata = {
-            'url': None,
-            'status_code': 200,
-            'elapsed': 0,
-            'headers': None,
-            'cookies': None,
-            'json': None,
-            'content': None,
-            'text': None,
-            'stat': {
-                'execute_time': None,
-            },
-            'request': None,
-        }
+        response_metadata = ResponseData(
+            {
+                'url': None,
+                'status_code': 200,
+                'elapsed': 0,
+                'headers': None,
+                'cookies': None,
+                'json': None,
+                'content': None,
+                'text': None,
+                'download': None,
+                'stat': {
+                    'execute_time': None,
+                    'http_version': None,
+                    'timing': None,
+                    'poll': None,
+                },
+                'request': None,
+            }
+        )
         return response_metadata
 
     @staticmethod
-    def _requests_engin(**kwargs) -> RequestsResponse:
+    def _requests_engin(trace: RequestTrace, **kwargs) -> RequestsResponse:
         """
         requests 引擎
 
+        :param trace:
         :param kwargs:
         :return:
         """
@@ -69,16 +92,35 @@ class SendRequests:
         kwargs['proxies'] = kwargs['proxies'] or httpfpt_config.REQUEST_PROXIES_REQUESTS
         kwargs['allow_redirects'] = kwargs['allow_redirects'] or httpfpt_config.REQUEST_REDIRECTS
         request_retry = kwargs['retry'] or httpfpt_config.REQUEST_RETRY
+        download: StreamDownload | None = kwargs['download']
         del kwargs['retry']
+        del kwargs['download']
+        # requests 仅支持 HTTP/1.1
+        del kwargs['http2']
         # 消除安全警告
         requests.packages.urllib3.disable_warnings()  # type: ignore
         log.info('开始发送请求...')
         try:
+            session = session_manager.get_requests_session(
+                kwargs['verify'], kwargs['proxies'], kwargs['allow_redirects']
+            )
             for attempt in stamina.retry_context(on=requests.HTTPError, attempts=request_retry):
                 with attempt:
                     if attempt.num > 1:
                         log.warning('请求响应异常重试...')
-                    response = requests.session().request(**kwargs)
+                    trace.start()
+                    with open_upload_files(kwargs) as request_kwargs:
+                        if download is None:
+                            response = session.request(**request_kwargs)
+                        else:
+                            response = session.request(**request_kwargs, stream=True)
+                    if download is not None:
+                        with response:
+                            response.raise_for_status()
+                            download.consume(
+                                response.iter_content(download.chunk_size), response.headers.get('Content-Length')
+                            )
+                    trace.end()
                     response.raise_for_status()
         except Exception as e:
             log.error(f'发送 requests 请求响应异常: {e}')
@@ -88,10 +130,11 @@ class SendRequests:
             return response  # type: ignore
 
     @staticmethod
-    def _httpx_engin(**kwargs) -> HttpxResponse:
+    def _httpx_engin(trace: RequestTrace, **kwargs) -> HttpxResponse:
         """
         httpx 引擎
 
+        :param trace:
         :param kwargs:
         :return:
         """
@@ -100,19 +143,39 @@ class SendRequests:
         proxies = kwargs['proxies'] or httpfpt_config.REQUEST_PROXIES_HTTPX
         redirects = kwargs['allow_redirects'] or httpfpt_config.REQUEST_REDIRECTS
         request_retry = kwargs['retry'] or httpfpt_config.REQUEST_RETRY
+        http2 = kwargs['http2'] if kwargs['http2'] is not None else httpfpt_config.REQUEST_HTTP2
+        download: StreamDownload | None = kwargs['download']
         del kwargs['verify']
         del kwargs['proxies']
         del kwargs['allow_redirects']
         del kwargs['retry']
+        del kwargs['http2']
+        del kwargs['download']
+        kwargs['extensions'] = {'trace': trace}
         log.info('开始发送请求...')
         try:
-            with httpx.Client(verify=verify, proxies=proxies, follow_redirects=redirects) as client:  # type: ignore
-                for attempt in stamina.retry_context(on=httpx.HTTPError, attempts=request_retry):
-                    with attempt:
-                        if attempt.num > 1:
-                            log.warning('请求响应异常重试...')
-                        response = client.request(**kwargs)
-                        response.raise_for_status()
+            for attempt in stamina.retry_context(on=httpx.HTTPError, attempts=request_retry):
+                with attempt:
+                    if attempt.num > 1:
+                        log.warning('请求响应异常重试...')
+                    # 每次请求使用新的客户端, 服务端在其他请求中设置的 cookie 不会随之发送
+                    client = session_manager.get_httpx_client(verify, proxies, redirects, http2)
+                    trace.start()
+                    with open_upload_files(kwargs) as request_kwargs:
+                        if download is None:
+                            response = client.request(**request_kwargs)
+                        else:
+                            response = client.send(client.build_request(**request_kwargs), stream=True)
+                    if download is not None:
+                        try:
+                            response.raise_for_status()
+                            download.consume(
+                                response.iter_bytes(download.chunk_size), response.headers.get('Content-Length')
+                            )
+                        finally:
+                            response.close()
+                    trace.end()
+                    response.raise_for_status()
         except Exception as e:
             log.error(f'发送 httpx 请求响应异常: {e}')
             raise SendRequestError(e.__str__())
@@ -120,6 +183,60 @@ class SendRequests:
             log.info('请求完成')
             return response  # type: ignore
 
+    @staticmethod
+    async def _httpx_async_engin(trace: RequestTrace, **kwargs) -> HttpxResponse:
+        """
+        httpx 异步引擎
+
+        :param trace:
+        :param kwargs:
+        :return:
+        """
+        kwargs['timeout'] = kwargs['timeout'] or httpfpt_config.REQUEST_TIMEOUT
+        verify = kwargs['verify'] or httpfpt_config.REQUEST_VERIFY
+        proxies = kwargs['proxies'] or httpfpt_config.REQUEST_PROXIES_HTTPX
+        redirects = kwargs['allow_redirects'] or httpfpt_config.REQUEST_REDIRECTS
+        request_retry = kwargs['retry'] or httpfpt_config.REQUEST_RETRY
+        http2 = kwargs['http2'] if kwargs['http2'] is not None else httpfpt_config.REQUEST_HTTP2
+        download: StreamDownload | None = kwargs['download']
+        del kwargs['verify']
+        del kwargs['proxies']
+        del kwargs['allow_redirects']
+        del kwargs['retry']
+        del kwargs['http2']
+        del kwargs['download']
+        kwargs['extensions'] = {'trace': trace.async_trace}
+        log.info('开始发送请求...')
+        try:
+            async for attempt in stamina.retry_context(on=httpx.HTTPError, attempts=request_retry):
+                with attempt:
+                    if attempt.num > 1:
+                        log.warning('请求响应异常重试...')
+                    # 每次请求使用新的客户端, 服务端在其他请求中设置的 cookie 不会随之发送
+                    client = session_manager.get_httpx_async_client(verify, proxies, redirects, http2)
+                    trace.start()
+                    with open_upload_files(kwargs, async_stream=True) as request_kwargs:
+                        if download is None:
+                            response = await client.request(**request_kwargs)
+                        else:
+                            response = await client.send(client.build_request(**request_kwargs), stream=True)
+                    if download is not None:
+                        try:
+                            response.raise_for_status()
+                            await download.aconsume(
+                                response.aiter_bytes(download.chunk_size), response.headers.get('Content-Length')
+                            )
+                        finally:
+                            await response.aclose()
+                    trace.end()
+                    response.raise_for_status()
+        except Exception as e:
+            log.error(f'发送 httpx 异步请求响应异常: {e}')
+            raise SendRequestError(e.__str__())
+        else:
+            log.info('请求完成')
+            return response  # type: ignore
+
     def send_request(
         self,
         request_data: dict,
@@ -128,9 +245,9 @@ class SendRequests:
         log_data: bool = True,
         relate_log: bool = False,
         **kwargs,
-    ) -> dict:
+    ) -> ResponseData:
         """
-        发送请求
+        发送请求, 用例内所有 SQL 共用一个数据库连接
 
         :param request_data: 请求数据
         :param request_engin: 请求引擎
@@ -138,9 +255,443 @@ class SendRequests:
         :param relate_log: 关联测试用例
         :return: response
         """
+        with mysql_client.session():
+            return self._send_request(
+                request_data, request_engin=request_engin, log_data=log_data, relate_log=relate_log, **kwargs
+            )
+
+    def _send_request(
+        self,
+        request_data: dict,
+        *,
+        request_engin: EnginType,
+        log_data: bool,
+        relate_log: bool,
+        **kwargs,
+    ) -> ResponseData:
         if request_engin not in get_enum_values(EnginType):
             raise SendRequestError('请求发起失败，请使用合法的请求引擎')
+        if request_engin == EnginType.httpx_async:
+            raise SendRequestError('请求发起失败，httpx_async 引擎请使用 send_request_async 发送请求')
+
+        parsed_data, parse_time = self._parse_request_data(request_data, request_engin, log_data, relate_log)
+
+        # 前置处理
+        setup_start = time.perf_counter()
+        if parsed_data['is_setup']:
+            with self._setup_handler():
+                for key, value in self._iter_setup(parsed_data):
+                    parsed_data = self._exec_setup_step(parsed_data, key, value)
+        timing = {'parse': parse_time, 'setup': self._elapsed_ms(setup_start)}
+
+        # 发送请求
+        request_conf, request_data_parsed = self._prepare_request(parsed_data, request_engin, log_data)
+        response_data = self._send(request_engin, request_conf, request_data_parsed, timing, **kwargs)
+        self._handle_response(parsed_data, response_data, log_data)
+
+        # 后置处理
+        teardown_start = time.perf_counter()
+        if parsed_data['is_teardown']:
+            with self._teardown_handler():
+                for key, value, queries, vars_replaced in self._iter_teardown_steps(parsed_data, response_data):
+                    mysql_client.query_batch(queries)
+                    if key == TeardownType.POLL:
+                        self._exec_poll(
+                            parsed_data,
+                            response_data,
+                            value,
+                            lambda: self._send(request_engin, request_conf, request_data_parsed, timing, **kwargs),
+                        )
+                    else:
+                        self._exec_teardown_step(parsed_data, response_data, key, value, vars_replaced)
+        response_data['stat']['timing']['teardown'] = self._elapsed_ms(teardown_start)
+
+        return response_data
+
+    async def send_request_async(
+        self,
+        request_data: dict,
+        *,
+        request_engin: EnginType = EnginType.httpx_async,
+        log_data: bool = True,
+        relate_log: bool = False,
+        **kwargs,
+    ) -> ResponseData:
+        """
+        异步发送请求, 等待类操作不阻塞事件循环, 以便多个用例的请求 I/O 并发执行
+
+        :param request_data: 请求数据
+        :param request_engin: 请求引擎
+        :param log_data: 日志记录数据
+        :param relate_log: 关联测试用例
+        :return: response
+        """
+        with mysql_client.session():
+            return await self._send_request_async(
+                request_data, request_engin=request_engin, log_data=log_data, relate_log=relate_log, **kwargs
+            )
 
+    async def _send_request_async(
+        self,
+        request_data: dict,
+        *,
+        request_engin: EnginType,
+        log_data: bool,
+        relate_log: bool,
+        **kwargs,
+    ) -> ResponseData:
+        if request_engin != EnginType.httpx_async:
+            raise SendRequestError('请求发起失败，异步发送请求仅支持 httpx_async 引擎')
+
+        # 解析、变量替换、hook 及断言等 CPU 密集或阻塞的步骤在线程中执行, 事件循环仅处理请求 I/O 及等待
+        parsed_data, parse_time = await self._to_thread(
+            self._parse_request_data, request_data, request_engin, log_data, relate_log
+        )
+
+        # 前置处理
+        setup_start = time.perf_counter()
+        if parsed_data['is_setup']:
+            with self._setup_handler():
+                for key, value in self._iter_setup(parsed_data):
+                    parsed_data = await self._exec_setup_step_async(parsed_data, key, value)
+        timing = {'parse': parse_time, 'setup': self._elapsed_ms(setup_start)}
+
+        # 发送请求
+        request_conf, request_data_parsed = await self._to_thread(
+            self._prepare_request, parsed_data, request_engin, log_data
+        )
+        response_data = await self._send_async(request_conf, request_data_parsed, timing, **kwargs)
+        await self._to_thread(self._handle_response, parsed_data, response_data, log_data)
+
+        # 后置处理
+        teardown_start = time.perf_counter()
+        if parsed_data['is_teardown']:
+            with self._teardown_handler():
+                for key, value, queries, vars_replaced in self._iter_teardown_steps(parsed_data, response_data):
+                    if queries:
+                        await self._to_thread(mysql_client.query_batch, queries)
+                    if key == TeardownType.POLL:
+                        await self._exec_poll_async(
+                            parsed_data,
+                            response_data,
+                            value,
+                            lambda: self._send_async(request_conf, request_data_parsed, timing, **kwargs),
+                        )
+                    else:
+                        await self._exec_teardown_step_async(parsed_data, response_data, key, value, vars_replaced)
+        response_data['stat']['timing']['teardown'] = self._elapsed_ms(teardown_start)
+
+        return response_data
+
+    @staticmethod
+    async def _to_thread(func: Callable[..., _T], /, *args: Any) -> _T:
+        """
+        在线程中执行用例数据解析、变量替换、SQL、hook、断言及关联用例等阻塞操作, 避免阻塞事件循环
+
+        :param func:
+        :param args:
+        :return:
+        """
+        # 线程复制当前上下文, 提前创建临时变量缓存, 使线程中设置的变量对当前协程可见
+        _ = variable_cache.cache
+        return await asyncio.to_thread(func, *args)
+
+    @staticmethod
+    @contextmanager
+    def _setup_handler() -> Iterator[None]:
+        log.info('开始处理请求前置...')
+        try:
+            yield
+        except Exception as e:
+            log.error(f'请求前置处理异常: {e}')
+            raise e
+        log.info('请求前置处理完成')
+
+    @staticmethod
+    @contextmanager
+    def _teardown_handler() -> Iterator[None]:
+        log.info('开始处理请求后置...')
+        try:
+            yield
+        except AssertionError as e:
+            log.error(f'断言失败: {e}')
+            raise AssertError(f'断言失败: {e}')
+        except Exception as e:
+            log.error(f'请求后置处理异常: {e}')
+            raise e
+        log.info('请求后置处理完成')
+
+    def _exec_setup_step(self, parsed_data: dict, key: str, value: Any) -> dict:
+        """
+        执行请求前置步骤
+
+        :param parsed_data:
+        :param key:
+        :param value:
+        :return: 应用关联用例变量后的请求数据
+        """
+        if key == SetupType.TESTCASE:
+            return exec_setup_testcase(parsed_data, value) or parsed_data
+        if key == SetupType.WAIT_TIME:
+            time.sleep(value)
+            log.info(f'执行请求前等待：{value} s')
+        else:
+            self._exec_setup_item(parsed_data, key, value)
+        return parsed_data
+
+    async def _exec_setup_step_async(self, parsed_data: dict, key: str, value: Any) -> dict:
+        """
+        异步执行请求前置步骤
+
+        :param parsed_data:
+        :param key:
+        :param value:
+        :return: 应用关联用例变量后的请求数据
+        """
+        if key == SetupType.WAIT_TIME:
+            await asyncio.sleep(value)
+            log.info(f'执行请求前等待：{value} s')
+            return parsed_data
+        return await self._to_thread(self._exec_setup_step, parsed_data, key, value)
+
+    def _iter_teardown_steps(
+        self, parsed_data: dict, response_data: ResponseData
+    ) -> Iterator[tuple[str, Any, list[tuple[str, str]], bool]]:
+        """
+        遍历请求后置步骤, 连续 SQL 断言中的首个步骤附带这些断言的查询, 以便批量执行
+
+        :param parsed_data:
+        :param response_data:
+        :return: (步骤类型, 步骤数据, 批量查询, 步骤数据是否已替换变量)
+        """
+        self._prefetch_teardown_jsonpath(parsed_data, response_data)
+        teardown = list(self._iter_teardown(parsed_data))
+        sql_asserts: list[dict] = []
+        for index, (key, value) in enumerate(teardown):
+            queries = []
+            if not sql_asserts:
+                # 在执行到此步骤时再替换变量, 前面步骤提取的变量可用于查询
+                sql_asserts = self._get_sql_asserts(parsed_data, teardown[index:])
+                queries = self._get_sql_queries(sql_asserts)
+            if sql_asserts:
+                yield key, sql_asserts.pop(0), queries, True
+            else:
+                yield key, value, queries, False
+
+    def _exec_teardown_step(
+        self, parsed_data: dict, response_data: ResponseData, key: str, value: Any, vars_replaced: bool = False
+    ) -> None:
+        """
+        执行请求后置步骤
+
+        :param parsed_data:
+        :param response_data:
+        :param key:
+        :param value:
+        :param vars_replaced: 步骤数据是否已替换变量
+        :return:
+        """
+        if key == TeardownType.WAIT_TIME:
+            log.info(f'执行请求后等待：{value} s')
+            time.sleep(value)
+        else:
+            self._exec_teardown_item(parsed_data, response_data, key, value, vars_replaced)
+
+    async def _exec_teardown_step_async(
+        self, parsed_data: dict, response_data: ResponseData, key: str, value: Any, vars_replaced: bool = False
+    ) -> None:
+        """
+        异步执行请求后置步骤
+
+        :param parsed_data:
+        :param response_data:
+        :param key:
+        :param value:
+        :param vars_replaced: 步骤数据是否已替换变量
+        :return:
+        """
+        if key == TeardownType.WAIT_TIME:
+            log.info(f'执行请求后等待：{value} s')
+            await asyncio.sleep(value)
+        else:
+            await self._to_thread(self._exec_teardown_item, parsed_data, response_data, key, value, vars_replaced)
+
+    def _handle_response(self, parsed_data: dict, response_data: ResponseData, log_data: bool) -> None:
+        """
+        记录响应数据并执行 openapi 响应数据断言
+
+        :param parsed_data:
+        :param response_data:
+        :param log_data:
+        :return:
+        """
+        self._log_response(parsed_data, response_data, log_data)
+        self._exec_openapi_assert(parsed_data, response_data)
+
+    def _send(
+        self, request_engin: str, request_conf: dict, request_data_parsed: dict, timing: dict, **kwargs
+    ) -> ResponseData:
+        """
+        发送请求并记录响应数据
+
+        :param request_engin:
+        :param request_conf:
+        :param request_data_parsed:
+        :param timing: 解析及前置处理耗时
+        :param kwargs:
+        :return:
+        """
+        # 结束此前查询的读事务, 使请求后的查询读取被测服务的最新修改
+        mysql_client.commit()
+        response_data = self.init_response_metadata
+        response_data['stat']['execute_time'] = get_current_time()
+        trace = RequestTrace()
+        if request_engin == EnginType.requests:
+            response = self._requests_engin(trace, **request_conf, **request_data_parsed, **kwargs)
+        elif request_engin == EnginType.httpx:
+            response = self._httpx_engin(trace, **request_conf, **request_data_parsed, **kwargs)
+        else:
+            raise SendRequestError('请求发起失败，请使用合法的请求引擎：requests / httpx')
+
+        self._record_response(response, response_data, request_data_parsed, request_conf['download'])
+        response_data['stat']['timing'] = {**trace.get_timing(response), **timing, 'teardown': None, 'assert': 0.0}
+        return response_data
+
+    async def _send_async(self, request_conf: dict, request_data_parsed: dict, timing: dict, **kwargs) -> ResponseData:
+        """
+        异步发送请求并记录响应数据
+
+        :param request_conf:
+        :param request_data_parsed:
+        :param timing: 解析及前置处理耗时
+        :param kwargs:
+        :return:
+        """
+        # 结束此前查询的读事务, 使请求后的查询读取被测服务的最新修改
+        if mysql_client.is_connected():
+            await self._to_thread(mysql_client.commit)
+        response_data = self.init_response_metadata
+        response_data['stat']['execute_time'] = get_current_time()
+        trace = RequestTrace()
+        response = await self._httpx_async_engin(trace, **request_conf, **request_data_parsed, **kwargs)
+
+        self._record_response(response, response_data, request_data_parsed, request_conf['download'])
+        response_data['stat']['timing'] = {**trace.get_timing(response), **timing, 'teardown': None, 'assert': 0.0}
+        return response_data
+
+    def _exec_poll(
+        self, parsed_data: dict, response_data: ResponseData, poll: dict, resend: Callable[[], ResponseData]
+    ) -> None:
+        """
+        执行轮询断言, 断言未通过时按退避间隔重新发送请求并断言, 直到断言通过或超过截止时间
+
+        :param parsed_data:
+        :param response_data:
+        :param poll:
+        :param resend: 重新发送请求
+        :return:
+        """
+        poller = self._start_poll(poll)
+        while not self._exec_poll_asserts(parsed_data, response_data, poller):
+            time.sleep(self._get_poll_delay(response_data, poller))
+            if poller.request:
+                self._replace_poll_response(response_data, resend())
+
+    async def _exec_poll_async(
+        self,
+        parsed_data: dict,
+        response_data: ResponseData,
+        poll: dict,
+        resend: Callable[[], Awaitable[ResponseData]],
+    ) -> None:
+        """
+        异步执行轮询断言, 等待及断言不阻塞事件循环
+
+        :param parsed_data:
+        :param response_data:
+        :param poll:
+        :param resend: 重新发送请求
+        :return:
+        """
+        poller = self._start_poll(poll)
+        # 断言可能包含 SQL 查询, 在线程中执行
+        while not await self._to_thread(self._exec_poll_asserts, parsed_data, response_data, poller):
+            await asyncio.sleep(self._get_poll_delay(response_data, poller))
+            if poller.request:
+                self._replace_poll_response(response_data, await resend())
+
+    @staticmethod
+    def _start_poll(poll: dict) -> Poller:
+        poller = Poller(poll)
+        log.info(f'执行轮询断言, 截止时间: {poller.timeout} s')
+        return poller
+
+    def _exec_poll_asserts(self, parsed_data: dict, response_data: ResponseData, poller: Poller) -> bool:
+        """
+        执行一次轮询中的所有断言
+
+        :param parsed_data:
+        :param response_data:
+        :param poller:
+        :return: 断言是否全部通过
+        """
+        # 提交事务以读取最新数据, 否则同一事务中的查询结果不会变化
+        mysql_client.commit()
+        sql_asserts = self._get_sql_asserts(parsed_data, [(TeardownType.ASSERT, a) for a in poller.asserts])
+        mysql_client.query_batch(self._get_sql_queries(sql_asserts))
+        try:
+            for index, assert_text in enumerate(poller.asserts):
+                if index < len(sql_asserts):
+                    self._exec_teardown_item(parsed_data, response_data, TeardownType.ASSERT, sql_asserts[index], True)
+                else:
+                    self._exec_teardown_item(parsed_data, response_data, TeardownType.ASSERT, assert_text)
+        except _POLL_RETRY_ERRORS as e:
+            poller.last_error = e
+            log.warning(f'轮询断言第 {poller.attempts} 次未通过: {e}')
+            return False
+        poller.record(response_data, passed=True)
+        log.info(f'轮询断言通过, 共尝试 {poller.attempts} 次, 耗时 {poller.elapsed} ms')
+        return True
+
+    @staticmethod
+    def _get_poll_delay(response_data: ResponseData, poller: Poller) -> float:
+        """
+        获取轮询重试等待时间, 超过截止时间时断言失败
+
+        :param response_data:
+        :param poller:
+        :return:
+        """
+        delay = poller.next_delay()
+        if delay is None:
+            poller.record(response_data, passed=False)
+            raise AssertionError(
+                f'轮询断言在 {poller.timeout} s 内未通过, 共尝试 {poller.attempts} 次, 耗时 {poller.elapsed} ms: '
+                f'{poller.last_error}'
+            )
+        log.info(f'轮询断言等待 {delay} s 后重试')
+        return delay
+
+    @staticmethod
+    def _replace_poll_response(response_data: ResponseData, new_response_data: ResponseData) -> None:
+        # 保留此前轮询断言的记录
+        poll_stat = response_data['stat']['poll']
+        response_data.replace_with(new_response_data)
+        response_data['stat']['poll'] = poll_stat
+
+    def _parse_request_data(
+        self, request_data: dict, request_engin: str, log_data: bool, relate_log: bool
+    ) -> tuple[dict, float]:
+        """
+        解析请求数据
+
+        :param request_data:
+        :param request_engin:
+        :param log_data:
+        :param relate_log:
+        :return: 解析后的请求数据及解析耗时
+        """
+        parse_start = time.perf_counter()
         # 获取解析后的请求数据
         log.info('开始解析用例数据...' if not relate_log else '开始解析关联用例数据...')
         try:
@@ -155,41 +706,108 @@ class SendRequests:
         log.info('用例数据解析完成' if not relate_log else '关联用例数据解析完成')
 
         # 记录请求前置数据; 此处数据中如果包含关联用例变量, 不会被替换为结果记录, 因为替换动作还未发生
-        setup = parsed_data['setup']
         if log_data:
             if parsed_data['is_setup']:
-                self.log_request_setup(setup)
+                self.log_request_setup(parsed_data['setup'])
 
-        # 前置处理
-        if parsed_data['is_setup']:
-            log.info('开始处理请求前置...')
+        return parsed_data, self._elapsed_ms(parse_start)
+
+    @staticmethod
+    def _iter_setup(parsed_data: dict) -> Iterator[tuple[str, Any]]:
+        for item in parsed_data['setup']:
+            for key, value in item.items():
+                if value is not None:
+                    yield key, value
+
+    @staticmethod
+    def _iter_teardown(parsed_data: dict) -> Iterator[tuple[str, Any]]:
+        for item in parsed_data['teardown']:
+            for key, value in item.items():
+                if value is not None:
+                    yield key, value
+
+    @staticmethod
+    def _prefetch_teardown_jsonpath(parsed_data: dict, response_data: ResponseData) -> None:
+        """
+        单次遍历响应数据, 预取请求后置中变量提取及 json / 正则断言的 jsonpath 取值
+
+        :param parsed_data:
+        :param response_data:
+        :return:
+        """
+        paths = []
+        for key, value in SendRequests._iter_teardown(parsed_data):
+            if key in (TeardownType.EXTRACT, TeardownType.ASSERT) and isinstance(value, dict) and not value.get('sql'):
+                jsonpath = value.get('jsonpath')
+                if isinstance(jsonpath, str):
+                    paths.append(jsonpath)
+        response_data.jsonpath_prefetch(paths)
+
+    @staticmethod
+    def _get_sql_asserts(parsed_data: dict, teardown: list[tuple[str, Any]]) -> list[dict]:
+        """
+        获取开头连续的 SQL 断言并替换变量, 执行断言时直接使用, 不再重复替换
+
+        :param parsed_data:
+        :param teardown:
+        :return: 已替换变量的 SQL 断言列表
+        """
+        sql_asserts = []
+        for key, value in teardown:
+            if key != TeardownType.ASSERT or not isinstance(value, dict) or not isinstance(value.get('sql'), str):
+                break
             try:
-                for item in setup:
-                    for key, value in item.items():
-                        if value is not None:
-                            if key == SetupType.TESTCASE:
-                                relate_parsed_data = exec_setup_testcase(parsed_data, value)
-                                if relate_parsed_data:
-                                    parsed_data = relate_parsed_data
-                            elif key == SetupType.SQL:
-                                setup_sql = var_extractor.vars_replace({'sql': value}, parsed_data['env'])
-                                sql_fetch = QueryFetchType.ALL
-                                if isinstance(setup_sql, dict):
-                                    sql = setup_sql.get('sql')
-                                    sql_fetch = setup_sql.get('fetch')
-                                else:
-                                    sql = setup_sql
-                                mysql_client.exec_case_sql(sql, sql_fetch, parsed_data['env'])  # type: ignore
-                            elif key == SetupType.HOOK:
-                                hook_executor.exec_hook_func(value)
-                            elif key == SetupType.WAIT_TIME:
-                                time.sleep(value)
-                                log.info(f'执行请求前等待：{value} s')
-            except Exception as e:
-                log.error(f'请求前置处理异常: {e}')
-                raise e
-            log.info('请求前置处理完成')
+                value = var_extractor.vars_replace(value, parsed_data['env'])
+            except Exception:
+                # 变量替换失败时由断言执行抛出异常
+                break
+            sql = value.get('sql')  # type: ignore
+            if not isinstance(sql, str) or not sql.startswith(SqlType.select):
+                break
+            sql_asserts.append(value)
+        return sql_asserts
+
+    @staticmethod
+    def _get_sql_queries(sql_asserts: list[dict]) -> list[tuple[str, str]]:
+        """
+        获取 SQL 断言的查询, 批量执行后查询结果按 SQL 对应到各断言
+
+        :param sql_asserts:
+        :return: (sql, fetch) 列表
+        """
+        return [(value['sql'], value.get('fetch') or QueryFetchType.ALL) for value in sql_asserts]
+
+    @staticmethod
+    def _exec_setup_item(parsed_data: dict, key: str, value: Any) -> None:
+        """
+        执行请求前置 sql / hook
+
+        :param parsed_data:
+        :param key:
+        :param value:
+        :return:
+        """
+        if key == SetupType.SQL:
+            setup_sql = var_extractor.vars_replace({'sql': value}, parsed_data['env'])
+            sql_fetch = QueryFetchType.ALL
+            if isinstance(setup_sql, dict):
+                sql = setup_sql.get('sql')
+                sql_fetch = setup_sql.get('fetch')
+            else:
+                sql = setup_sql
+            mysql_client.exec_case_sql(sql, sql_fetch, parsed_data['env'])  # type: ignore
+        elif key == SetupType.HOOK:
+            hook_executor.exec_hook_func(value)
 
+    def _prepare_request(self, parsed_data: dict, request_engin: str, log_data: bool) -> tuple[dict, dict]:
+        """
+        整理请求参数
+
+        :param parsed_data:
+        :param request_engin:
+        :param log_data:
+        :return:
+        """
         # allure 记录动态数据
         self.allure_dynamic_data(parsed_data)
 
@@ -200,31 +818,33 @@ class SendRequests:
             'proxies': parsed_data['proxies'],
             'allow_redirects': parsed_data['redirects'],
             'retry': parsed_data['retry'],
+            'http2': parsed_data['http2'],
+            'download': StreamDownload(**parsed_data['download']) if parsed_data['download'] else None,
         }
         request_data_parsed = {
             'method': parsed_data['method'],
-            'url': parsed_data['url'],
             'params': parsed_data['params'],
-            'headers': parsed_data['headers'],
-            'cookies': parsed_data['cookies'],
             'body': parsed_data['body'],
             'files': parsed_data['files'],
         }
         try:
             request_data_parsed: dict = var_extractor.vars_replace(request_data_parsed, parsed_data['env'])  # type: ignore # noqa: ignore
+            str_request_data: dict = var_extractor.vars_replace(  # type: ignore
+                {k: parsed_data[k] for k in STR_REQUEST_FIELDS}, parsed_data['env'], keep_type=False
+            )
+            request_data_parsed.update(str_request_data)
             body = request_data_parsed.pop('body')
             if parsed_data['body_type'] == BodyType.JSON or parsed_data['body_type'] == BodyType.GraphQL:
                 request_data_parsed.update({'json': body})
             elif parsed_data['body_type'] == BodyType.binary:
-                if request_engin == EnginType.httpx:
-                    request_data_parsed.update({'content': body})
+                binary_body = FileBody(body) if isinstance(body, str) else body
+                if request_engin in (EnginType.httpx, EnginType.httpx_async):
+                    request_data_parsed.update({'content': binary_body})
+                else:
+                    request_data_parsed.update({'data': binary_body})
             else:
                 request_data_parsed.update({'data': body})
-            parsed_data.update(
-                body=request_data_parsed.get('json')
-                or request_data_parsed.get('data')
-                or request_data_parsed.get('content')
-            )
+            parsed_data.update(body=body)
         except Exception as e:
             log.error(e)
             raise e
@@ -235,83 +855,139 @@ class SendRequests:
             self.allure_request_up(parsed_data)
             log.info('<发送请求>')
 
-        # 发送请求
-        response_data = self.init_response_metadata
-        response_data['stat']['execute_time'] = get_current_time()
-        if request_engin == EnginType.requests:
-            response = self._requests_engin(**request_conf, **request_data_parsed, **kwargs)
-        elif request_engin == EnginType.httpx:
-            response = self._httpx_engin(**request_conf, **request_data_parsed, **kwargs)
-        else:
-            raise SendRequestError('请求发起失败，请使用合法的请求引擎：requests / httpx')
+        return request_conf, request_data_parsed
 
-        # 序列化响应数据
-        res_headers = dict(response.headers)
-        res_content_type = res_headers.get('Content-Type')
-        try:
-            if res_content_type and 'application/json' in res_content_type:
-                json_data = response.json()
-            else:
-                json_data = {}
-        except JSONDecodeError:
-            err_msg = '响应数据解析失败，响应数据不是有效的 json 格式'
-            log.warning(err_msg)
-            raise SendRequestError(err_msg)
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return round((time.perf_counter() - start) * 1000, 3)
+
+    @staticmethod
+    def _get_http_version(response: RequestsResponse | HttpxResponse) -> str | None:
+        """
+        获取实际协商的 HTTP 协议版本
+
+        :param response:
+        :return:
+        """
+        if isinstance(response, HttpxResponse):
+            return response.http_version
+        raw_version = getattr(response.raw, 'version', None)
+        if raw_version == 10:
+            return 'HTTP/1.0'
+        if raw_version == 11:
+            return 'HTTP/1.1'
+        return None
 
-        # 记录响应数据
+    @staticmethod
+    def _record_response(
+        response: RequestsResponse | HttpxResponse,
+        response_data: ResponseData,
+        request_data_parsed: dict,
+        download: StreamDownload | None = None,
+    ) -> None:
+        """
+        记录响应数据, 响应体仅保留原始字节, text 与 json 在首次读取时解析; 流式下载时不保留响应体, 仅记录下载结果
+
+        :param response:
+        :param response_data:
+        :param request_data_parsed:
+        :param download:
+        :return:
+        """
         response_data['url'] = str(response.url)
         response_data['status_code'] = int(response.status_code)  # type: ignore
-        response_data['elapsed'] = response.elapsed.microseconds / 1000.0
-        response_data['headers'] = res_headers
+        response_data['elapsed'] = round(response.elapsed.total_seconds() * 1000.0, 3)
+        response_data['headers'] = dict(response.headers)
         response_data['cookies'] = dict(response.cookies)
-        response_data['json'] = json_data
-        response_data['content'] = response.content
-        response_data['text'] = response.text
+        if download is None:
+            response_data.set_lazy('json', lambda: SendRequests._parse_response_json(response))
+            response_data['content'] = response.content
+            response_data.set_lazy('text', lambda: response.text)
+        else:
+            response_data['json'] = {}
+            response_data['download'] = download.result()
         response_data['request'] = request_data_parsed
+        response_data['stat']['http_version'] = SendRequests._get_http_version(response)
+
+    @staticmethod
+    def _parse_response_json(response: RequestsResponse | HttpxResponse) -> Any:
+        """
+        解析 json 响应数据, 响应类型非 json 且无法解析时返回空字典
 
-        # 日志记录响应数据
-        teardown = parsed_data['teardown']
+        :param response:
+        :return:
+        """
+        res_content_type = response.headers.get('Content-Type')
+        try:
+            return response.json()
+        except ValueError:
+            if res_content_type and 'application/json' in res_content_type:
+                err_msg = '响应数据解析失败，响应数据不是有效的 json 格式'
+                log.warning(err_msg)
+                raise SendRequestError(err_msg)
+            return {}
+
+    def _log_response(self, parsed_data: dict, response_data: ResponseData, log_data: bool) -> None:
         if log_data:
             self.log_request_down(response_data)
             self.allure_request_down(response_data)
             if parsed_data['is_teardown']:
-                self.log_request_teardown(teardown)
+                self.log_request_teardown(parsed_data['teardown'])
 
-        # 后置处理
-        if parsed_data['is_teardown']:
-            log.info('开始处理请求后置...')
+    @staticmethod
+    def _exec_teardown_item(
+        parsed_data: dict, response_data: ResponseData, key: str, value: Any, vars_replaced: bool = False
+    ) -> None:
+        """
+        执行请求后置 sql / hook / extract / assert
+
+        :param parsed_data:
+        :param response_data:
+        :param key:
+        :param value:
+        :param vars_replaced: 断言数据是否已替换变量
+        :return:
+        """
+        if key == TeardownType.SQL:
+            teardown_sql = var_extractor.vars_replace(value, parsed_data['env'])
+            sql_fetch = QueryFetchType.ALL
+            if isinstance(teardown_sql, dict):
+                sql = teardown_sql.get('sql')
+                sql_fetch = teardown_sql.get('fetch')
+            else:
+                sql = teardown_sql
+            mysql_client.exec_case_sql(sql, sql_fetch, parsed_data['env'])  # type: ignore
+        if key == TeardownType.HOOK:
+            hook_executor.exec_hook_func(value)
+        if key == TeardownType.EXTRACT:
+            var_extractor.teardown_var_extract(response_data, value, parsed_data['env'])
+        if key == TeardownType.ASSERT:
+            assert_text = value if vars_replaced else var_extractor.vars_replace(value, env=parsed_data['env'])
+            assert_start = time.perf_counter()
             try:
-                for item in teardown:
-                    for key, value in item.items():
-                        if value is not None:
-                            if key == TeardownType.SQL:
-                                teardown_sql = var_extractor.vars_replace(value, parsed_data['env'])
-                                sql_fetch = QueryFetchType.ALL
-                                if isinstance(teardown_sql, dict):
-                                    sql = teardown_sql.get('sql')
-                                    sql_fetch = teardown_sql.get('fetch')
-                                else:
-                                    sql = teardown_sql
-                                mysql_client.exec_case_sql(sql, sql_fetch, parsed_data['env'])  # type: ignore
-                            if key == TeardownType.HOOK:
-                                hook_executor.exec_hook_func(value)
-                            if key == TeardownType.EXTRACT:
-                                var_extractor.teardown_var_extract(response_data, value, parsed_data['env'])
-                            if key == TeardownType.ASSERT:
-                                assert_text = var_extractor.vars_replace(value, env=parsed_data['env'])
-                                asserter.exec_asserter(response_data, assert_text)
-                            elif key == TeardownType.WAIT_TIME:
-                                log.info(f'执行请求后等待：{value} s')
-                                time.sleep(value)
-            except AssertionError as e:
-                log.error(f'断言失败: {e}')
-                raise AssertError(f'断言失败: {e}')
-            except Exception as e:
-                log.error(f'请求后置处理异常: {e}')
-                raise e
-            log.info('请求后置处理完成')
+                asserter.exec_asserter(response_data, assert_text)
+            finally:
+                timing = response_data['stat']['timing']
+                timing['assert'] = round(timing['assert'] + SendRequests._elapsed_ms(assert_start), 3)
 
-        return response_data
+    @staticmethod
+    def _exec_openapi_assert(parsed_data: dict, response_data: ResponseData) -> None:
+        """
+        执行 openapi 响应数据断言
+
+        :param parsed_data:
+        :param response_data:
+        :return:
+        """
+        assert_start = time.perf_counter()
+        try:
+            asserter.exec_openapi_asserter(response_data, parsed_data['method'])
+        except AssertionError as e:
+            log.error(f'断言失败: {e}')
+            raise AssertError(f'断言失败: {e}')
+        finally:
+            timing = response_data['stat']['timing']
+            timing['assert'] = round(timing['assert'] + SendRequests._elapsed_ms(assert_start), 3)
 
     def log_request_setup(self, setup: list) -> None:
         log.info('<请求前置>')
@@ -366,9 +1042,12 @@ class SendRequests:
                 elif key == TeardownType.WAIT_TIME:
                     log.info(f'后置 teardown_wait_time: {value}')
                     self.allure_request_teardown({'teardown_wait_time': value})
+                elif key == TeardownType.POLL:
+                    log.info(f'后置 teardown_poll: {value}')
+                    self.allure_request_teardown({'teardown_poll': value})
 
     @staticmethod
-    def log_request_down(response_data: dict) -> None:
+    def log_request_down(response_data: ResponseData) -> None:
         log.info(f'请求发送时间: {response_data["stat"]["execute_time"]}')
         str_status_code = str(response_data['status_code'])
         if str_status_code.startswith(('4', '5')):
@@ -376,6 +1055,10 @@ class SendRequests:
         else:
             log.info(f'响应状态码: {response_data["status_code"]}')
         log.info(f'响应时间: {response_data["elapsed"]} ms')
+        log.info(f'响应协议: {response_data["stat"]["http_version"]}')
+        log.info(f'请求阶段耗时: {response_data["stat"]["timing"]} ms')
+        if response_data['download'] is not None:
+            log.info(f'下载结果: {response_data["download"]}')
 
     @staticmethod
     def allure_request_setup(setup_log: dict) -> None:
@@ -406,13 +1089,31 @@ class SendRequests:
         allure_step('请求后置', teardown_log)
 
     @staticmethod
-    def allure_request_down(response_data: dict) -> None:
+    def _get_response_body_log(response_data: ResponseData) -> dict:
+        """
+        获取用于记录的响应体, 仅在 json 已被解析或响应类型为 json 时记录 json, 否则记录 text, 避免为记录日志解析响应
+
+        :param response_data:
+        :return:
+        """
+        if response_data.is_loaded('json') and response_data['json'] is not None:
+            return {'json': response_data['json']}
+        headers = response_data['headers'] or {}
+        content_type = next((v for k, v in headers.items() if k.lower() == 'content-type'), '')
+        if 'json' in content_type:
+            return {'json': response_data['json']}
+        return {'text': response_data['text']}
+
+    @staticmethod
+    def allure_request_down(response_data: ResponseData) -> None:
         allure_step(
             '响应数据',
             {
                 'status_code': response_data['status_code'],
                 'elapsed': response_data['elapsed'],
-                'json': response_data['json'],
+                'timing': response_data['stat']['timing'],
+                **SendRequests._get_response_body_log(response_data),
+                'download': response_data['download'],
             },
         )
 
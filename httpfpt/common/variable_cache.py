@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
 
 from cache3 import Cache
 
@@ -8,8 +10,32 @@ from httpfpt.common.log import log
 
 
 class VariableCache:
-    def __init__(self, cache: Cache = Cache('httpfpt_cache_vars')) -> None:
-        self.cache = cache
+    """临时变量缓存, 按线程及协程任务隔离, 并发执行的用例不会读取或清除彼此的临时变量"""
+
+    def __init__(self, name: str = 'httpfpt_cache_vars') -> None:
+        self.name = name
+        self._cache: ContextVar[Cache | None] = ContextVar(name, default=None)
+
+    @property
+    def cache(self) -> Cache:
+        cache = self._cache.get()
+        if cache is None:
+            cache = Cache(self.name)
+            self._cache.set(cache)
+        return cache
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        """
+        在独立的临时变量缓存中执行, 结束后恢复原缓存
+
+        :return:
+        """
+        token = self._cache.set(Cache(self.name))
+        try:
+            yield
+        finally:
+            self._cache.reset(token)
 
     def get(self, key: str, **kwargs) -> Any:
         """
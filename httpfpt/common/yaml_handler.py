@@ -9,10 +9,15 @@ import yaml
 
 from ruamel.yaml import YAML
 
+from httpfpt.common.file_cache import FileCache
 from httpfpt.common.log import log
 from httpfpt.core.path_conf import httpfpt_path
 from httpfpt.utils.time_control import get_current_time
 
+# 用例数据文件加载器, 安装 libyaml 时使用 C 实现的加载器, 解析速度更快
+# 仅支持标准 yaml 标签, 不支持 FullLoader 的 !!python/tuple 等 python 标签, 其他 yaml 文件仍使用 FullLoader 读取
+CASE_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 def read_yaml(filepath: str, filename: str | None = None) -> dict[str, Any]:
     """
@@ -37,6 +42,18 @@ def read_yaml(filepath: str, filename: str | None = None) -> dict[str, Any]:
         raise ValueError(f'数据文件 {filename} 没有数据! 请检查数据文件内容是否正确!')
 
 
+_global_vars_cache = FileCache(read_yaml)
+
+
+def get_global_vars() -> dict[str, Any]:
+    """
+    获取 yaml 全局变量, 文件未变更时使用缓存
+
+    :return:
+    """
+    return dict(_global_vars_cache.get(os.path.join(httpfpt_path.global_var_dir, 'global_vars.yaml')))
+
+
 def write_yaml(filepath: str, filename: str, data: Any = None, *, encoding: str = 'utf-8', mode: str = 'a') -> None:
     """
     将数据写入包含 yaml 格式数据的文件
@@ -111,3 +128,5 @@ def write_yaml_vars(data: dict) -> None:
         log.error(f'写入 global_vars.yaml 全局变量 {data} 错误: {e}')
     else:
         log.info(f'写入全局变量成功: global_vars.yaml -> {data}')
+    finally:
+        _global_vars_cache.invalidate(_file)
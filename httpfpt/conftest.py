@@ -10,11 +10,24 @@ from httpfpt.common.log import log
 from httpfpt.common.variable_cache import variable_cache
 from httpfpt.common.yaml_handler import write_yaml_report
 from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.db.storage import storage_client
+from httpfpt.enums.hook_cache_scope import HookCacheScopeType
+from httpfpt.enums.request.session_scope import SessionScopeType
+from httpfpt.enums.storage_backend import StorageBackendType
+from httpfpt.utils.case_scheduler import add_case_group_marks
+from httpfpt.utils.request import case_data_parse as case_data
+from httpfpt.utils.request.hook_registry import hook_registry
+from httpfpt.utils.request.session_manager import session_manager
+from httpfpt.utils.request.stream_download import cleanup_download_dir
 
 
 @pytest.fixture(scope='session', autouse=True)
 def session_fixture(tmp_path_factory):
-    pass
+    yield
+    # 关闭请求会话
+    session_manager.close_all()
+    # 删除本次运行的下载文件
+    cleanup_download_dir()
 
 
 @pytest.fixture(scope='package', autouse=True)
@@ -28,7 +41,9 @@ def package_fixture():
 
 @pytest.fixture(scope='module', autouse=True)
 def module_fixture():
-    pass
+    yield
+    session_manager.release(SessionScopeType.MODULE)
+    hook_registry.release(HookCacheScopeType.MODULE)
 
 
 @pytest.fixture(scope='class', autouse=True)
@@ -42,6 +57,8 @@ def function_fixture(request):
     log.info(f'🔥 Running: {request.function.__name__}')
 
     def testcase_end():
+        session_manager.release(SessionScopeType.CASE)
+        hook_registry.release(HookCacheScopeType.CASE)
         log.info('🔚 End')
 
     # teardown终结函数 == yield后的代码
@@ -65,6 +82,11 @@ def pytest_configure(config):
         del config.stash[metadata_key]['Platform']
         del config.stash[metadata_key]['Plugins']
 
+    # pytest-xdist 并发进程中内存存储为空, 重新加载用例数据
+    if hasattr(config, 'workerinput') and httpfpt_config.STORAGE_BACKEND == StorageBackendType.MEMORY:
+        storage_client.init()
+        case_data.case_data_init(pydantic_verify=False)
+
 
 def pytest_html_results_summary(prefix):
     """
@@ -133,10 +155,12 @@ def pytest_runtest_makereport(item, call):
         report.description = str(item.function.__doc__)
 
 
-def pytest_collection_modifyitems(items):
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
     """
     更新收集的测试用例配置
 
+    :param config:
     :param items:
     :return:
     """
@@ -144,6 +168,9 @@ def pytest_collection_modifyitems(items):
     for item in items:
         item.name = item.name.encode('utf-8').decode('unicode_escape')
         item._nodeid = item.nodeid.encode('utf-8').decode('unicode_escape')
+    # pytest-xdist 按组分发时, 相互关联的用例分配到同一进程, 仅在执行用例的进程中设置
+    if getattr(config.option, 'loadgroup', False):
+        add_case_group_marks(items)
 
 
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
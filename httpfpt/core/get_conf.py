@@ -29,6 +29,9 @@ class HttpFptConfig:
             self.MYSQL_DATABASE = glom(self.settings, 'mysql.database')
             self.MYSQL_CHARSET = glom(self.settings, 'mysql.charset')
 
+            # 运行数据存储
+            self.STORAGE_BACKEND = glom(self.settings, 'storage.backend')
+
             # redis 数据库
             self.REDIS_HOST = glom(self.settings, 'redis.host')
             self.REDIS_PORT = glom(self.settings, 'redis.port')
@@ -103,6 +106,15 @@ class HttpFptConfig:
                 else None,
             }
             self.REQUEST_RETRY = glom(self.settings, 'request.retry')
+            self.REQUEST_HTTP2 = glom(self.settings, 'request.http2')
+            self.REQUEST_SESSION_SCOPE = glom(self.settings, 'request.session_scope')
+            self.REQUEST_POOL_SIZE = glom(self.settings, 'request.pool_size')
+
+            # hook 函数
+            self.HOOK_MODULES = glom(self.settings, 'hook.modules')
+
+            # openapi 响应数据校验
+            self.OPENAPI_RESPONSE_SCHEMA = glom(self.settings, 'openapi.response_schema')
         except KeyError as e:
             raise ConfigInitError(f'配置解析失败：缺失参数 {str(e)}，请核对项目配置文件')
 
@@ -26,6 +26,11 @@ class HttpFptPathConfig:
         """用例数据路径"""
         return os.path.join(self.project_dir, 'data', 'test_data')
 
+    @property
+    def schema_dir(self) -> str:
+        """jsonschema 及 openapi 文档路径"""
+        return os.path.join(self.project_dir, 'data', 'schema')
+
     @property
     def _report_dir(self) -> str:
         """测试报告路径"""
@@ -96,6 +101,11 @@ class HttpFptPathConfig:
         """测试用例路径"""
         return os.path.join(self.project_dir, 'testcases')
 
+    @property
+    def cache_dir(self) -> str:
+        """缓存文件路径"""
+        return os.path.join(self.project_dir, 'cache')
+
 
 @lru_cache(maxsize=None)
 def cache_httpfpt_path() -> HttpFptPathConfig:
@@ -5,7 +5,9 @@ from __future__ import annotations
 import datetime
 import decimal
 
-from typing import Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
 
 import pymysql
 
@@ -20,6 +22,16 @@ from httpfpt.utils.enum_control import get_enum_values
 from httpfpt.utils.request.vars_recorder import record_variables
 
 
+class _Session:
+    """用例 SQL 会话, 用例内所有 SQL 共用一个连接"""
+
+    def __init__(self) -> None:
+        self.conn: Any = None
+        self.cursor: Any = None
+        # 批量查询结果, 以 (sql, fetch) 为键, 每个结果仅使用一次
+        self.results: dict[tuple[str, str], list] = {}
+
+
 class MysqlDB:
     def __init__(self) -> None:
         self._pool = PooledDB(
@@ -34,6 +46,7 @@ class MysqlDB:
             blocking=True,  # 连接池中如果没有可用连接后，是否阻塞等待
             autocommit=False,  # 是否自动提交
         )
+        self._session: ContextVar[_Session | None] = ContextVar('mysql_session', default=None)
 
     def init(self) -> tuple[Any, pymysql.cursors.DictCursor]:  # type: ignore
         """
@@ -55,78 +68,176 @@ class MysqlDB:
         cursor.close()
         conn.close()
 
-    def query(self, sql: str, fetch: QueryFetchType = QueryFetchType.ALL) -> dict | list | None:
+    @contextmanager
+    def session(self) -> Iterator[None]:
         """
-        数据库查询
+        用例 SQL 会话, 会话内的 SQL 共用一个连接, 首次执行 SQL 时才获取连接, 用例结束后归还连接;
+        已在会话中时复用当前会话
 
-        :param sql:
-        :param fetch: 查询条件; one: 查询一条数据; all: 查询所有数据
         :return:
         """
-        conn, cursor = self.init()
+        if self._session.get() is not None:
+            yield
+            return
+        session = _Session()
+        token = self._session.set(session)
+        try:
+            yield
+        finally:
+            self._session.reset(token)
+            if session.conn is not None:
+                self.close(session.conn, session.cursor)
+
+    def is_connected(self) -> bool:
+        """
+        当前会话是否已获取连接
+
+        :return:
+        """
+        session = self._session.get()
+        return session is not None and session.conn is not None
+
+    def commit(self) -> None:
+        """
+        结束当前会话的读事务, 使之后的查询读取最新数据
+
+        :return:
+        """
+        session = self._session.get()
+        if session is not None:
+            session.results.clear()
+            if session.conn is not None:
+                session.conn.commit()
+
+    @contextmanager
+    def _cursor(self) -> Iterator[tuple[Any, Any]]:
+        """获取连接和游标, 会话中复用会话连接"""
+        session = self._session.get()
+        if session is None:
+            conn, cursor = self.init()
+            try:
+                yield conn, cursor
+            finally:
+                self.close(conn, cursor)
+        else:
+            if session.conn is None:
+                session.conn, session.cursor = self.init()
+            yield session.conn, session.cursor
+
+    @staticmethod
+    def _fetch(cursor: Any, fetch: str) -> Any:
+        if fetch == QueryFetchType.ONE:
+            return cursor.fetchone()
+        elif fetch == QueryFetchType.ALL:
+            return cursor.fetchall()
+        else:
+            raise SQLSyntaxError(f'查询条件 {fetch} 错误, 请使用 one / all')
+
+    @staticmethod
+    def _format_query_data(query_data: Any) -> dict | list | None:
+        """
+        序列化查询结果
+
+        :param query_data:
+        :return:
+        """
+        if not query_data:
+            return None
         data = {}
         try:
-            cursor.execute(sql)
-            if fetch == QueryFetchType.ONE:
-                query_data = cursor.fetchone()
-            elif fetch == QueryFetchType.ALL:
-                query_data = cursor.fetchall()
-            else:
-                raise SQLSyntaxError(f'查询条件 {fetch} 错误, 请使用 one / all')
+
+            def format_row(row: dict) -> None:
+                for k, v in row.items():
+                    if isinstance(v, decimal.Decimal):
+                        if v % 1 == 0:
+                            data[k] = int(v)
+                        data[k] = float(v)
+                    elif isinstance(v, datetime.datetime):
+                        data[k] = str(v)
+                    else:
+                        data[k] = v
+
+            if isinstance(query_data, dict):
+                format_row(query_data)
+                return data
+            if isinstance(query_data, list):
+                data_list = []
+                for i in query_data:
+                    format_row(i)
+                    data_list.append(i)
+                return data_list
         except Exception as e:
-            log.error(f'执行 SQL 失败: {e}')
+            log.error(f'序列化 SQL 查询结果失败: {e}')
             raise e
-        else:
-            log.info(f'执行 SQL 成功: {query_data}')
-            if not query_data:
-                return None
-            try:
 
-                def format_row(row: dict) -> None:
-                    for k, v in row.items():
-                        if isinstance(v, decimal.Decimal):
-                            if v % 1 == 0:
-                                data[k] = int(v)
-                            data[k] = float(v)
-                        elif isinstance(v, datetime.datetime):
-                            data[k] = str(v)
-                        else:
-                            data[k] = v
-
-                if isinstance(query_data, dict):
-                    format_row(query_data)
-                    return data
-                if isinstance(query_data, list):
-                    data_list = []
-                    for i in query_data:
-                        format_row(i)
-                        data_list.append(i)
-                    return data_list
+    def query(self, sql: str, fetch: QueryFetchType = QueryFetchType.ALL) -> dict | list | None:
+        """
+        数据库查询
+
+        :param sql:
+        :param fetch: 查询条件; one: 查询一条数据; all: 查询所有数据
+        :return:
+        """
+        session = self._session.get()
+        if session is not None:
+            results = session.results.get((sql, fetch))
+            if results:
+                query_data = results.pop(0)
+                log.info(f'使用批量查询结果: {query_data}')
+                return self._format_query_data(query_data)
+        with self._cursor() as (_, cursor):
+            try:
+                cursor.execute(sql)
+                query_data = self._fetch(cursor, fetch)
             except Exception as e:
-                log.error(f'序列化 SQL 查询结果失败: {e}')
+                log.error(f'执行 SQL 失败: {e}')
                 raise e
-        finally:
-            self.close(conn, cursor)
+            log.info(f'执行 SQL 成功: {query_data}')
+            return self._format_query_data(query_data)
+
+    def query_batch(self, queries: list[tuple[str, str]]) -> None:
+        """
+        在当前会话的连接上连续执行多条互不依赖的查询, 结果供之后相同的查询直接使用; 不在会话中或执行失败时,
+        查询在使用时逐条执行
+
+        :param queries: (sql, fetch) 列表
+        :return:
+        """
+        session = self._session.get()
+        if session is None or len(queries) < 2:
+            return
+        with self._cursor() as (_, cursor):
+            for sql, fetch in queries:
+                try:
+                    cursor.execute(sql)
+                    query_data = self._fetch(cursor, fetch)
+                except Exception as e:
+                    log.warning(f'批量执行查询失败, 剩余查询将逐条执行: {e}')
+                    return
+                session.results.setdefault((sql, fetch), []).append(query_data)
+        log.info(f'批量执行查询成功, 共 {len(queries)} 条')
 
     def execute(self, sql: str) -> int:
         """
-        执行 sql 操作
+        执行 sql 操作, 执行成功后立即提交, 失败时仅回滚此语句
 
         :return:
         """
-        conn, cursor = self.init()
-        try:
-            rowcount = cursor.execute(sql)
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            log.error(f'执行 SQL 失败: {e}')
-            raise e
-        else:
-            log.info('执行 SQL 成功')
-            return rowcount
-        finally:
-            self.close(conn, cursor)
+        session = self._session.get()
+        if session is not None:
+            # 修改数据后批量查询结果失效
+            session.results.clear()
+        with self._cursor() as (conn, cursor):
+            try:
+                rowcount = cursor.execute(sql)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                log.error(f'执行 SQL 失败: {e}')
+                raise e
+            else:
+                log.info('执行 SQL 成功')
+                return rowcount
 
     def exec_case_sql(self, sql: str, fetch: QueryFetchType | None, env: str | None = None) -> dict | list | int | None:
         """
@@ -7,6 +7,9 @@ from redis import AuthenticationError, Redis
 from httpfpt.common.log import log
 from httpfpt.core.get_conf import httpfpt_config
 
+# 批量操作单次提交的 key 数量
+_BATCH_SIZE = 1000
+
 
 class RedisDB(Redis):
     def __init__(self) -> None:
@@ -22,7 +25,6 @@ class RedisDB(Redis):
         self.token_prefix = f'{self.prefix}:token'
         self.cookie_prefix = f'{self.prefix}:cookie'
         self.case_data_prefix = f'{self.prefix}:case_data'
-        self.case_id_file_prefix = f'{self.prefix}:case_id_file'
 
     def init(self) -> None:
         try:
@@ -50,6 +52,43 @@ class RedisDB(Redis):
                 log.warning(f'获取 redis 数据 {name} 失败, 此数据不存在')
         return data
 
+    def get_many(self, keys: list) -> list:
+        """
+        批量获取 redis 数据, 单次 MGET
+
+        :param keys:
+        :return: 与 keys 一一对应, 不存在的数据为 None
+        """
+        data = []
+        for i in range(0, len(keys), _BATCH_SIZE):
+            data.extend(self.mget(keys[i : i + _BATCH_SIZE]))  # type: ignore
+        return data
+
+    def set_many(self, mapping: dict, **kwargs) -> None:
+        """
+        批量设置 redis 数据, 通过 pipeline 一次提交
+
+        :param mapping:
+        :param kwargs: 同 set 参数, 如 ex
+        :return:
+        """
+        if not mapping:
+            return
+        pipe = self.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, value, **kwargs)
+        pipe.execute()
+
+    def delete_many(self, keys: list) -> None:
+        """
+        批量删除 redis 数据, 使用 UNLINK 异步释放内存
+
+        :param keys:
+        :return:
+        """
+        for i in range(0, len(keys), _BATCH_SIZE):
+            self.unlink(*keys[i : i + _BATCH_SIZE])
+
     def get_prefix(self, prefix: str) -> list:
         """
         获取 redis 符合前缀的数据
@@ -57,12 +96,8 @@ class RedisDB(Redis):
         :param prefix: key 前缀
         :return:
         """
-        data = []
-        for key in self.scan_iter(match=f'{prefix}*'):
-            value = super().get(key)
-            if value:
-                data.append(value)
-        return data
+        keys = list(self.scan_iter(match=f'{prefix}*', count=_BATCH_SIZE))
+        return [value for value in self.get_many(keys) if value]
 
     def rset(self, key: Any, value: Any, **kwargs) -> None:
         """
@@ -73,8 +108,7 @@ class RedisDB(Redis):
         :param kwargs:
         :return:
         """
-        if super().exists(key):
-            self.delete(key)
+        # SET 会覆盖任意类型的已有数据并清除过期时间, 无需先删除
         self.set(key, value, **kwargs)
 
     def delete_prefix(self, prefix: str, exclude: str | None = None) -> None:
@@ -85,12 +119,12 @@ class RedisDB(Redis):
         :param exclude: 排除的前缀
         :return:
         """
-        for key in self.scan_iter(match=f'{prefix}*'):
-            if not exclude:
-                self.delete(key)
-            else:
-                if not key.startswith(exclude):
-                    self.delete(key)
+        keys = [
+            key
+            for key in self.scan_iter(match=f'{prefix}*', count=_BATCH_SIZE)
+            if not exclude or not key.startswith(exclude)
+        ]
+        self.delete_many(keys)
 
 
 redis_client = RedisDB()
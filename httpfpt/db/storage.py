@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+from httpfpt.common.errors import ConfigInitError
+from httpfpt.common.log import log
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.core.path_conf import httpfpt_path
+from httpfpt.enums.storage_backend import StorageBackendType
+from httpfpt.utils.enum_control import get_enum_values
+
+
+def _to_str(value: Any) -> str:
+    # 与 redis 保持一致, 统一以字符串存储
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value if isinstance(value, str) else str(value)
+
+
+class BaseStorage(ABC):
+    """用例数据、token 及用例 id 等运行数据存储"""
+
+    def __init__(self) -> None:
+        self.prefix = 'httpfpt'
+        self.token_prefix = f'{self.prefix}:token'
+        self.cookie_prefix = f'{self.prefix}:cookie'
+        self.case_data_prefix = f'{self.prefix}:case_data'
+        self.case_data_manifest_prefix = f'{self.prefix}:manifest:case_data'
+
+    @abstractmethod
+    def init(self) -> None:
+        """
+        初始化存储
+
+        :return:
+        """
+
+    @abstractmethod
+    def get_many(self, keys: list) -> list:
+        """
+        批量获取数据
+
+        :param keys:
+        :return: 与 keys 一一对应, 不存在的数据为 None
+        """
+
+    @abstractmethod
+    def set_many(self, mapping: dict, ex: int | None = None) -> None:
+        """
+        批量设置数据
+
+        :param mapping:
+        :param ex: 过期时间, 单位秒
+        :return:
+        """
+
+    @abstractmethod
+    def delete_many(self, keys: list) -> None:
+        """
+        批量删除数据
+
+        :param keys:
+        :return:
+        """
+
+    @abstractmethod
+    def scan_keys(self, prefix: str) -> list:
+        """
+        获取符合前缀的 key
+
+        :param prefix:
+        :return:
+        """
+
+    def get(self, name: Any, logging: bool = True) -> Any:
+        """
+        获取数据
+
+        :param name:
+        :param logging:
+        :return:
+        """
+        data = self.get_many([name])[0]
+        if not data:
+            if logging:
+                log.warning(f'获取存储数据 {name} 失败, 此数据不存在')
+        return data
+
+    def set(self, key: Any, value: Any, ex: int | None = None) -> None:
+        """
+        设置数据
+
+        :param key:
+        :param value:
+        :param ex: 过期时间, 单位秒
+        :return:
+        """
+        self.set_many({key: value}, ex=ex)
+
+    def rset(self, key: Any, value: Any, ex: int | None = None) -> None:
+        """
+        重置设置数据
+
+        :param key:
+        :param value:
+        :param ex:
+        :return:
+        """
+        self.set(key, value, ex=ex)
+
+    def delete(self, *keys: Any) -> None:
+        """
+        删除数据
+
+        :param keys:
+        :return:
+        """
+        self.delete_many(list(keys))
+
+    def get_prefix(self, prefix: str) -> list:
+        """
+        获取符合前缀的数据
+
+        :param prefix: key 前缀
+        :return:
+        """
+        return [value for value in self.get_many(self.scan_keys(prefix)) if value]
+
+    def delete_prefix(self, prefix: str, exclude: str | None = None) -> None:
+        """
+        删除符合前缀的数据
+
+        :param prefix: key 前缀
+        :param exclude: 排除的前缀
+        :return:
+        """
+        self.delete_many([key for key in self.scan_keys(prefix) if not exclude or not key.startswith(exclude)])
+
+
+class RedisStorage(BaseStorage):
+    """redis 存储, 适用于多机或多进程共享运行数据"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        from httpfpt.db.redis import redis_client
+
+        self.client = redis_client
+
+    def init(self) -> None:
+        self.client.init()
+
+    def get(self, name: Any, logging: bool = True) -> Any:
+        return self.client.get(name, logging=logging)
+
+    def get_many(self, keys: list) -> list:
+        return self.client.get_many(keys)
+
+    def set_many(self, mapping: dict, ex: int | None = None) -> None:
+        self.client.set_many(mapping, ex=ex)
+
+    def delete_many(self, keys: list) -> None:
+        self.client.delete_many(keys)
+
+    def scan_keys(self, prefix: str) -> list:
+        return list(self.client.scan_iter(match=f'{prefix}*', count=1000))
+
+    def get_prefix(self, prefix: str) -> list:
+        return self.client.get_prefix(prefix)
+
+
+class MemoryStorage(BaseStorage):
+    """进程内存储, 无需外部服务, 数据仅在当前进程内有效"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._data: dict[str, tuple[str, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def init(self) -> None:
+        log.info('使用内存存储运行数据')
+
+    def get_many(self, keys: list) -> list:
+        now = time.time()
+        data = []
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is not None and item[1] is not None and item[1] <= now:
+                    del self._data[key]
+                    item = None
+                data.append(item[0] if item is not None else None)
+        return data
+
+    def set_many(self, mapping: dict, ex: int | None = None) -> None:
+        expires_at = time.time() + ex if ex else None
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (_to_str(value), expires_at)
+
+    def delete_many(self, keys: list) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def scan_keys(self, prefix: str) -> list:
+        now = time.time()
+        with self._lock:
+            return [k for k, v in self._data.items() if k.startswith(prefix) and (v[1] is None or v[1] > now)]
+
+
+class SQLiteStorage(BaseStorage):
+    """本地 sqlite 文件存储, 无需外部服务, 数据在多次运行间保留"""
+
+    def __init__(self, filepath: str | None = None) -> None:
+        super().__init__()
+        self.filepath = filepath or os.path.join(httpfpt_path.cache_dir, 'storage.sqlite3')
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = self._conn
+        if conn is None:
+            with self._lock:
+                conn = self._conn
+                if conn is None:
+                    os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+                    conn = sqlite3.connect(self.filepath, check_same_thread=False, isolation_level=None)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS httpfpt_storage '
+                        '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+                    )
+                    self._conn = conn
+        return conn
+
+    def init(self) -> None:
+        try:
+            conn = self.conn
+            with self._lock:
+                conn.execute(
+                    'DELETE FROM httpfpt_storage WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),)
+                )
+        except sqlite3.Error as e:
+            log.error(f'sqlite 存储初始化异常: {e}')
+        else:
+            log.info(f'使用 sqlite 存储运行数据: {self.filepath}')
+
+    def get_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        conn = self.conn
+        now = time.time()
+        rows: dict[str, str] = {}
+        with self._lock:
+            # sqlite 单条语句的参数数量有限制, 分批查询
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                cursor = conn.execute(
+                    f'SELECT key, value FROM httpfpt_storage WHERE key IN ({",".join("?" * len(batch))}) '
+                    'AND (expires_at IS NULL OR expires_at > ?)',
+                    (*batch, now),
+                )
+                rows.update(cursor.fetchall())
+        return [rows.get(key) for key in keys]
+
+    def set_many(self, mapping: dict, ex: int | None = None) -> None:
+        if not mapping:
+            return
+        conn = self.conn
+        expires_at = time.time() + ex if ex else None
+        with self._lock:
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO httpfpt_storage (key, value, expires_at) VALUES (?, ?, ?)',
+                    [(key, _to_str(value), expires_at) for key, value in mapping.items()],
+                )
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def delete_many(self, keys: list) -> None:
+        if not keys:
+            return
+        conn = self.conn
+        with self._lock:
+            conn.execute('BEGIN')
+            try:
+                conn.executemany('DELETE FROM httpfpt_storage WHERE key = ?', [(key,) for key in keys])
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def scan_keys(self, prefix: str) -> list:
+        conn = self.conn
+        with self._lock:
+            # 以 key 范围查询代替 LIKE, 可使用主键索引且无需转义通配符
+            cursor = conn.execute(
+                'SELECT key FROM httpfpt_storage WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)',
+                (prefix, f'{prefix}\U0010ffff', time.time()),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_storage() -> BaseStorage:
+    """
+    根据配置获取存储后端
+
+    :return:
+    """
+    backend = httpfpt_config.STORAGE_BACKEND
+    if backend not in get_enum_values(StorageBackendType):
+        raise ConfigInitError(f'存储后端 {backend} 错误, 请使用 redis / memory / sqlite')
+    if backend == StorageBackendType.MEMORY:
+        return MemoryStorage()
+    if backend == StorageBackendType.SQLITE:
+        return SQLiteStorage()
+    return RedisStorage()
+
+
+storage_client = get_storage()
@@ -0,0 +1,8 @@
+from httpfpt.enums import StrEnum
+
+
+class HookCacheScopeType(StrEnum):
+    NONE = 'none'
+    CASE = 'case'
+    MODULE = 'module'
+    SESSION = 'session'
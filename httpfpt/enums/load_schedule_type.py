@@ -0,0 +1,7 @@
+from httpfpt.enums import StrEnum
+
+
+class LoadScheduleType(StrEnum):
+    CONSTANT = 'constant'
+    RAMP = 'ramp'
+    STEP = 'step'
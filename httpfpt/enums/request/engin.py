@@ -4,3 +4,4 @@ from httpfpt.enums import StrEnum
 class EnginType(StrEnum):
     requests = 'requests'
     httpx = 'httpx'
+    httpx_async = 'httpx_async'
@@ -0,0 +1,7 @@
+from httpfpt.enums import StrEnum
+
+
+class SessionScopeType(StrEnum):
+    CASE = 'case'
+    MODULE = 'module'
+    SESSION = 'session'
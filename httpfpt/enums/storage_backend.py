@@ -0,0 +1,7 @@
+from httpfpt.enums import StrEnum
+
+
+class StorageBackendType(StrEnum):
+    REDIS = 'redis'
+    MEMORY = 'memory'
+    SQLITE = 'sqlite'
@@ -7,3 +7,4 @@ class TeardownType(StrEnum):
     EXTRACT = 'extract'
     ASSERT = 'assert'
     WAIT_TIME = 'wait_time'
+    POLL = 'poll'
@@ -16,8 +16,9 @@ from httpfpt.common.log import log
 from httpfpt.common.yaml_handler import read_yaml
 from httpfpt.core.get_conf import httpfpt_config
 from httpfpt.core.path_conf import httpfpt_path
-from httpfpt.db.redis import redis_client
+from httpfpt.db.storage import storage_client
 from httpfpt.utils.case_auto_generator import auto_generate_testcases
+from httpfpt.utils.case_scheduler import get_xdist_args
 from httpfpt.utils.request import case_data_parse as case_data
 from httpfpt.utils.send_report.dingding import DingDing
 from httpfpt.utils.send_report.email import SendEmail
@@ -39,6 +40,7 @@ def startup(
     strict_markers: bool,
     capture: bool,
     disable_warnings: bool,
+    workers: int,
     **kwargs,
 ) -> None:
     """运行启动程序"""
@@ -95,6 +97,9 @@ def startup(
     if disable_warnings:
         run_args.append('--disable-warnings')
 
+    if workers > 1:
+        run_args.extend(get_xdist_args(workers))
+
     if len(args) > 0:
         for i in args:
             if i not in run_args:
@@ -120,8 +125,8 @@ def startup(
     log.info(
         f'开始运行项目：{httpfpt_config.PROJECT_NAME}' if run_path == default_case_path else f'开始运行：\n{run_path}'
     )
-    log.info(f'当前执行 Pytest CLI: pytest {run_pytest_command_args}')
     log.info('🚀 START')
+    log.info(f'当前执行 Pytest CLI: pytest {run_pytest_command_args}')
     pytest.main(run_args)
     log.info('🏁 FINISH')
 
@@ -183,6 +188,8 @@ def run(
     strict_markers: bool = False,
     capture: bool = True,
     disable_warnings: bool = True,
+    # scheduler
+    workers: int = 1,
     **kwargs,
 ) -> None:
     """
@@ -191,7 +198,7 @@ def run(
     :param args: pytest 运行参数
     :param testcase_generate: 自动生成测试用例（跳过同名文件），建议通过 CLI 手动执行，默认关闭
     :param testcase_re_generation: 覆盖生成同名文件测试用例，建议通过 CLI 手动指定，默认开启
-    :param clean_cache: 清理 redis 缓存数据，对于脏数据，这很有用，默认关闭
+    :param clean_cache: 清理缓存数据，对于脏数据，这很有用，默认关闭
     :param pydantic_verify: 用例数据完整架构 pydantic 快速检测, 默认开启
     :param args: pytest 运行参数
     :param log_level: 控制台打印输出级别, 默认"-s"
@@ -205,6 +212,7 @@ def run(
     :param strict_markers: markers 严格模式, 对于设置 marker 装饰器的用例, 如果 marker 未在 pytest.ini 注册, 用例将报错
     :param capture: 避免在使用输出模式为"v"和"s"时，html报告中的表格日志为空的情况, 默认开启
     :param disable_warnings: 关闭控制台警告信息, 默认开启
+    :param workers: 用例并发进程数, 大于 1 时通过 pytest-xdist 并发执行, 相互关联的用例在同一进程中执行, 默认为 1
     :param kwargs: pytest 运行关键字参数
     :return:
     """
@@ -224,10 +232,14 @@ def run(
         Version: {__version__}
         """
         log.info(banner)
-        redis_client.init()
+        if workers > 1:
+            # 缺少并发依赖时在初始化用例数据前终止运行
+            get_xdist_args(workers)
+        storage_client.init()
         case_data.clean_cache_data(clean_cache)
         case_data.case_data_init(pydantic_verify)
         case_data.case_id_unique_verify()
+        case_data.case_relate_verify()
         if testcase_generate:
             if not testcase_re_generation:
                 auto_generate_testcases()
@@ -247,6 +259,7 @@ def run(
             strict_markers=strict_markers,
             capture=capture,
             disable_warnings=disable_warnings,
+            workers=workers,
             **kwargs,
         )
     except Exception as e:
@@ -26,6 +26,7 @@ class ConfigRequestData(BaseModel):
     timeout: int | None = Field(None, ge=0)
     verify: bool | None = None
     redirects: bool | None = None
+    http2: bool | None = None
     proxies: dict[Literal['http', 'https', 'http://', 'https://'], AnyHttpUrl | None] | None = None
 
 
@@ -36,6 +37,13 @@ class Config(BaseModel):
     mark: list[str] | None = None
 
 
+class StepsRequestDownloadData(BaseModel):
+    save: bool = False
+    hash: str | None = 'sha256'
+    max_size: int | None = Field(None, gt=0)
+    chunk_size: int = Field(65536, gt=0)
+
+
 class StepsRequestData(BaseModel):
     method: Literal['GET', 'POST', 'PUT', 'DELETE', 'PATCH']
     url: str
@@ -45,6 +53,7 @@ class StepsRequestData(BaseModel):
     body_type: Literal['form', 'x_form', 'binary', 'GraphQL', 'text', 'js', 'json', 'html', 'xml'] | None
     body: Any | None
     files: dict[str, str | list[str]] | None
+    download: StepsRequestDownloadData | None = None
 
 
 class SetupTestCaseRequest(BaseModel):
@@ -127,6 +136,17 @@ class TeardownRegexAssertData(BaseModel):
     jsonpath: str
 
 
+class TeardownPollData(BaseModel):
+    timeout: float
+    interval: float | None = None
+    backoff: float | None = None
+    max_interval: float | None = None
+    request: bool | None = None
+    assert_: list[
+        str | TeardownJsonAssertData | TeardownSqlAssertData | TeardownJsonSchemaAssertData | TeardownRegexAssertData
+    ] = Field(alias='assert')
+
+
 class StepsTearDownData(BaseModel):
     sql: str | SetupSqlData | None = None
     hook: str | None = None
@@ -140,6 +160,7 @@ class StepsTearDownData(BaseModel):
         | None
     ) = Field(None, alias='assert')
     wait_time: int | None = None
+    poll: TeardownPollData | None = None
 
 
 class Steps(BaseModel):
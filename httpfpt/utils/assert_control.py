@@ -3,21 +3,26 @@ from __future__ import annotations
 import re
 
 from decimal import Decimal
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from jsonpath import findall
-from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 from httpfpt.common.errors import AssertSyntaxError, JsonPathFindError
 from httpfpt.common.log import log
+from httpfpt.core.get_conf import httpfpt_config
 from httpfpt.db.mysql import mysql_client
 from httpfpt.enums.assert_type import AssertType
 from httpfpt.enums.sql_type import SqlType
+from httpfpt.utils.code_assert import compile_code_assert
+from httpfpt.utils.jsonpath_query import findall
+from httpfpt.utils.jsonschema_validator import jsonschema_validator_cache, openapi_response_schema
+
+if TYPE_CHECKING:
+    from httpfpt.utils.request.response_data import ResponseData
 
 
 class Asserter:
-    def _code_asserter(self, response: dict, assert_text: str) -> None:
+    def _code_asserter(self, response: ResponseData, assert_text: str) -> None:
         """
         **代码断言器, 像 pytest 断言一样使用它**
 
@@ -46,7 +51,22 @@ class Asserter:
                 'result': {},
                 'content': {},
                 'text': {},
-                'stat': {'execute_time': 'None'},
+                'stat': {
+                    'execute_time': 'None',
+                    'http_version': 'None',
+                    'timing': {
+                        'dns',
+                        'connect',
+                        'tls',
+                        'ttfb',
+                        'download',
+                        'total',
+                        'parse',
+                        'setup',
+                        'teardown',
+                        'assert',
+                    },
+                },
                 'sql_data': {},
             }
 
@@ -64,7 +84,7 @@ class Asserter:
         log.info(f'执行 code 断言：{assert_text}')
         self._exec_code_assert(response, assert_text)
 
-    def _json_asserter(self, response: dict, assert_text: dict) -> None:
+    def _json_asserter(self, response: ResponseData, assert_text: dict) -> None:
         """
         **json 提取断言器**
 
@@ -97,7 +117,7 @@ class Asserter:
         except KeyError as e:
             raise AssertSyntaxError(f'json 断言格式错误, 请检查: {e}')
         else:
-            response_value = findall(assert_jsonpath, response)
+            response_value = response.jsonpath_findall(assert_jsonpath)
             if response_value:
                 log.info(f'执行 json 断言：{assert_text}')
                 self._exec_json_assert(assert_check, assert_value, assert_type, response_value[0])
@@ -138,7 +158,7 @@ class Asserter:
                 raise JsonPathFindError(f'jsonpath 取值失败, 表达式: {assert_jsonpath}')
 
     @staticmethod
-    def _jsonschema_asserter(response: dict, assert_text: dict) -> None:
+    def _jsonschema_asserter(response: ResponseData, assert_text: dict) -> None:
         """
         **jsonschema 断言器**
 
@@ -161,13 +181,35 @@ class Asserter:
                 raise AssertSyntaxError('jsonschema 断言类型错误，类型必须为 "jsonschema"')
             log.info(f'执行 jsonschema 断言：{assert_text}')
             try:
-                validate(response['json'], assert_jsonschema)
+                jsonschema_validator_cache.validate(response['json'], assert_jsonschema)
             except ValidationError as e:
                 log.error(f'{assert_check or e}')
                 raise e
 
     @staticmethod
-    def _re_asserter(response: dict, assert_text: dict) -> None:
+    def _openapi_asserter(response: ResponseData, method: str) -> None:
+        """
+        **openapi 响应数据断言器**
+
+        按配置的 openapi 文档中对应接口及响应状态码的 schema 校验 json 响应数据, 文档中未定义的接口不校验
+
+        :param response:
+        :param method:
+        :return:
+        """
+        schema = openapi_response_schema.get_schema(
+            httpfpt_config.OPENAPI_RESPONSE_SCHEMA, method, response['url'], response['status_code']
+        )
+        if schema is None:
+            return
+        log.info(f'执行 openapi 响应数据断言：{schema["$ref"]}')
+        try:
+            jsonschema_validator_cache.validate(response['json'], schema)
+        except ValidationError as e:
+            raise AssertionError(f'响应数据不符合 openapi 文档定义: {e.message}, 路径: {e.json_path}')
+
+    @staticmethod
+    def _re_asserter(response: ResponseData, assert_text: dict) -> None:
         """
         **正则断言器**
 
@@ -187,7 +229,7 @@ class Asserter:
         else:
             if assert_type != 're':
                 raise AssertSyntaxError('正则断言类型错误，类型必须为 "re"')
-            response_value = findall(assert_jsonpath, response)
+            response_value = response.jsonpath_findall(assert_jsonpath)
             if response_value:
                 log.info(f'执行 re 断言：{assert_text}')
                 result = re.match(assert_pattern, str(response_value[0]))
@@ -198,7 +240,7 @@ class Asserter:
                 raise JsonPathFindError(f'jsonpath 取值失败, 表达式: {assert_jsonpath}')
 
     @staticmethod
-    def _exec_code_assert(response: dict, assert_text: str) -> None:
+    def _exec_code_assert(response: ResponseData, assert_text: str) -> None:
         """
         执行 code 断言
 
@@ -206,103 +248,12 @@ class Asserter:
         :param assert_text:
         :return:
         """
-        assert_split = assert_text.split(' ')
-        if not assert_text.startswith('assert '):
-            raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
-        if len(assert_split) < 4 or len(assert_split) > 6:
-            raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
-        else:
-
-            def exec_assertion() -> None:
-                """执行断言（闭包函数）"""
-                get_code = pm_code.split('.')[2:]
-                if len(get_code) == 1:
-                    use_code = get_code[0]
-                else:
-                    use_code = '.'.join(get_code)
-                # 如果断言有转型
-                if use_code.endswith('))'):
-                    use_code = use_code.replace('))', ')')
-                if not use_code.startswith('get('):
-                    raise AssertSyntaxError(
-                        'code 断言取值表达式格式错误, 取值表达式条件不允许, 请在首位改用 get() 方法取值'
-                    )
-                else:
-                    try:
-                        response_value = eval(f'{response}.{use_code}')
-                    except Exception as e:
-                        err_msg = str(e.args).replace("'", '"').replace('\\', '')
-                        raise AssertSyntaxError(f'code 断言取值表达式格式错误, {use_code} 取值失败, 详情: {err_msg}')
-                    else:
-                        # 执行断言
-                        py_conversion_functions_exec_re = re.compile(
-                            rf'(\b(?:{py_conversion_functions_re_str}))\((.*?)\)(?=[^)]*$)'  # noqa: ignore
-                        )
-                        format_assert_text = py_conversion_functions_exec_re.sub(
-                            lambda x: x.group(1) + f'("""{response_value}""")', assert_text
-                        )
-                        if 'pm.response.get' in format_assert_text:
-                            format_assert_text = format_assert_text.replace(pm_code, '{}', 1).format(response_value)
-                        if len(assert_split) == 4:
-                            # stdout 作为没有自定义断言错误时的信息补充
-                            # 当断言错误触发时, 如果错误信息中包含自定义错误, 此项可忽略
-                            log.warning('此 code 断言未自定义错误提示信息')
-                        if dirty_equals_assert:
-                            exec('from dirty_equals import *')
-                        exec(format_assert_text)
-
-            py_conversion_functions_re_str = 'str|int|float|bool|list|tuple|set|dict'
-            py_conversion_functions_pm_get_re = re.compile(rf'^({py_conversion_functions_re_str})\(pm\.response\.get')
-            # 是否 dirty-equals 断言表达式
-            dirty_equals_assert = True
-            if not assert_split[1].startswith('pm.response.get'):
-                if not py_conversion_functions_pm_get_re.match(assert_split[1]):
-                    dirty_equals_assert = False
-            if dirty_equals_assert:
-                if assert_split[2] not in ['==', '!=']:
-                    raise AssertSyntaxError(
-                        f'code 断言取值表达式格式错误, 含有不支持的 dirty-equals 断言类型 {assert_split[2]}'
-                    )
-                # 处理比较值获取代码
-                pm_code = assert_split[1]
-                # 执行断言
-                exec_assertion()
-            else:
-                assert_expr_type = ['==', '!=', '>', '<', '>=', '<=', 'in', 'not']
-                if assert_split[2] not in assert_expr_type:
-                    raise AssertSyntaxError(
-                        f'code 断言表达式格式错误, 含有不支持的断言类型: {assert_split[2]}, 仅支持: {assert_expr_type}'
-                    )
-                else:
-                    if assert_split[2] == 'not':
-                        if assert_split[3] != 'in':
-                            raise AssertSyntaxError(
-                                f'code 断言表达式格式错误, 含有不支持的断言类型: {" ".join(assert_split[2:4])}'
-                            )
-                        else:
-                            if not assert_split[4].startswith('pm.response.get'):
-                                if not py_conversion_functions_pm_get_re.match(assert_split[4]):
-                                    raise AssertSyntaxError(
-                                        f'code 断言取值表达式格式错误, 含有不支持的断言取值表达式: {assert_split[4]}'
-                                    )
-                            # 如果包含自定义错误信息
-                            if len(assert_split) == 6:
-                                pm_code = assert_split[4].replace(',', '')
-                            else:
-                                pm_code = assert_split[4]
-                    else:
-                        # 非 dirty-equals 或 not in 断言表达式
-                        if not assert_split[3].startswith('pm.response.get'):
-                            if not py_conversion_functions_pm_get_re.match(assert_split[3]):
-                                raise AssertSyntaxError(
-                                    f'code 断言取值表达式格式错误, 含有不支持的断言取值表达式: {assert_split[3]}'
-                                )
-                        if len(assert_split) == 5:
-                            pm_code = assert_split[3].replace(',', '')
-                        else:
-                            pm_code = assert_split[3]
-                    # 执行断言
-                    exec_assertion()
+        code_assert = compile_code_assert(assert_text)
+        if not code_assert.has_msg:
+            # stdout 作为没有自定义断言错误时的信息补充
+            # 当断言错误触发时, 如果错误信息中包含自定义错误, 此项可忽略
+            log.warning('此 code 断言未自定义错误提示信息')
+        code_assert.execute(response)
 
     @staticmethod
     def _exec_json_assert(assert_check: str | None, expected_value: Any, assert_type: str, actual_value: Any) -> None:
@@ -405,7 +356,18 @@ class Asserter:
         else:
             raise ValueError(f'断言表达式格式错误, 含有不支持的断言类型: {assert_type}')
 
-    def exec_asserter(self, response: dict, assert_text: str | dict | None) -> None:
+    def exec_openapi_asserter(self, response: ResponseData, method: str) -> None:
+        """
+        配置了 openapi 文档时, 按文档校验 json 响应数据
+
+        :param response:
+        :param method:
+        :return:
+        """
+        if httpfpt_config.OPENAPI_RESPONSE_SCHEMA and not response.get('download'):
+            self._openapi_asserter(response, method)
+
+    def exec_asserter(self, response: ResponseData, assert_text: str | dict | None) -> None:
         """
         根据断言内容自动选择断言器执行
 
@@ -4,14 +4,13 @@ from functools import lru_cache
 
 import requests
 
-from jsonpath import findall
-
 from httpfpt.common.errors import AuthError, SendRequestError
 from httpfpt.common.yaml_handler import read_yaml
 from httpfpt.core.path_conf import httpfpt_path
-from httpfpt.db.redis import redis_client
+from httpfpt.db.storage import storage_client
 from httpfpt.enums.request.auth import AuthType
 from httpfpt.utils.enum_control import get_enum_values
+from httpfpt.utils.jsonpath_query import findall
 
 
 class AuthPlugins:
@@ -56,7 +55,7 @@ class AuthPlugins:
 
     @property
     def bearer_token(self) -> str:
-        cache_bearer_token = redis_client.get(f'{redis_client.token_prefix}:bearer_token', logging=False)
+        cache_bearer_token = storage_client.get(f'{storage_client.token_prefix}:bearer_token', logging=False)
         if cache_bearer_token:
             token = cache_bearer_token
         else:
@@ -65,22 +64,24 @@ class AuthPlugins:
             token = jp_token[0]
             if not token:
                 raise AuthError('Token 获取失败，请检查登录接口响应或 token 提取表达式')
-            redis_client.set(f'{redis_client.token_prefix}:bearer_token', token, ex=self.timeout)
+            storage_client.set(f'{storage_client.token_prefix}:bearer_token', token, ex=self.timeout)
         return token
 
     @property
     def bearer_token_custom(self) -> str:
-        cache_bearer_token_custom = redis_client.get(f'{redis_client.token_prefix}:bearer_token_custom', logging=False)
+        cache_bearer_token_custom = storage_client.get(
+            f'{storage_client.token_prefix}:bearer_token_custom', logging=False
+        )
         if cache_bearer_token_custom:
             token = cache_bearer_token_custom
         else:
             token = self.auth_data[f'{self.auth_type}']['token']
-            redis_client.set(f'{redis_client.token_prefix}:bearer_token_custom', token, ex=self.timeout)
+            storage_client.set(f'{storage_client.token_prefix}:bearer_token_custom', token, ex=self.timeout)
         return token
 
     @property
     def header_cookie(self) -> dict:
-        cache_cookie = redis_client.get(f'{redis_client.cookie_prefix}:header_cookie', logging=False)
+        cache_cookie = storage_client.get(f'{storage_client.cookie_prefix}:header_cookie', logging=False)
         if cache_cookie:
             cookies = json.loads(cache_cookie)
         else:
@@ -89,8 +90,10 @@ class AuthPlugins:
             cookies = {k: v for k, v in res_cookie.items()}
             if not cookies:
                 raise AuthError('Cookie 获取失败，请检查登录接口响应')
-            redis_client.set(
-                f'{redis_client.cookie_prefix}:header_cookie', json.dumps(cookies, ensure_ascii=False), ex=self.timeout
+            storage_client.set(
+                f'{storage_client.cookie_prefix}:header_cookie',
+                json.dumps(cookies, ensure_ascii=False),
+                ex=self.timeout,
             )
         return cookies
 
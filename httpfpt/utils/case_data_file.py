@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import pathlib
+import sys
+import threading
+
+from typing import Any, Callable, Iterable
+
+import yaml
+
+from httpfpt.common.log import log
+from httpfpt.common.yaml_handler import CASE_YAML_LOADER
+from httpfpt.core.path_conf import httpfpt_path
+from httpfpt.enums.case_data_type import CaseDataType
+from httpfpt.utils.file_control import get_file_property
+
+# 快照格式与解释器版本相关, 版本变化时快照失效
+_SNAPSHOT_VERSION = f'{marshal.version}-{sys.version_info[0]}.{sys.version_info[1]}'
+
+
+class CaseDataFileLoader:
+    """
+    用例数据文件加载器
+
+    yaml 文件解析结果以二进制快照缓存到磁盘, 以文件内容 hash 为键, 文件未变更时直接加载快照, 无需重新解析 yaml,
+    yaml 文件使用 safe 加载器解析, 不支持 python 标签, 已变更或删除文件的快照在重新加载用例数据时清理
+    """
+
+    @property
+    def snapshot_dir(self) -> str:
+        return os.path.join(httpfpt_path.cache_dir, 'case_snapshot')
+
+    def _snapshot_path(self, file_hash: str) -> str:
+        return os.path.join(self.snapshot_dir, f'{file_hash}.{_SNAPSHOT_VERSION}.bin')
+
+    def _load_snapshot(self, file_hash: str) -> dict | None:
+        try:
+            with open(self._snapshot_path(file_hash), 'rb') as f:
+                return marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f'用例数据快照 {file_hash} 读取失败, 将重新解析: {e}')
+            return None
+
+    def _dump_snapshot(self, file_hash: str, data: dict) -> None:
+        try:
+            snapshot = marshal.dumps(data)
+        except ValueError:
+            # 包含日期等无法序列化的数据时不缓存快照
+            return
+        filepath = self._snapshot_path(file_hash)
+        tmp_filepath = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            pathlib.Path(tmp_filepath).write_bytes(snapshot)
+            os.replace(tmp_filepath, filepath)
+        except OSError as e:
+            log.warning(f'用例数据快照 {file_hash} 持久化失败: {e}')
+
+    def evict(self, file_hashes: Iterable[str]) -> None:
+        """
+        清理不属于当前用例数据文件的快照
+
+        :param file_hashes: 当前所有用例数据文件的 hash
+        :return:
+        """
+        snapshots = {os.path.basename(self._snapshot_path(file_hash)) for file_hash in file_hashes}
+        try:
+            filenames = os.listdir(self.snapshot_dir)
+        except FileNotFoundError:
+            return
+        for filename in filenames:
+            if filename.endswith('.bin') and filename not in snapshots:
+                try:
+                    os.remove(os.path.join(self.snapshot_dir, filename))
+                except OSError:
+                    pass
+
+    def load(self, filepath: str) -> tuple[dict, str]:
+        """
+        加载用例数据文件, 文件内容只读取一次
+
+        :param filepath:
+        :return: 用例数据, 文件 hash (sha256)
+        """
+        filename, _, file_type = get_file_property(filepath)
+        try:
+            content = pathlib.Path(filepath).read_bytes()
+        except Exception as e:
+            log.error(f'文件 {filename} 读取错误: {e}')
+            raise e
+        file_hash = hashlib.sha256(content).hexdigest()
+        if file_type == CaseDataType.JSON:
+            data = self._parse(filename, lambda: json.loads(content))
+        else:
+            data = self._load_snapshot(file_hash)
+            if data is None:
+                data = self._parse(filename, lambda: yaml.load(content, Loader=CASE_YAML_LOADER))
+                self._dump_snapshot(file_hash, data)
+        return data, file_hash
+
+    @staticmethod
+    def _parse(filename: str, parser: Callable[[], Any]) -> dict:
+        try:
+            data = parser()
+        except Exception as e:
+            log.error(f'文件 {filename} 读取错误: {e}')
+            raise e
+        if data is None:
+            log.warning(f'数据文件 {filename} 没有数据!')
+            raise ValueError(f'数据文件 {filename} 没有数据! 请检查数据文件内容是否正确!')
+        return data
+
+
+case_data_file_loader = CaseDataFileLoader()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import copy
+import json
+import threading
+
+from httpfpt.db.storage import storage_client
+
+
+class CaseIndex:
+    """
+    会话级测试用例索引, case_id 映射到该用例所在文件的用例数据
+
+    首次使用时从存储中一次性加载, 之后的查找均在内存中完成
+    """
+
+    def __init__(self) -> None:
+        self._index: dict[str, dict] | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build() -> dict[str, dict]:
+        index = {}
+        for data in storage_client.get_prefix(f'{storage_client.case_data_prefix}:'):
+            case_data = json.loads(data)
+            steps = case_data['test_steps']
+            for step in steps if isinstance(steps, list) else [steps]:
+                index[step['case_id']] = {**case_data, 'test_steps': step}
+        return index
+
+    @property
+    def index(self) -> dict[str, dict]:
+        index = self._index
+        if index is None:
+            with self._lock:
+                index = self._index
+                if index is None:
+                    index = self._index = self._build()
+        return index
+
+    def __contains__(self, case_id: str) -> bool:
+        return case_id in self.index
+
+    def get(self, case_id: str) -> dict | None:
+        """
+        获取用例数据, test_steps 为该用例的步骤
+
+        :param case_id:
+        :return:
+        """
+        data = self.index.get(case_id)
+        # 返回独立副本, 调用方可任意修改
+        return copy.deepcopy(data) if data is not None else None
+
+    def clear(self) -> None:
+        """
+        清空索引, 下次使用时重新加载
+
+        :return:
+        """
+        with self._lock:
+            self._index = None
+
+
+case_index = CaseIndex()
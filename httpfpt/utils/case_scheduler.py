@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from httpfpt.common.errors import CorrelateTestCaseError
+from httpfpt.db.storage import storage_client
+from httpfpt.enums.setup_type import SetupType
+
+if TYPE_CHECKING:
+    from _pytest.nodes import Item
+
+
+def get_relate_case_ids(test_steps: dict) -> list[str]:
+    """
+    获取测试用例前置中关联的测试用例 case_id
+
+    :param test_steps:
+    :return:
+    """
+    relate_case_ids = []
+    setup = test_steps.get('setup')
+    if setup:
+        for item in setup:
+            for key, value in item.items():
+                if key == SetupType.TESTCASE:
+                    if isinstance(value, str):
+                        relate_case_ids.append(value)
+                    elif isinstance(value, dict):
+                        relate_case_ids.append(value['case_id'])
+    return relate_case_ids
+
+
+def build_case_dag(case_data_list: list[dict]) -> tuple[dict[str, dict], dict[str, list[str]]]:
+    """
+    构建测试用例依赖图
+
+    :param case_data_list: 测试用例数据文件内容列表
+    :return: (case_id: 用例数据, case_id: 上游 case_id 列表)
+    """
+    cases: dict[str, dict] = {}
+    dag: dict[str, list[str]] = {}
+    for case_data in case_data_list:
+        config = case_data['config']
+        steps = case_data['test_steps']
+        for step in steps if isinstance(steps, list) else [steps]:
+            case_id = step['case_id']
+            cases[case_id] = {'config': config, 'test_steps': step}
+            dag[case_id] = get_relate_case_ids(step)
+    return cases, dag
+
+
+def find_circular_relate(dag: dict[str, list[str]]) -> list[str] | None:
+    """
+    查找任意深度的循环关联
+
+    :param dag:
+    :return: 循环关联路径, 不存在时返回 None
+    """
+    visiting, visited = 1, 2
+    state: dict[str, int] = {}
+    for root in dag:
+        if root in state:
+            continue
+        path = [root]
+        stack = [iter(dag.get(root, []))]
+        state[root] = visiting
+        while stack:
+            upstream = next(stack[-1], None)
+            if upstream is None:
+                state[path.pop()] = visited
+                stack.pop()
+                continue
+            if upstream not in dag:
+                # 不存在的关联用例由执行时校验
+                continue
+            if state.get(upstream) == visiting:
+                return path[path.index(upstream) :] + [upstream]
+            if upstream not in state:
+                state[upstream] = visiting
+                path.append(upstream)
+                stack.append(iter(dag[upstream]))
+    return None
+
+
+def circular_relate_verify(dag: dict[str, list[str]]) -> None:
+    """
+    循环关联校验
+
+    :param dag:
+    :return:
+    """
+    circular = find_circular_relate(dag)
+    if circular:
+        raise CorrelateTestCaseError(f'测试用例存在循环关联: {" -> ".join(circular)}')
+
+
+def get_case_groups(dag: dict[str, list[str]]) -> dict[str, str]:
+    """
+    按关联关系对测试用例分组, 相互关联的用例属于同一组
+
+    :param dag:
+    :return: case_id: 组名, 未关联其他用例的用例不分组
+    """
+    parent: dict[str, str] = {}
+
+    def find(case_id: str) -> str:
+        root = case_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        parent[case_id] = root
+        return root
+
+    for case_id, upstream in dag.items():
+        for u in upstream:
+            if u in dag:
+                a, b = sorted((find(case_id), find(u)))
+                parent[b] = a
+    groups = {}
+    for case_id in parent:
+        groups[case_id] = find(case_id)
+    return groups
+
+
+def get_xdist_args(workers: int) -> list[str]:
+    """
+    获取多进程并发执行测试用例的 pytest 参数, 相互关联的用例在同一进程中按收集顺序执行
+
+    :param workers: 并发数
+    :return:
+    """
+    if workers < 1:
+        raise ValueError('并发数不能小于 1')
+    try:
+        import xdist  # noqa: F401
+    except ImportError:
+        raise ImportError('并发执行测试用例失败，缺少 pytest-xdist 依赖，请执行: pip install httpfpt[xdist]')
+    return ['-n', str(workers), '--dist', 'loadgroup']
+
+
+def add_case_group_marks(items: list[Item]) -> None:
+    """
+    为相互关联的数据驱动测试用例添加 xdist_group 标记
+
+    :param items:
+    :return:
+    """
+    _, dag = build_case_dag(
+        [json.loads(data) for data in storage_client.get_prefix(f'{storage_client.case_data_prefix}:')]
+    )
+    groups = get_case_groups(dag)
+    for item in items:
+        callspec = getattr(item, 'callspec', None)
+        case_data = callspec.params.get('case_data') if callspec is not None else None
+        if not isinstance(case_data, dict):
+            continue
+        group = groups.get(case_data.get('test_steps', {}).get('case_id'))
+        if group is not None:
+            item.add_marker(pytest.mark.xdist_group(name=group))
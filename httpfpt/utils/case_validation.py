@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+
+from functools import lru_cache
+
+from pydantic import ValidationError
+
+from httpfpt import __version__
+from httpfpt.common.log import log
+from httpfpt.core.path_conf import httpfpt_path
+from httpfpt.schemas.case_data import CaseData
+
+
+@lru_cache(maxsize=None)
+def get_schema_version() -> str:
+    """
+    获取用例数据架构版本, 架构定义变化时随之变化
+
+    :return:
+    """
+    schema = json.dumps(CaseData.model_json_schema(), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(schema.encode('utf-8')).hexdigest()[:16]
+
+
+class CaseValidationCache:
+    """
+    用例数据校验结果缓存, 持久化到磁盘, 运行用例与 CLI 验证共用
+
+    以文件 hash、数据架构版本及 httpfpt 版本作为校验键, 仅记录校验通过的文件, 键不变的文件无需重复校验
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def filepath(self) -> str:
+        return os.path.join(httpfpt_path.cache_dir, 'case_validation.json')
+
+    @staticmethod
+    def get_key(file_hash: str) -> str:
+        """
+        获取校验键
+
+        :param file_hash:
+        :return:
+        """
+        return f'{file_hash}:{get_schema_version()}:{__version__}'
+
+    def _read(self) -> dict[str, str]:
+        try:
+            with open(self.filepath, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f'用例数据校验结果缓存读取失败, 将重新校验: {e}')
+            return {}
+
+    @property
+    def results(self) -> dict[str, str]:
+        results = self._results
+        if results is None:
+            with self._lock:
+                results = self._results
+                if results is None:
+                    results = self._results = self._read()
+        return results
+
+    def is_valid(self, filepath: str, key: str) -> bool:
+        """
+        文件是否已通过校验
+
+        :param filepath:
+        :param key:
+        :return:
+        """
+        return self.results.get(os.path.abspath(filepath)) == key
+
+    def validate(self, filepath: str, case_data: dict, file_hash: str) -> tuple[str | None, int, str | None]:
+        """
+        校验用例数据, 已通过校验且未变更的文件直接跳过
+
+        :param filepath:
+        :param case_data:
+        :param file_hash:
+        :return: 错误详情, 错误数量, 本次新校验通过的校验键
+        """
+        key = self.get_key(file_hash)
+        if self.is_valid(filepath, key):
+            return None, 0, None
+        try:
+            CaseData.model_validate(case_data)
+        except ValidationError as e:
+            return str(e), e.error_count(), None
+        return None, 0, key
+
+    def update(self, passed: dict[str, str], failed: list[str] | None = None) -> None:
+        """
+        记录校验结果并持久化
+
+        :param passed: 校验通过的文件路径及校验键
+        :param failed: 校验失败的文件路径
+        :return:
+        """
+        if not passed and not failed:
+            return
+        with self._lock:
+            # 合并其他进程写入的结果
+            results = {**self._read(), **(self._results or {})}
+            results.update({os.path.abspath(k): v for k, v in passed.items()})
+            for filepath in failed or []:
+                results.pop(os.path.abspath(filepath), None)
+            # 清理已删除文件的校验结果
+            results = {k: v for k, v in results.items() if os.path.exists(k)}
+            self._results = results
+            tmp_filepath = f'{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                os.makedirs(httpfpt_path.cache_dir, exist_ok=True)
+                pathlib.Path(tmp_filepath).write_text(json.dumps(results, ensure_ascii=False), encoding='utf-8')
+                os.replace(tmp_filepath, self.filepath)
+            except OSError as e:
+                log.warning(f'用例数据校验结果缓存持久化失败: {e}')
+
+
+case_validation_cache = CaseValidationCache()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import ast
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import dirty_equals
+
+from httpfpt.common.errors import AssertSyntaxError
+
+if TYPE_CHECKING:
+    from types import CodeType
+
+    from httpfpt.utils.request.response_data import ResponseData
+
+_CONVERSION_FUNCTIONS: dict[str, Any] = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'list': list,
+    'tuple': tuple,
+    'set': set,
+    'dict': dict,
+}
+
+_DIRTY_EQUALS: dict[str, Any] = {name: getattr(dirty_equals, name) for name in dirty_equals.__all__}
+
+_COMPARE_OPS: dict[type[ast.cmpop], str] = {
+    ast.Eq: '==',
+    ast.NotEq: '!=',
+    ast.Gt: '>',
+    ast.Lt: '<',
+    ast.GtE: '>=',
+    ast.LtE: '<=',
+    ast.In: 'in',
+    ast.NotIn: 'not in',
+}
+
+_ALLOWED_NODES = (
+    ast.Compare,
+    ast.Call,
+    ast.keyword,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+    ast.Set,
+    ast.Dict,
+    ast.UnaryOp,
+    ast.USub,
+    ast.UAdd,
+    ast.Not,
+    *_COMPARE_OPS,
+)
+
+# 可借助格式化字符串访问对象内部属性, 不允许调用
+_DENIED_ATTRS = frozenset({'format', 'format_map'})
+
+# 断言中取值表达式的替换名称, 用户表达式中不允许使用下划线开头的名称
+_VALUE_NAME = '_pm_value'
+
+_FILENAME = '<code assert>'
+
+# 断言执行命名空间, 仅包含转型函数及 dirty-equals 类型, 不含任何内置函数
+_NAMESPACE: dict[str, Any] = {'__builtins__': {}, **_CONVERSION_FUNCTIONS, **_DIRTY_EQUALS}
+
+
+class _Pm:
+    """取值表达式中的 pm 对象"""
+
+    __slots__ = ('response',)
+
+    def __init__(self, response: ResponseData) -> None:
+        self.response = response
+
+
+@dataclass(frozen=True)
+class CodeAssert:
+    """已编译的 code 断言"""
+
+    text: str
+    # 取值表达式, 如 pm.response.get('status_code')
+    value_expr: str
+    value_code: CodeType
+    assert_code: CodeType
+    has_msg: bool
+
+    def get_value(self, response: ResponseData) -> Any:
+        """
+        从响应数据中获取取值表达式的值
+
+        :param response:
+        :return:
+        """
+        try:
+            return eval(self.value_code, _NAMESPACE, {'pm': _Pm(response)})
+        except Exception as e:
+            err_msg = str(e.args).replace("'", '"').replace('\\', '')
+            raise AssertSyntaxError(f'code 断言取值表达式格式错误, {self.value_expr} 取值失败, 详情: {err_msg}')
+
+    def execute(self, response: ResponseData) -> None:
+        """
+        执行断言, 断言失败时抛出 AssertionError
+
+        :param response:
+        :return:
+        """
+        exec(self.assert_code, _NAMESPACE, {_VALUE_NAME: self.get_value(response)})
+
+
+def _is_pm_get(node: ast.expr) -> bool:
+    """是否以 pm.response.get() 开头的取值表达式"""
+    while isinstance(node, (ast.Call, ast.Attribute, ast.Subscript)):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == 'get'
+            and isinstance(node.func.value, ast.Attribute)
+            and node.func.value.attr == 'response'
+            and isinstance(node.func.value.value, ast.Name)
+            and node.func.value.value.id == 'pm'
+        ):
+            return True
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return False
+
+
+def _is_value_expr(node: ast.expr) -> bool:
+    """是否为取值表达式, 允许使用转型函数包裹"""
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _CONVERSION_FUNCTIONS
+        and len(node.args) == 1
+        and not node.keywords
+    ):
+        node = node.args[0]
+    return _is_pm_get(node)
+
+
+def _check_nodes(node: ast.AST, names: frozenset[str] | set[str], text: str) -> None:
+    """检查表达式仅包含允许的语法及名称"""
+    for child in ast.walk(node):
+        if not isinstance(child, _ALLOWED_NODES):
+            raise AssertSyntaxError(f'code 断言表达式格式错误, 含有不支持的语法 {type(child).__name__}: {text}')
+        if isinstance(child, ast.Name) and child.id not in names:
+            raise AssertSyntaxError(f'code 断言表达式格式错误, 含有不支持的名称 {child.id}: {text}')
+        if isinstance(child, ast.Attribute) and (child.attr.startswith('_') or child.attr in _DENIED_ATTRS):
+            raise AssertSyntaxError(f'code 断言表达式格式错误, 含有不支持的属性 {child.attr}: {text}')
+
+
+@lru_cache(maxsize=1024)
+def compile_code_assert(assert_text: str) -> CodeAssert:
+    """
+    编译 code 断言, 相同断言内容只编译一次
+
+    断言表达式解析为语法树并校验, 仅允许比较、字面量、转型函数、dirty-equals 类型
+    及以 pm.response.get() 开头的取值表达式, 执行时直接从响应数据中取值, 不执行任意代码
+
+    :param assert_text:
+    :return:
+    """
+    if not assert_text.startswith('assert '):
+        raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
+    try:
+        module = ast.parse(assert_text.strip())
+    except SyntaxError:
+        raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
+    if len(module.body) != 1 or not isinstance(module.body[0], ast.Assert):
+        raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
+    assert_node = module.body[0]
+    test = assert_node.test
+    if not isinstance(test, ast.Compare) or len(test.ops) != 1:
+        raise AssertSyntaxError(f'code 断言取值表达式格式错误, 不符合语法规范: {assert_text}')
+    op = type(test.ops[0])
+    if op not in _COMPARE_OPS:
+        raise AssertSyntaxError(
+            f'code 断言表达式格式错误, 含有不支持的断言类型: {type(test.ops[0]).__name__}, '
+            f'仅支持: {list(_COMPARE_OPS.values())}'
+        )
+    if _is_value_expr(test.left):
+        value_node, other_node = test.left, test.comparators[0]
+    elif _is_value_expr(test.comparators[0]):
+        value_node, other_node = test.comparators[0], test.left
+    else:
+        raise AssertSyntaxError(
+            f'code 断言取值表达式格式错误, 含有不支持的断言取值表达式, 请以 pm.response.get() 开头: {assert_text}'
+        )
+    _check_nodes(value_node, {'pm', *_CONVERSION_FUNCTIONS}, assert_text)
+    other_names = set(_CONVERSION_FUNCTIONS)
+    if any(isinstance(n, ast.Name) and n.id in _DIRTY_EQUALS for n in ast.walk(other_node)):
+        if op not in (ast.Eq, ast.NotEq):
+            raise AssertSyntaxError(
+                f'code 断言取值表达式格式错误, 含有不支持的 dirty-equals 断言类型 {_COMPARE_OPS[op]}'
+            )
+        other_names.update(_DIRTY_EQUALS)
+    _check_nodes(other_node, other_names, assert_text)
+    if assert_node.msg is not None:
+        _check_nodes(assert_node.msg, set(), assert_text)
+
+    value_name = ast.copy_location(ast.Name(id=_VALUE_NAME, ctx=ast.Load()), value_node)
+    if value_node is test.left:
+        test.left = value_name
+    else:
+        test.comparators[0] = value_name
+    return CodeAssert(
+        text=assert_text,
+        value_expr=ast.unparse(value_node),
+        value_code=compile(ast.Expression(body=value_node), _FILENAME, 'eval'),
+        assert_code=compile(module, _FILENAME, 'exec'),
+        has_msg=assert_node.msg is not None,
+    )
@@ -3,11 +3,9 @@ import shutil
 
 from pydantic import ValidationError
 
-from httpfpt.common.json_handler import read_json_file
-from httpfpt.common.yaml_handler import read_yaml
-from httpfpt.enums.case_data_type import CaseDataType
 from httpfpt.schemas.case_data import CaseData
-from httpfpt.utils.file_control import get_file_property, search_all_case_data_files
+from httpfpt.utils.case_data_file import case_data_file_loader
+from httpfpt.utils.file_control import search_all_case_data_files
 from httpfpt.utils.pydantic_parser import parse_error
 from httpfpt.utils.rich_console import console
 
@@ -46,11 +44,7 @@ class GitRepoPaser:
             raise FileNotFoundError('❌ 未在拉取的 Git 仓库中找到测试用例数据文件，请检查 Git 地址是否正确')
         all_case_data = []
         for file in all_case_data_file:
-            file_type = get_file_property(file)[2]
-            if file_type == CaseDataType.JSON:
-                file_data = read_json_file(file)
-            else:
-                file_data = read_yaml(file)
+            file_data, _ = case_data_file_loader.load(file)
             all_case_data.append(file_data)
         count: int = 0
         for case_data in all_case_data:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+
+from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from jsonpath import compile as jsonpath_compile
+
+if TYPE_CHECKING:
+    from jsonpath import CompoundJSONPath, JSONPath
+
+# 简单路径片段: .name / [index] / ['name'] / ["name"]
+_SIMPLE_SEGMENT_RE = re.compile(r"""\.([A-Za-z_][\w-]*)|\[(-?\d+)]|\['([^'\\]*)']|\["([^"\\]*)"]""")
+
+# 简单路径片段, 字符串为名称, 整数为索引
+_Segment = str | int
+
+
+@lru_cache(maxsize=1024)
+def compile_jsonpath(path: str) -> JSONPath | CompoundJSONPath:
+    """
+    编译 jsonpath 表达式, 相同表达式只编译一次
+
+    :param path:
+    :return:
+    """
+    return jsonpath_compile(path)
+
+
+@lru_cache(maxsize=1024)
+def parse_simple_path(path: str) -> tuple[_Segment, ...] | None:
+    """
+    解析仅由名称及索引组成的简单路径, 如 $.data.items[0].id, 其他路径返回 None
+
+    :param path:
+    :return:
+    """
+    if not path.startswith('$'):
+        return None
+    segments: list[_Segment] = []
+    pos = 1
+    while pos < len(path):
+        match = _SIMPLE_SEGMENT_RE.match(path, pos)
+        if match is None:
+            return None
+        name, index, *quoted = match.groups()
+        if index is not None:
+            segments.append(int(index))
+        else:
+            segments.append(next(v for v in (name, *quoted) if v is not None))
+        pos = match.end()
+    return tuple(segments)
+
+
+def _select(node: Any, segment: _Segment) -> tuple[bool, Any]:
+    # 与 jsonpath 的取值规则保持一致: 字典中的索引按字符串键取值, 字符串不视为数组
+    if isinstance(node, Mapping):
+        key = segment if isinstance(segment, str) else str(segment)
+        if key in node:
+            return True, node[key]
+    elif isinstance(segment, int) and isinstance(node, Sequence) and not isinstance(node, str):
+        if -len(node) <= segment < len(node):
+            return True, node[segment]
+    return False, None
+
+
+def _walk(node: Any, trie: dict, results: dict[str, list]) -> None:
+    for segment, (paths, children) in trie.items():
+        found, value = _select(node, segment)
+        if not found:
+            continue
+        for path in paths:
+            results[path] = [value]
+        if children:
+            _walk(value, children, results)
+
+
+def findall(path: str, data: Any) -> list:
+    """
+    获取 jsonpath 表达式匹配的所有值
+
+    :param path:
+    :param data:
+    :return:
+    """
+    return findall_many([path], data)[path]
+
+
+def findall_many(paths: Iterable[str], data: Any) -> dict[str, list]:
+    """
+    获取多个 jsonpath 表达式匹配的值, 简单路径按公共前缀合并, 只遍历数据一次
+
+    :param paths:
+    :param data:
+    :return: 表达式及其匹配的所有值
+    """
+    results: dict[str, list] = {}
+    trie: dict = {}
+    for path in paths:
+        segments = parse_simple_path(path)
+        if segments is None:
+            results[path] = compile_jsonpath(path).findall(data)
+            continue
+        if not segments:
+            results[path] = [data]
+            continue
+        results[path] = []
+        node = trie
+        for segment in segments[:-1]:
+            node = node.setdefault(segment, ([], {}))[1]
+        node.setdefault(segments[-1], ([], {}))[0].append(path)
+    if trie:
+        _walk(data, trie, results)
+    return results
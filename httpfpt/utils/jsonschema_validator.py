@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from typing import TYPE_CHECKING, Any, Iterator
+from urllib.parse import quote, urldefrag, urljoin, urlsplit
+
+from jsonschema import validators
+from jsonschema.exceptions import best_match
+from referencing import Registry, Resource
+from referencing.exceptions import NoSuchResource
+from referencing.jsonschema import DRAFT4, DRAFT202012, specification_with
+
+from httpfpt.common.file_cache import FileCache
+from httpfpt.common.json_handler import read_json_file
+from httpfpt.common.yaml_handler import read_yaml
+from httpfpt.core.path_conf import httpfpt_path
+
+if TYPE_CHECKING:
+    from jsonschema.protocols import Validator
+    from referencing.jsonschema import Specification
+
+_DRAFT4_SCHEMA = 'http://json-schema.org/draft-04/schema#'
+_DRAFT202012_SCHEMA = 'https://json-schema.org/draft/2020-12/schema'
+
+
+def _is_openapi_30(contents: dict) -> bool:
+    # openapi 3.0 及 swagger 2.0 的 schema 基于 draft 4, openapi 3.1 与 draft 2020-12 一致
+    return 'swagger' in contents or str(contents.get('openapi', '')).startswith('3.0')
+
+
+def _translate_nullable(contents: Any) -> Any:
+    """将 openapi 3.0 的 nullable 及 swagger 2.0 的 x-nullable 转换为 draft 4 可校验的 null 类型"""
+    if isinstance(contents, list):
+        return [_translate_nullable(value) for value in contents]
+    if not isinstance(contents, dict):
+        return contents
+    schema = {key: _translate_nullable(value) for key, value in contents.items()}
+    if schema.get('nullable') is not True and schema.get('x-nullable') is not True:
+        return schema
+    schema.pop('nullable')
+    schema.pop('x-nullable', None)
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        schema['type'] = [*types, 'null'] if 'null' not in types else types
+        if isinstance(schema.get('enum'), list) and None not in schema['enum']:
+            schema['enum'] = [*schema['enum'], None]
+        return schema
+    # $ref 及组合关键字无 type 时, draft 4 中 $ref 的同级关键字会被忽略, 需包装为 anyOf
+    return {'anyOf': [schema, {'type': 'null'}]}
+
+
+def _read_schema_file(filepath: str) -> dict:
+    if filepath.endswith(('.yaml', '.yml')):
+        contents = read_yaml(filepath)
+    else:
+        contents = read_json_file(filepath)
+    if isinstance(contents, dict) and _is_openapi_30(contents):
+        return _translate_nullable(contents)
+    return contents
+
+
+_schema_file_cache = FileCache(_read_schema_file)
+
+
+def _get_specification(contents: Any) -> Specification:
+    if isinstance(contents, dict):
+        if _is_openapi_30(contents):
+            return DRAFT4
+        if 'openapi' in contents:
+            return DRAFT202012
+        return specification_with(contents.get('$schema', ''), default=DRAFT202012)
+    return DRAFT202012
+
+
+def _get_filepath(uri: str) -> str | None:
+    # 仅支持 schema 目录中的文件, 不支持网络地址
+    parsed = urlsplit(uri)
+    if parsed.scheme not in ('', 'file'):
+        return None
+    filepath = os.path.join(httpfpt_path.schema_dir, parsed.path.lstrip('/'))
+    return filepath if os.path.isfile(filepath) else None
+
+
+def _retrieve(uri: str) -> Resource:
+    """从 schema 目录中读取 $ref 引用的外部 schema 文件"""
+    filepath = _get_filepath(uri)
+    if filepath is None:
+        raise NoSuchResource(uri)
+    contents = _schema_file_cache.get(filepath)
+    return Resource(contents=contents, specification=_get_specification(contents))
+
+
+def _iter_refs(contents: Any) -> Iterator[str]:
+    if isinstance(contents, dict):
+        for key, value in contents.items():
+            if key == '$ref' and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(contents, list):
+        for value in contents:
+            yield from _iter_refs(value)
+
+
+def _file_stat(filepath: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _build_registry(schema: dict) -> tuple[Registry, dict[str, tuple[int, int] | None]]:
+    """预先加载 schema 引用的所有外部 schema 文件, 避免校验时每次解析引用都重新读取"""
+    registry = _registry
+    files: dict[str, tuple[int, int] | None] = {}
+    pending: list[tuple[str, Any]] = [('', schema)]
+    while pending:
+        base_uri, contents = pending.pop()
+        for ref in _iter_refs(contents):
+            uri = urldefrag(urljoin(base_uri, ref)).url
+            if not uri or uri in registry:
+                continue
+            try:
+                resource = _retrieve(uri)
+            except NoSuchResource:
+                # 无法解析的引用在校验时报错
+                continue
+            registry = registry.with_resource(uri, resource)
+            filepath = _get_filepath(uri)
+            if filepath is not None:
+                files[filepath] = _file_stat(filepath)
+            pending.append((uri, resource.contents))
+    return registry, files
+
+
+_registry: Registry = Registry(retrieve=_retrieve)  # type: ignore[call-arg]
+
+
+class JsonSchemaValidatorCache:
+    """
+    jsonschema 校验器缓存
+
+    以 schema 内容 hash 为键缓存已校验 schema 并启用 format 校验的校验器, $ref 引用的外部 schema 文件从 schema 目录读取,
+    构建校验器时一次性加载, 文件变更后重新构建
+    """
+
+    def __init__(self) -> None:
+        self._validators: dict[str, tuple[Validator, dict[str, tuple[int, int] | None]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(schema: dict) -> str:
+        """
+        获取 schema 缓存键
+
+        :param schema:
+        :return:
+        """
+        data = json.dumps(schema, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def get(self, schema: dict) -> Validator:
+        """
+        获取 schema 校验器, schema 格式错误时抛出 SchemaError
+
+        :param schema:
+        :return:
+        """
+        key = self.get_key(schema)
+        cached = self._validators.get(key)
+        # 引用的外部 schema 文件变更后重新构建
+        if cached is not None and all(_file_stat(f) == stat for f, stat in cached[1].items()):
+            return cached[0]
+        cls = validators.validator_for(schema)
+        cls.check_schema(schema)
+        registry, files = _build_registry(schema)
+        validator = cls(schema, registry=registry, format_checker=cls.FORMAT_CHECKER)
+        with self._lock:
+            self._validators[key] = (validator, files)
+        return validator
+
+    def validate(self, instance: Any, schema: dict) -> None:
+        """
+        校验数据, 校验失败时抛出最相关的 ValidationError
+
+        :param instance:
+        :param schema:
+        :return:
+        """
+        error = best_match(self.get(schema).iter_errors(instance))
+        if error is not None:
+            raise error
+
+    def clear(self) -> None:
+        """
+        清空校验器缓存
+
+        :return:
+        """
+        with self._lock:
+            self._validators.clear()
+        _schema_file_cache.invalidate()
+
+
+def _escape_pointer(token: str) -> str:
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def _template_regex(template: str) -> str:
+    # 路径参数匹配单级路径
+    parts = re.split(r'(\{[^/{}]+})', template)
+    return ''.join('[^/]+' if part.startswith('{') else re.escape(part) for part in parts)
+
+
+def _get_base_paths(doc: dict) -> list[str]:
+    """获取 swagger 2.0 basePath 或 openapi 3.x servers 中的路径前缀, 未定义时为空"""
+    if 'basePath' in doc:
+        urls = [doc['basePath']]
+    else:
+        urls = [server['url'] for server in doc.get('servers', []) if isinstance(server.get('url'), str)]
+    base_paths = {urlsplit(url).path.rstrip('/') for url in urls}
+    return sorted(base_paths) or ['']
+
+
+def _compile_path(template: str, base_paths: list[str]) -> re.Pattern[str]:
+    # 请求路径须以文档定义的 basePath 或 servers 路径前缀开头, servers 中的变量同样匹配单级路径
+    prefix = '|'.join(_template_regex(base_path) for base_path in base_paths)
+    return re.compile(rf'(?:{prefix}){_template_regex(template)}/?')
+
+
+class OpenApiResponseSchema:
+    """
+    openapi 文档接口响应 schema 查找, 按请求方法、请求路径及响应状态码查找接口响应的 json schema
+
+    请求路径须包含文档 basePath 或 servers 中的路径前缀, openapi 3.0 及 swagger 2.0 文档使用 draft 4 校验,
+    nullable 及 x-nullable 在读取文档时转换为 null 类型
+    """
+
+    def __init__(self) -> None:
+        self._doc: dict | None = None
+        self._operations: list[tuple[re.Pattern[str], str, dict]] = []
+        self._lock = threading.Lock()
+
+    def _index(self, filename: str) -> tuple[dict, list[tuple[re.Pattern[str], str, dict]]]:
+        doc = _schema_file_cache.get(os.path.join(httpfpt_path.schema_dir, filename))
+        if doc is self._doc:
+            return doc, self._operations
+        operations = []
+        base_paths = _get_base_paths(doc)
+        # 路径模板越具体越优先匹配
+        templates = sorted(doc.get('paths', {}), key=lambda t: (-len(re.sub(r'\{[^/{}]+}', '', t)), t.count('{')))
+        for template in templates:
+            operations.append((_compile_path(template, base_paths), template, doc['paths'][template]))
+        with self._lock:
+            self._doc, self._operations = doc, operations
+        return doc, operations
+
+    def get_schema(self, filename: str, method: str, url: str, status_code: int) -> dict | None:
+        """
+        获取接口响应 schema, 文档中未定义时返回 None
+
+        :param filename: schema 目录中的 openapi 文档
+        :param method:
+        :param url:
+        :param status_code:
+        :return:
+        """
+        doc, operations = self._index(filename)
+        path = urlsplit(url).path or '/'
+        for pattern, template, path_item in operations:
+            if not pattern.fullmatch(path):
+                continue
+            operation = path_item.get(method.lower())
+            if not isinstance(operation, dict):
+                return None
+            responses = operation.get('responses', {})
+            for code in (str(status_code), f'{str(status_code)[0]}XX', 'default'):
+                if code in responses:
+                    break
+            else:
+                return None
+            pointer = f'/paths/{_escape_pointer(template)}/{method.lower()}/responses/{code}'
+            response = responses[code]
+            ref = response.get('$ref')
+            if isinstance(ref, str) and ref.startswith('#/'):
+                # 引用 components 中定义的响应
+                pointer = ref[1:]
+                response = doc
+                for token in ref[2:].split('/'):
+                    response = response[token.replace('~1', '/').replace('~0', '~')]
+            if 'schema' in response:
+                pointer = f'{pointer}/schema'
+            else:
+                media_type = next((m for m in response.get('content', {}) if 'json' in m), None)
+                if media_type is None or 'schema' not in response['content'][media_type]:
+                    return None
+                pointer = f'{pointer}/content/{_escape_pointer(media_type)}/schema'
+            dialect = _DRAFT4_SCHEMA if _is_openapi_30(doc) else _DRAFT202012_SCHEMA
+            return {'$schema': dialect, '$ref': f'{quote(filename)}#{quote(pointer, safe="/~")}'}
+        return None
+
+
+jsonschema_validator_cache = JsonSchemaValidatorCache()
+openapi_response_schema = OpenApiResponseSchema()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+# 对数线性分桶 (HDR 风格), 以微秒为单位记录, 相对误差不超过 1/1024, 即保留 3 位有效数字
+_SUB_BUCKET_BITS = 11
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+_SUB_BUCKET_HALF = _SUB_BUCKET_COUNT >> 1
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS
+    return _SUB_BUCKET_COUNT + (shift - 1) * _SUB_BUCKET_HALF + ((value >> shift) - _SUB_BUCKET_HALF)
+
+
+def _bucket_lowest_value(index: int) -> int:
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    offset = index - _SUB_BUCKET_COUNT
+    shift = offset // _SUB_BUCKET_HALF + 1
+    return ((offset % _SUB_BUCKET_HALF) + _SUB_BUCKET_HALF) << shift
+
+
+class LatencyHistogram:
+    """延迟直方图"""
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.total_count = 0
+        self.min_value: int | None = None
+        self.max_value = 0
+        self.sum_value = 0
+
+    def record(self, latency: float) -> None:
+        """
+        记录延迟
+
+        :param latency: 延迟, 单位: ms
+        :return:
+        """
+        value = max(int(latency * 1000), 0)
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total_count += 1
+        self.sum_value += value
+        self.max_value = max(self.max_value, value)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        获取百分位延迟
+
+        :param percentile: 百分位, 如 99.9
+        :return: 延迟, 单位: ms
+        """
+        if self.total_count == 0:
+            return 0.0
+        target = max(percentile / 100 * self.total_count, 1)
+        count = 0
+        for index in sorted(self.counts):
+            count += self.counts[index]
+            if count >= target:
+                highest_equivalent_value = _bucket_lowest_value(index + 1) - 1
+                return min(highest_equivalent_value, self.max_value) / 1000
+        return self.max_value / 1000
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        """
+        合并直方图
+
+        :param other:
+        :return:
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.sum_value += other.sum_value
+        self.max_value = max(self.max_value, other.max_value)
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        导出直方图数据
+
+        :return:
+        """
+        return {
+            'unit': 'us',
+            'sub_bucket_bits': _SUB_BUCKET_BITS,
+            'total_count': self.total_count,
+            'min': self.min_value,
+            'max': self.max_value,
+            'sum': self.sum_value,
+            'counts': {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LatencyHistogram:
+        """
+        从导出数据恢复直方图
+
+        :param data:
+        :return:
+        """
+        if data.get('sub_bucket_bits') != _SUB_BUCKET_BITS:
+            raise ValueError('直方图数据分桶精度不一致, 无法恢复')
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.total_count = data['total_count']
+        histogram.min_value = data['min']
+        histogram.max_value = data['max']
+        histogram.sum_value = data['sum']
+        return histogram
+
+    def summary(self) -> dict[str, float]:
+        """
+        延迟统计, 单位: ms
+
+        :return:
+        """
+        return {
+            'min': (self.min_value or 0) / 1000,
+            'mean': round(self.sum_value / self.total_count / 1000, 3) if self.total_count else 0.0,
+            'max': self.max_value / 1000,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+        }
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from typing import TYPE_CHECKING
+
+from _pytest.outcomes import Skipped
+
+from httpfpt.common.json_handler import read_json_file, write_json_file
+from httpfpt.common.log import log
+from httpfpt.common.variable_cache import variable_cache
+from httpfpt.utils.case_data_file import case_data_file_loader
+from httpfpt.utils.file_control import get_file_property, search_all_case_data_files
+from httpfpt.utils.load_test.histogram import LatencyHistogram
+from httpfpt.utils.request.request_trace import RequestTrace
+from httpfpt.utils.request.session_manager import session_manager
+
+if TYPE_CHECKING:
+    from httpfpt.utils.load_test.schedule import ArrivalSchedule
+
+
+def _split_case_data(case_data: dict) -> list[dict]:
+    config = case_data['config']
+    steps = case_data['test_steps']
+    return [{'config': config, 'test_steps': step} for step in (steps if isinstance(steps, list) else [steps])]
+
+
+def _read_case_data_file(filepath: str) -> dict:
+    return case_data_file_loader.load(filepath)[0]
+
+
+def get_load_cases(target: str) -> list[dict]:
+    """
+    获取压测用例, 支持用例数据文件（文件名/绝对路径）或 case_id
+
+    :param target:
+    :return:
+    """
+    if os.path.isfile(target):
+        return _split_case_data(_read_case_data_file(target))
+    all_case_data_files = search_all_case_data_files()
+    for filepath in all_case_data_files:
+        if get_file_property(filepath)[0] == target:
+            return _split_case_data(_read_case_data_file(filepath))
+    for filepath in all_case_data_files:
+        for case in _split_case_data(_read_case_data_file(filepath)):
+            if case['test_steps'].get('case_id') == target:
+                return [case]
+    raise FileNotFoundError(f'未找到压测目标 {target}, 请检查用例数据文件或 case_id 是否存在')
+
+
+class LoadRunner:
+    """
+    闭环压测, 固定并发数的 worker 循环发送请求, 直到达到请求次数或持续时间
+
+    每次请求完整复用用例数据解析、变量、hook 及认证逻辑, 延迟为用例中请求本身的耗时, 不含解析、前后置处理及断言;
+    用例跳过时单独计数, 不计入请求总数
+    """
+
+    def __init__(self, target: str, *, requests: int = 0, duration: float = 0, concurrency: int = 1) -> None:
+        if requests <= 0 and duration <= 0:
+            raise ValueError('压测失败, 请指定请求次数或持续时间')
+        if concurrency < 1:
+            raise ValueError('压测失败, 并发数不能小于 1')
+        self.cases = get_load_cases(target)
+        self.requests = requests
+        self.duration = duration
+        self.concurrency = concurrency
+        self.histogram = LatencyHistogram()
+        self.success = 0
+        self.skipped = 0
+        self.errors: dict[str, int] = {}
+        self._issued = 0
+        self._deadline: float | None = None
+        self._elapsed = 0.0
+
+    def _next_case(self) -> dict | None:
+        if self.requests and self._issued >= self.requests:
+            return None
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return None
+        case = self.cases[self._issued % len(self.cases)]
+        self._issued += 1
+        return case
+
+    def _record(self, latency: float | None, error: BaseException | None = None) -> None:
+        # 请求未完成时（如连接失败）没有延迟数据, 仅计入错误
+        if latency is not None:
+            self.histogram.record(latency)
+        if error is None:
+            self.success += 1
+        else:
+            err_msg = f'{type(error).__name__}: {error}'
+            self.errors[err_msg] = self.errors.get(err_msg, 0) + 1
+
+    async def _send(self, case: dict, intended: float | None = None) -> None:
+        from httpfpt.common.send_request import send_request
+
+        # 开环压测中, 从预定发送时间到开始执行用例的滞后及排队时间计入延迟
+        queued = (time.perf_counter() - intended) * 1000 if intended is not None else 0.0
+        RequestTrace.clear_last_total()
+        error = None
+        try:
+            # 并发请求的关联用例临时变量相互隔离
+            with variable_cache.scope():
+                await send_request.send_request_async(case, log_data=False)
+        except Skipped:
+            self.skipped += 1
+            return
+        except Exception as e:
+            error = e
+        request_time = RequestTrace.last_total()
+        self._record(queued + request_time if request_time is not None else None, error)
+
+    async def _worker(self) -> None:
+        while (case := self._next_case()) is not None:
+            await self._send(case)
+
+    async def _run(self) -> None:
+        start = time.perf_counter()
+        if self.duration:
+            self._deadline = start + self.duration
+        try:
+            await asyncio.gather(*[self._worker() for _ in range(self.concurrency)])
+        finally:
+            self._elapsed = time.perf_counter() - start
+            await session_manager.aclose_all()
+
+    def run(self) -> dict:
+        """
+        执行压测
+
+        :return: 压测结果
+        """
+        # 压测期间关闭框架日志, 避免日志写入影响压测结果
+        log.disable('httpfpt')
+        try:
+            asyncio.run(self._run())
+        finally:
+            log.enable('httpfpt')
+        return self.result()
+
+    def result(self) -> dict:
+        """
+        压测结果
+
+        :return:
+        """
+        errors = sum(self.errors.values())
+        total = self.success + errors
+        return {
+            'total': total,
+            'success': self.success,
+            'errors': errors,
+            'error_rate': round(errors / total * 100, 2) if total else 0.0,
+            'skipped': self.skipped,
+            'duration': round(self._elapsed, 3),
+            'throughput': round(total / self._elapsed, 2) if self._elapsed else 0.0,
+            'latency': self.histogram.summary(),
+            'error_detail': self.errors,
+            'histogram': self.histogram.to_dict(),
+        }
+
+
+class OpenLoadRunner(LoadRunner):
+    """
+    开环压测, 按速率计划在预定时间发送请求, 不等待此前的请求完成
+
+    延迟从预定发送时间开始计算, 发送端自身滞后或受并发上限限制而排队的时间同样计入延迟,
+    以修正协调遗漏 (coordinated omission)
+    """
+
+    def __init__(self, target: str, schedule: ArrivalSchedule, *, requests: int = 0, max_in_flight: int = 0) -> None:
+        if max_in_flight < 0:
+            raise ValueError('压测失败, 最大在途请求数不能小于 0')
+        super().__init__(target, requests=requests, duration=schedule.duration)
+        self.schedule = schedule
+        self.max_in_flight = max_in_flight
+        self.max_lag = 0.0
+
+    async def _limited_send(self, case: dict, intended: float, semaphore: asyncio.Semaphore | None) -> None:
+        if semaphore is None:
+            await self._send(case, intended)
+            return
+        async with semaphore:
+            await self._send(case, intended)
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+        tasks: set[asyncio.Task] = set()
+        start = time.perf_counter()
+        try:
+            for offset in self.schedule.send_times():
+                if self.requests and self._issued >= self.requests:
+                    break
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+                case = self.cases[self._issued % len(self.cases)]
+                self._issued += 1
+                task = asyncio.create_task(self._limited_send(case, intended, semaphore))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            self._elapsed = time.perf_counter() - start
+            await session_manager.aclose_all()
+
+    def result(self) -> dict:
+        result = super().result()
+        result['schedule'] = {
+            'type': self.schedule.schedule,
+            'start_rate': self.schedule.start_rate,
+            'end_rate': self.schedule.end_rate,
+            'steps': self.schedule.steps,
+            'max_in_flight': self.max_in_flight,
+            'max_lag': round(self.max_lag * 1000, 3),
+        }
+        return result
+
+
+def export_load_result(result: dict, filepath: str) -> None:
+    """
+    导出压测结果为 json 文件
+
+    :param result:
+    :param filepath:
+    :return:
+    """
+    write_json_file(filename=filepath, data=result, mode='w')
+
+
+def merge_load_results(filepaths: list[str]) -> dict:
+    """
+    合并多次压测导出的结果, 延迟百分位由合并后的直方图重新计算
+
+    :param filepaths:
+    :return:
+    """
+    if not filepaths:
+        raise ValueError('合并失败, 请指定压测结果文件')
+    histogram = LatencyHistogram()
+    success = 0
+    skipped = 0
+    errors: dict[str, int] = {}
+    throughput = 0.0
+    duration = 0.0
+    for filepath in filepaths:
+        result = read_json_file(filepath)
+        histogram.merge(LatencyHistogram.from_dict(result['histogram']))
+        success += result['success']
+        skipped += result['skipped']
+        for err_msg, count in result['error_detail'].items():
+            errors[err_msg] = errors.get(err_msg, 0) + count
+        # 视为同时运行的多个压测实例, 吞吐量累加, 持续时间取最长
+        throughput += result['throughput']
+        duration = max(duration, result['duration'])
+    error_count = sum(errors.values())
+    total = success + error_count
+    return {
+        'total': total,
+        'success': success,
+        'errors': error_count,
+        'error_rate': round(error_count / total * 100, 2) if total else 0.0,
+        'skipped': skipped,
+        'duration': duration,
+        'throughput': round(throughput, 2),
+        'latency': histogram.summary(),
+        'error_detail': errors,
+        'histogram': histogram.to_dict(),
+    }
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from httpfpt.enums.load_schedule_type import LoadScheduleType
+from httpfpt.utils.enum_control import get_enum_values
+
+
+class ArrivalSchedule:
+    """
+    请求到达速率计划, 按计划生成每个请求的预定发送时间
+
+    - constant: 恒定速率 start_rate
+    - ramp: 在持续时间内从 start_rate 线性增长至 end_rate
+    - step: 在持续时间内分 steps 阶从 start_rate 阶梯增长至 end_rate
+    """
+
+    def __init__(
+        self,
+        schedule: str,
+        duration: float,
+        start_rate: float,
+        end_rate: float | None = None,
+        steps: int = 1,
+    ) -> None:
+        if schedule not in get_enum_values(LoadScheduleType):
+            raise ValueError(f'速率计划 {schedule} 错误, 请使用 constant / ramp / step')
+        if duration <= 0:
+            raise ValueError('压测失败, 开环压测必须指定持续时间')
+        if start_rate <= 0 or (end_rate is not None and end_rate <= 0):
+            raise ValueError('压测失败, 请求速率必须大于 0')
+        if steps < 1:
+            raise ValueError('压测失败, 阶梯数不能小于 1')
+        self.schedule = schedule
+        self.duration = duration
+        self.start_rate = start_rate
+        self.end_rate = start_rate if end_rate is None or schedule == LoadScheduleType.CONSTANT else end_rate
+        self.steps = steps
+
+    @classmethod
+    def parse(cls, schedule: str, duration: float, rate: str, steps: int = 1) -> ArrivalSchedule:
+        """
+        解析速率参数, 格式为 rate 或 start_rate:end_rate
+
+        :param schedule:
+        :param duration:
+        :param rate:
+        :param steps:
+        :return:
+        """
+        try:
+            rates = [float(r) for r in rate.split(':')]
+        except ValueError:
+            raise ValueError(f'请求速率 {rate} 格式错误, 请使用 rate 或 start_rate:end_rate')
+        if len(rates) > 2:
+            raise ValueError(f'请求速率 {rate} 格式错误, 请使用 rate 或 start_rate:end_rate')
+        return cls(schedule, duration, rates[0], rates[-1], steps)
+
+    def rate_at(self, elapsed: float) -> float:
+        """
+        获取指定时间点的请求速率
+
+        :param elapsed: 距离压测开始的时间, 单位: s
+        :return: 请求速率, 单位: 次/s
+        """
+        progress = min(max(elapsed / self.duration, 0.0), 1.0)
+        if self.schedule == LoadScheduleType.RAMP:
+            return self.start_rate + (self.end_rate - self.start_rate) * progress
+        if self.schedule == LoadScheduleType.STEP:
+            if self.steps == 1:
+                return self.start_rate
+            step = min(int(progress * self.steps), self.steps - 1)
+            return self.start_rate + (self.end_rate - self.start_rate) * step / (self.steps - 1)
+        return self.start_rate
+
+    def send_times(self) -> Iterator[float]:
+        """
+        生成预定发送时间, 与实际发送情况无关, 由此计算的延迟可避免协调遗漏 (coordinated omission)
+
+        :return: 距离压测开始的时间, 单位: s
+        """
+        elapsed = 0.0
+        while elapsed < self.duration:
+            yield elapsed
+            elapsed += 1 / self.rate_at(elapsed)
@@ -1,18 +1,18 @@
 from __future__ import annotations
 
-import ast
-import json
-
-from jsonpath import findall
+from typing import TYPE_CHECKING
 
 from httpfpt.common.errors import CorrelateTestCaseError, JsonPathFindError
 from httpfpt.common.log import log
 from httpfpt.common.variable_cache import variable_cache
-from httpfpt.db.redis import redis_client
 from httpfpt.enums.setup_type import SetupType
 from httpfpt.utils.allure_control import allure_step
+from httpfpt.utils.case_index import case_index
 from httpfpt.utils.request.vars_extractor import var_extractor
 
+if TYPE_CHECKING:
+    from httpfpt.utils.request.response_data import ResponseData
+
 
 def exec_setup_testcase(parsed_data: dict, setup_testcase: str | dict) -> dict | None:
     """
@@ -33,85 +33,37 @@ def exec_setup_testcase(parsed_data: dict, setup_testcase: str | dict) -> dict |
             raise CorrelateTestCaseError(error_text)
 
     # 判断关联测试用例是否存在
-    all_case_id = ast.literal_eval(redis_client.get(f'{redis_client.prefix}:case_id_list'))
-    error_text = '执行关联测试用例失败，未在测试用例中找到关联测试用例，请检查关联测试用例 case_id 是否存在'
-    if isinstance(setup_testcase, dict):
-        if setup_testcase['case_id'] not in all_case_id:
-            raise CorrelateTestCaseError(error_text)
-    elif isinstance(setup_testcase, str):
-        if setup_testcase not in all_case_id:
-            raise CorrelateTestCaseError(error_text)
+    relate_case_id = setup_testcase['case_id'] if isinstance(setup_testcase, dict) else setup_testcase
+    case_data = case_index.get(relate_case_id)
+    if case_data is None:
+        raise CorrelateTestCaseError(
+            '执行关联测试用例失败，未在测试用例中找到关联测试用例，请检查关联测试用例 case_id 是否存在'
+        )
+    relate_case_steps = case_data['test_steps']
+    is_circular_relate(parsed_case_id, relate_case_steps)
 
     # 执行关联测试用例
     relate_count = 0
     # 用例中 testcase 参数为更新请求数据或提取变量时
     if isinstance(setup_testcase, dict):
         relate_count += 1
-        relate_case_id = setup_testcase['case_id']
-        relate_case_filename = redis_client.get(f'{redis_client.case_id_file_prefix}:{relate_case_id}')
-        case_data = redis_client.get(f'{redis_client.case_data_prefix}:{relate_case_filename}')
-        case_data = json.loads(case_data)
-        case_data_test_steps = case_data['test_steps']
-        if isinstance(case_data_test_steps, list):
-            for case_test_steps in case_data_test_steps:
-                if relate_case_id == case_test_steps['case_id']:
-                    relate_case_steps = case_test_steps
-                    is_circular_relate(parsed_case_id, relate_case_steps)
-                    if setup_testcase.get('request') is not None:
-                        testcase_data = {
-                            'test_steps': relate_case_steps,
-                            'update_request_data': setup_testcase['request'],
-                        }
-                        case_data.update(testcase_data)
-                        response = relate_testcase_exec_with_new_request_data(case_data)
-                        # 使用更新请求数据后的请求响应提取变量
-                        if setup_testcase.get('response') is not None:
-                            testcase_data = {
-                                'set_var_response': setup_testcase['response'],
-                            }
-                            relate_testcase_extract_with_response(testcase_data, response)
-                    else:
-                        if setup_testcase.get('response') is not None:
-                            testcase_data = {
-                                'test_steps': relate_case_steps,
-                                'set_var_response': setup_testcase['response'],
-                            }
-                            case_data.update(testcase_data)
-                            relate_testcase_extract(case_data)
+        if setup_testcase.get('request') is not None:
+            testcase_data = {'update_request_data': setup_testcase['request']}
+            case_data.update(testcase_data)
+            response = relate_testcase_exec_with_new_request_data(case_data)
+            # 使用更新请求数据后的请求响应提取变量
+            if setup_testcase.get('response') is not None:
+                testcase_data = {'set_var_response': setup_testcase['response']}
+                relate_testcase_extract_with_response(testcase_data, response)
         else:
-            relate_case_steps = case_data_test_steps
-            is_circular_relate(parsed_case_id, relate_case_steps)
-            if setup_testcase.get('request') is not None:
-                testcase_data = {'update_request_data': setup_testcase['request']}
+            if setup_testcase.get('response') is not None:
+                testcase_data = {'set_var_response': setup_testcase['response']}
                 case_data.update(testcase_data)
-                response = relate_testcase_exec_with_new_request_data(case_data)
-                if setup_testcase.get('response') is not None:
-                    testcase_data = {'set_var_response': setup_testcase['response']}
-                    relate_testcase_extract_with_response(testcase_data, response)
-            else:
-                if setup_testcase.get('response') is not None:
-                    testcase_data = {'set_var_response': setup_testcase['response']}
-                    case_data.update(testcase_data)
-                    relate_testcase_extract(case_data)
+                relate_testcase_extract(case_data)
 
     # 用例中 testcase 参数为直接关联测试用例时
     elif isinstance(setup_testcase, str):
-        relate_case_filename = redis_client.get(f'{redis_client.case_id_file_prefix}:{setup_testcase}')
-        case_data = redis_client.get(f'{redis_client.case_data_prefix}:{relate_case_filename}')
-        case_data = json.loads(case_data)
-        case_data_test_steps = case_data['test_steps']
-        if isinstance(case_data_test_steps, list):
-            for case_test_steps in case_data_test_steps:
-                if setup_testcase == case_test_steps['case_id']:
-                    relate_case_steps = case_test_steps
-                    is_circular_relate(parsed_case_id, relate_case_steps)
-                    new_data = {'test_steps': relate_case_steps}
-                    case_data.update(new_data)
-                    relate_testcase_exec(case_data)
-        else:
-            relate_case_steps = case_data_test_steps
-            is_circular_relate(parsed_case_id, relate_case_steps)
-            relate_testcase_exec(case_data)
+        relate_testcase_exec(case_data)
 
     if relate_count > 0:
         # 应用关联测试用例变量到请求数据，使用模糊匹配，可能有解析速度优化效果
@@ -166,7 +118,7 @@ def relate_testcase_extract(testcase_data: dict) -> None:
     log.info('<<< 关联测试用例变量提取执行完成')
 
 
-def relate_testcase_extract_with_response(testcase_data: dict, response: dict) -> None:
+def relate_testcase_extract_with_response(testcase_data: dict, response: ResponseData) -> None:
     """
     关联测试用例提取变量（基于请求响应）
 
@@ -174,15 +126,16 @@ def relate_testcase_extract_with_response(testcase_data: dict, response: dict) -
     :param response:
     :return:
     """
+    response.jsonpath_prefetch(s['jsonpath'] for s in testcase_data['set_var_response'])
     for s in testcase_data['set_var_response']:
-        value = findall(s['jsonpath'], response)
+        value = response.jsonpath_findall(s['jsonpath'])
         if value:
             variable_cache.set(s['key'], value[0], tag='relate_testcase')
         else:
             raise JsonPathFindError('jsonpath 取值失败，表达式: {}'.format(s['jsonpath']))
 
 
-def relate_testcase_exec_with_new_request_data(testcase_data: dict) -> dict:
+def relate_testcase_exec_with_new_request_data(testcase_data: dict) -> ResponseData:
     """
     关联测试用例（使用新请求数据）执行
 
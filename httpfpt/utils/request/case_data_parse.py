@@ -1,86 +1,161 @@
 from __future__ import annotations
 
+import functools
 import json
+import os
 import sys
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 import pytest
 
-from pydantic import ValidationError
-
+from httpfpt import __version__
 from httpfpt.common.errors import RequestDataParseError
-from httpfpt.common.json_handler import read_json_file
 from httpfpt.common.log import log
-from httpfpt.common.yaml_handler import read_yaml
-from httpfpt.db.redis import redis_client
-from httpfpt.enums.case_data_type import CaseDataType
-from httpfpt.schemas.case_data import CaseCacheData
-from httpfpt.utils.file_control import get_file_hash, get_file_property, search_all_case_data_files
-from httpfpt.utils.pydantic_parser import parse_error
+from httpfpt.db.storage import storage_client
+from httpfpt.utils.case_data_file import case_data_file_loader
+from httpfpt.utils.case_index import case_index
+from httpfpt.utils.case_scheduler import build_case_dag, circular_relate_verify
+from httpfpt.utils.case_validation import case_validation_cache
+from httpfpt.utils.file_control import get_file_property, search_all_case_data_files
+from httpfpt.utils.request.case_plan import case_plan_cache
 from httpfpt.utils.request.ids_extract import get_ids
 
 
 def clean_cache_data(clean_cache: bool) -> None:
     """
-    清理 redis 缓存数据
+    清理缓存数据
 
     :param clean_cache:
     :return:
     """
     if clean_cache:
-        redis_client.delete_prefix(redis_client.prefix, exclude=redis_client.token_prefix)
+        storage_client.delete_prefix(storage_client.prefix, exclude=storage_client.token_prefix)
+
+
+# 变更文件数量超过此值时使用进程池并行解析
+_PARALLEL_MIN_FILES = 16
+
+
+def _load_case_data_file(filepath: str, pydantic_verify: bool) -> dict:
+    """
+    读取并校验用例数据文件, 在进程池中执行
+
+    :param filepath:
+    :param pydantic_verify:
+    :return:
+    """
+    filename = get_file_property(filepath)[0]
+    case_data, file_hash = case_data_file_loader.load(filepath)
+    error = None
+    error_count = 0
+    validation_key = None
+    if pydantic_verify:
+        error, error_count, validation_key = case_validation_cache.validate(filepath, case_data, file_hash)
+    case_data.update({'filename': filename, 'file_hash': file_hash})
+    return {
+        'filepath': filepath,
+        'filename': filename,
+        'file_hash': file_hash,
+        'case_data': json.dumps(case_data, ensure_ascii=False),
+        'error': error,
+        'error_count': error_count,
+        'validation_key': validation_key,
+    }
 
 
 def case_data_init(pydantic_verify: bool) -> None:
     """
     初始化用例数据
 
+    根据 mtime / size 清单跳过未变更的文件, 变更的文件在进程池中解析校验后一次性批量写入存储
+
     :param pydantic_verify:
     :return:
     """
-    all_case_data_files = search_all_case_data_files()
-    for case_data_file in all_case_data_files:
-        file_type = get_file_property(case_data_file)[2]
-        if file_type == CaseDataType.JSON:
-            case_data = read_json_file(case_data_file)
-        else:
-            case_data = read_yaml(case_data_file)
-        filename = get_file_property(case_data_file)[0]
-        file_hash = get_file_hash(case_data_file)
-        case_data.update({'filename': filename, 'file_hash': file_hash})
-        redis_case_data = redis_client.get(f'{redis_client.case_data_prefix}:{filename}', logging=False)
-        if redis_case_data is None:
-            redis_client.set(f'{redis_client.case_data_prefix}:{filename}', json.dumps(case_data, ensure_ascii=False))
-        else:
-            redis_file_hash = json.loads(redis_case_data).get('file_hash')
-            if file_hash != redis_file_hash:
-                redis_client.rset(
-                    f'{redis_client.case_data_prefix}:{filename}', json.dumps(case_data, ensure_ascii=False)
-                )
+    manifest_prefix = storage_client.case_data_manifest_prefix
+    manifest = {e['filepath']: e for e in map(json.loads, storage_client.get_prefix(f'{manifest_prefix}:'))}
+    all_case_data_files = [os.path.abspath(f) for f in search_all_case_data_files()]
+    file_stats = {}
+    changed_files = []
+    for filepath in all_case_data_files:
+        stat = os.stat(filepath)
+        file_stats[filepath] = stat
+        entry = manifest.get(filepath)
+        if (
+            entry is None
+            or entry['mtime_ns'] != stat.st_mtime_ns
+            or entry['size'] != stat.st_size
+            or entry['version'] != __version__
+            or (pydantic_verify and not entry['verified'])
+        ):
+            changed_files.append(filepath)
+
+    load = functools.partial(_load_case_data_file, pydantic_verify=pydantic_verify)
+    workers = min(os.cpu_count() or 1, len(changed_files))
+    if workers > 1 and len(changed_files) >= _PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(load, changed_files, chunksize=8))
+    else:
+        results = [load(f) for f in changed_files]
+
+    count: int = 0
+    updates = {}
+    deletes = []
+    for result in results:
+        filepath = result['filepath']
+        stat = file_stats[filepath]
+        entry = manifest.get(filepath)
+        if entry is None or entry['file_hash'] != result['file_hash']:
+            updates[f'{storage_client.case_data_prefix}:{result["filename"]}'] = result['case_data']
+        if result['error'] is not None:
+            log.error(result['error'])
+            count += result['error_count']
+        new_entry = {
+            'filepath': filepath,
+            'filename': result['filename'],
+            'file_hash': result['file_hash'],
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'version': __version__,
+            'verified': pydantic_verify and result['error'] is None,
+        }
+        updates[f'{manifest_prefix}:{filepath}'] = json.dumps(new_entry, ensure_ascii=False)
+    # 清理已删除文件的用例数据
+    current_filenames = {get_file_property(f)[0] for f in all_case_data_files}
+    for filepath in manifest.keys() - file_stats.keys():
+        filename = manifest[filepath]['filename']
+        if filename not in current_filenames:
+            deletes.append(f'{storage_client.case_data_prefix}:{filename}')
+        deletes.append(f'{manifest_prefix}:{filepath}')
+    storage_client.set_many(updates)
+    storage_client.delete_many(deletes)
+    if updates or deletes:
+        case_index.clear()
+        case_plan_cache.evict(case_index.index)
+        file_hashes = {r['filepath']: r['file_hash'] for r in results}
+        case_data_file_loader.evict(file_hashes.get(f) or manifest[f]['file_hash'] for f in all_case_data_files)
     if pydantic_verify:
-        case_data_list = redis_client.get_prefix(f'{redis_client.case_data_prefix}:')
-        count: int = 0
-        for case_data in case_data_list:
-            try:
-                CaseCacheData.model_validate(json.loads(case_data))
-            except ValidationError as e:
-                count += parse_error(e)
-        if count > 0:
-            raise RequestDataParseError(f'测试用例数据校验失败，共有 {count} 处错误, 错误详情请查看日志')
+        case_validation_cache.update(
+            {r['filepath']: r['validation_key'] for r in results if r['validation_key'] is not None},
+            [r['filepath'] for r in results if r['error'] is not None],
+        )
+    log.info(f'用例数据初始化完成: 共 {len(all_case_data_files)} 个文件, 更新 {len(changed_files)} 个')
+
+    if count > 0:
+        raise RequestDataParseError(f'测试用例数据校验失败，共有 {count} 处错误, 错误详情请查看日志')
 
 
 def case_id_unique_verify() -> None:
     """
-    获取所有用例 id
+    校验所有用例 id 唯一, 存在重复时退出运行
 
     :return:
     """
     all_case_id_dict: list[dict[str, str | list[str]]] = []
-    all_case_id = []
     case_id_count = defaultdict(int)
-    case_data_list = redis_client.get_prefix(f'{redis_client.case_data_prefix}:')
-    redis_client.delete_prefix(f'{redis_client.case_id_file_prefix}:')
+    case_data_list = storage_client.get_prefix(f'{storage_client.case_data_prefix}:')
 
     for case_data in case_data_list:
         case_data = json.loads(case_data)
@@ -89,17 +164,13 @@ def case_id_unique_verify() -> None:
             steps = case_data['test_steps']
             if isinstance(steps, dict):
                 case_id = steps['case_id']
-                all_case_id.append(case_id)
                 all_case_id_dict.append({filename: [case_id]})
                 case_id_count[case_id] += 1
-                redis_client.set(f'{redis_client.case_id_file_prefix}:{case_id}', filename)
             if isinstance(steps, list):
                 case_id_list = [s['case_id'] for s in steps]
-                all_case_id.extend(case_id_list)
                 all_case_id_dict.append({filename: case_id_list})
                 for case_id in case_id_list:
                     case_id_count[case_id] += 1
-                    redis_client.set(f'{redis_client.case_id_file_prefix}:{case_id}', filename)
         except KeyError:
             raise RequestDataParseError(f'测试用例数据文件 {filename} 结构错误，建议开启 pydantic 验证')
 
@@ -115,12 +186,22 @@ def case_id_unique_verify() -> None:
                     repeat_case['detail'].append({'filename': key, 'index': repeat_index_list})
 
     if all_repeat_case_id:
-        redis_client.set(f'{redis_client.prefix}:case_id:repeated', 'true')
+        storage_client.set(f'{storage_client.prefix}:case_id:repeated', 'true')
         log.error(f'运行失败, 检测到用例重复 case_id: {all_repeat_case_id[0]}')
         sys.exit(1)
     else:
-        redis_client.delete(f'{redis_client.prefix}:case_id:repeated')
-        redis_client.rset(f'{redis_client.prefix}:case_id_list', str(all_case_id))
+        storage_client.delete(f'{storage_client.prefix}:case_id:repeated')
+
+
+def case_relate_verify() -> None:
+    """
+    校验所有用例的前置关联用例, 检测任意深度的循环关联
+
+    :return:
+    """
+    case_data_list = [json.loads(data) for data in storage_client.get_prefix(f'{storage_client.case_data_prefix}:')]
+    _, dag = build_case_dag(case_data_list)
+    circular_relate_verify(dag)
 
 
 def get_testcase_data(*, filename: str) -> tuple[list, list]:
@@ -130,7 +211,7 @@ def get_testcase_data(*, filename: str) -> tuple[list, list]:
     :param filename: 测试用例数据文件名称
     :return:
     """
-    case_data = json.loads(redis_client.get(f'{redis_client.case_data_prefix}:{filename}'))
+    case_data = json.loads(storage_client.get(f'{storage_client.case_data_prefix}:{filename}'))
     config_error = f'请求测试用例数据文件 {filename} 缺少 config 信息, 请检查测试用例文件内容'
     test_steps_error = f'请求测试用例数据文件 {filename} 缺少 test_steps 信息, 请检查测试用例文件内容'
 
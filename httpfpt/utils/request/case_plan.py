@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import threading
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping
+
+from httpfpt import __version__
+from httpfpt.common.log import log
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.core.path_conf import httpfpt_path
+
+# 执行计划结构变化时递增, 使已持久化的执行计划失效
+_PLAN_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CasePlan:
+    """用例执行计划, 已校验并合并配置与步骤的静态请求数据"""
+
+    key: str
+    data: Mapping[str, Any]
+    # 执行计划的 json 快照, 反序列化比深拷贝更快; 含 bytes 等无法序列化的数据时为 None
+    snapshot: str | None = None
+
+    @classmethod
+    def create(cls, key: str, data: dict) -> CasePlan:
+        try:
+            snapshot = json.dumps(data, ensure_ascii=False)
+        except (TypeError, ValueError):
+            snapshot = None
+        return cls(key, MappingProxyType(data), snapshot)
+
+    def materialize(self) -> dict:
+        """
+        获取执行计划数据副本, 供单次请求修改
+
+        :return:
+        """
+        if self.snapshot is not None:
+            return json.loads(self.snapshot)
+        return copy.deepcopy(dict(self.data))
+
+
+class CasePlanCache:
+    """
+    用例执行计划缓存, 以用例数据内容哈希为键, 缓存在内存中并持久化到磁盘, 用例数据变更后自动失效
+
+    执行计划文件名以 case_id 哈希及请求引擎为前缀, 同一用例及引擎仅保留最新的执行计划,
+    已删除用例的执行计划在重新加载用例数据时清理
+    """
+
+    def __init__(self) -> None:
+        self._plans: dict[str, CasePlan] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def plan_dir(self) -> str:
+        return os.path.join(httpfpt_path.cache_dir, 'case_plan')
+
+    @staticmethod
+    def _case_prefix(case_id: Any) -> str:
+        return hashlib.sha256(str(case_id).encode('utf-8')).hexdigest()[:16]
+
+    def get_plan_key(self, request_data: dict, request_engin: str) -> str | None:
+        """
+        获取执行计划键, 格式为 case_id 哈希.请求引擎.用例数据哈希, 用例数据无法序列化时返回 None
+
+        :param request_data:
+        :param request_engin:
+        :return:
+        """
+        case_id = request_data.get('test_steps', {}).get('case_id')
+        try:
+            data = json.dumps(
+                [_PLAN_VERSION, __version__, request_engin, httpfpt_config.REQUEST_GLOBAL_ENV, request_data],
+                ensure_ascii=False,
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return None
+        return f'{self._case_prefix(case_id)}.{request_engin}.{hashlib.sha256(data.encode("utf-8")).hexdigest()}'
+
+    def _load(self, key: str) -> CasePlan | None:
+        try:
+            with open(os.path.join(self.plan_dir, f'{key}.json'), encoding='utf-8') as f:
+                return CasePlan.create(key, json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f'用例执行计划 {key} 读取失败, 将重新编译: {e}')
+            return None
+
+    def _dump(self, plan: CasePlan) -> None:
+        # 含 bytes 等无法序列化的数据时, 仅缓存在内存中
+        if plan.snapshot is None:
+            return
+        filepath = os.path.join(self.plan_dir, f'{plan.key}.json')
+        tmp_filepath = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.plan_dir, exist_ok=True)
+            pathlib.Path(tmp_filepath).write_text(plan.snapshot, encoding='utf-8')
+            os.replace(tmp_filepath, filepath)
+        except OSError as e:
+            log.warning(f'用例执行计划 {plan.key} 持久化失败: {e}')
+            return
+        # 同一用例及引擎此前的执行计划已过期
+        prefix = plan.key.rsplit('.', 1)[0]
+        self._remove_files(
+            f for f in os.listdir(self.plan_dir) if f.startswith(f'{prefix}.') and f != f'{plan.key}.json'
+        )
+
+    def _remove_files(self, filenames: Iterable[str]) -> None:
+        for filename in filenames:
+            try:
+                os.remove(os.path.join(self.plan_dir, filename))
+            except OSError:
+                pass
+
+    def evict(self, case_ids: Iterable[str]) -> None:
+        """
+        清理不属于当前用例的执行计划
+
+        :param case_ids: 当前所有用例的 case_id
+        :return:
+        """
+        prefixes = {self._case_prefix(case_id) for case_id in case_ids}
+        with self._lock:
+            self._plans = {k: v for k, v in self._plans.items() if k.split('.', 1)[0] in prefixes}
+        try:
+            filenames = os.listdir(self.plan_dir)
+        except FileNotFoundError:
+            return
+        self._remove_files(f for f in filenames if f.split('.', 1)[0] not in prefixes)
+
+    def get(self, key: str, compiler: Callable[[], dict]) -> CasePlan:
+        """
+        获取执行计划, 内存及磁盘中均不存在时编译并缓存
+
+        :param key:
+        :param compiler:
+        :return:
+        """
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._load(key)
+            if plan is None:
+                plan = CasePlan.create(key, compiler())
+                self._dump(plan)
+            with self._lock:
+                self._plans[key] = plan
+        return plan
+
+    def clear(self) -> None:
+        """
+        清空内存中的执行计划
+
+        :return:
+        """
+        with self._lock:
+            self._plans.clear()
+
+
+case_plan_cache = CasePlanCache()
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import re
 
 from typing import Any
@@ -8,6 +7,8 @@ from typing import Any
 from httpfpt.common.log import log
 from httpfpt.enums.setup_type import SetupType
 from httpfpt.enums.teardown_type import TeardownType
+from httpfpt.utils.request.hook_registry import hook_registry
+from httpfpt.utils.request.vars_template import render
 
 
 class HookExecutor:
@@ -23,62 +24,25 @@ class HookExecutor:
         :param target:
         :return:
         """
-        # 数据排除
-        setup = target['test_steps'].get('setup')
-        teardown = target['test_steps'].get('teardown')
-        setup_hooks_with_index = []
-        teardown_hooks_with_index = []
-        if setup:
-            setup_hooks_with_index.extend(
-                [(i, item) for i, item in enumerate(setup) if item.get(SetupType.HOOK) is not None]
-            )
-            if setup_hooks_with_index:
-                target['test_steps']['setup'] = [
-                    item for item in target['test_steps']['setup'] if item.get(SetupType.HOOK) is None
-                ]
-        if teardown:
-            teardown_hooks_with_index.extend(
-                [(i, item) for i, item in enumerate(teardown) if item.get(TeardownType.HOOK) is not None]
-            )
-            if teardown_hooks_with_index:
-                target['test_steps']['teardown'] = [
-                    item for item in target['test_steps']['teardown'] if item.get(TeardownType.HOOK) is None
-                ]
-
-        str_target = json.dumps(target, ensure_ascii=False)
-
-        match = self.func_re.search(str_target)
-        if not match:
-            return target
-
-        # hook 返回值替换
-        exec('from httpfpt.core.hooks import *')
-        for match in self.func_re.finditer(str_target):
-            hook_key = match.group(1)
+
+        def resolve(hook_key: str) -> Any:
             try:
-                # locals() 获取到执行函数内所有变量并以字典形式返回
-                loc = locals()
-                exec(f'result = {hook_key}')
-                value = str(loc['result'])
-                str_target = self.func_re.sub(value, str_target, 1)
-                log.info(f'请求数据函数 {hook_key} 返回值替换完成')
+                value = hook_registry.call(hook_key)
             except Exception as e:
                 log.error(f'请求数据函数 {hook_key} 返回值替换失败: {e}')
                 raise e
+            log.info(f'请求数据函数 {hook_key} 返回值替换完成')
+            # json 原生类型保留原类型, 其他类型转换为字符串
+            if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+                return value
+            return str(value)
 
-        dict_target = json.loads(str_target)
-
-        # 数据还原
-        if setup:
-            if setup_hooks_with_index:
-                for i, item in setup_hooks_with_index:
-                    target['test_steps']['setup'].insert(i, item)
-        if teardown:
-            if teardown_hooks_with_index:
-                for i, item in teardown_hooks_with_index:
-                    target['test_steps']['teardown'].insert(i, item)
+        # 前后置 hook 在请求前后执行, 此处跳过
+        return render(target, self.func_re, resolve, skip=self._is_setup_or_teardown_hook)
 
-        return dict_target
+    @staticmethod
+    def _is_setup_or_teardown_hook(item: Any) -> bool:
+        return isinstance(item, dict) and len(item) == 1 and (SetupType.HOOK in item or TeardownType.HOOK in item)
 
     def exec_hook_func(self, hook_var: str) -> None:
         """
@@ -90,9 +54,8 @@ class HookExecutor:
         key = self.func_re.search(hook_var)
         if key:
             func = key.group(1)
-            exec('from httpfpt.core.hooks import *')
             log.info(f'执行 hook：{func}')
-            exec(func)
+            hook_registry.call(func)
 
     @staticmethod
     def exec_any_code(code: str) -> bool:
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import ast
+import importlib
+import threading
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+from httpfpt.common.errors import HookError
+from httpfpt.common.log import log
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.enums.hook_cache_scope import HookCacheScopeType
+from httpfpt.utils.enum_control import get_enum_values
+
+if TYPE_CHECKING:
+    from types import CodeType
+
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+_BUILTIN_HOOK_MODULE = 'httpfpt.core.hooks'
+
+# hook 函数参数允许的语法: 字面量、hook 模块中的名称及其属性、算术及一元运算
+_ARG_NODES = (
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.Attribute,
+    ast.List,
+    ast.Tuple,
+    ast.Set,
+    ast.Dict,
+    ast.UnaryOp,
+    ast.UAdd,
+    ast.USub,
+    ast.Not,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+)
+
+_FILENAME = '<hook call>'
+
+
+def hook(cache: str = HookCacheScopeType.NONE) -> Callable[[_F], _F]:
+    """
+    声明 hook 函数返回值缓存作用域, 适用于签名令牌、生成数据 id 等耗时且结果可复用的 hook
+
+    :param cache: none / case / module / session, 作用域内相同调用表达式只执行一次
+    :return:
+    """
+    if cache not in get_enum_values(HookCacheScopeType):
+        raise HookError(f'hook 缓存作用域 {cache} 错误, 请使用 none / case / module / session')
+
+    def decorator(func: _F) -> _F:
+        func.__hook_cache__ = cache  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
+@dataclass(frozen=True)
+class HookCall:
+    """已编译的 hook 调用表达式"""
+
+    key: str
+    name: str
+    # 参数编译为 (args, kwargs) 求值代码, 在 hook 命名空间中执行, 无参数时为 None
+    args_code: CodeType | None
+
+
+def _check_arg(node: ast.expr, expr: str) -> None:
+    for child in ast.walk(node):
+        if not isinstance(child, _ARG_NODES):
+            raise HookError(
+                f'hook 函数 {expr} 参数含有不支持的语法 {type(child).__name__}, '
+                '仅支持字面量、hook 模块中的名称及其属性、算术及一元运算'
+            )
+        if isinstance(child, ast.Attribute) and child.attr.startswith('_'):
+            raise HookError(f'hook 函数 {expr} 参数含有不支持的属性 {child.attr}')
+
+
+@lru_cache(maxsize=1024)
+def compile_hook_call(expr: str) -> HookCall:
+    """
+    编译 hook 调用表达式, 仅支持 func(参数, key=参数) 形式, 参数语法经校验后编译, 不执行任意代码
+
+    :param expr:
+    :return:
+    """
+    try:
+        node = ast.parse(expr.strip(), mode='eval').body
+    except SyntaxError as e:
+        raise HookError(f'hook 函数 {expr} 语法错误: {e}')
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+        raise HookError(f'hook 函数 {expr} 不是有效的函数调用')
+    for arg in node.args:
+        if isinstance(arg, ast.Starred):
+            raise HookError(f'hook 函数 {expr} 不支持 * 参数')
+        _check_arg(arg, expr)
+    for keyword in node.keywords:
+        if keyword.arg is None:
+            raise HookError(f'hook 函数 {expr} 不支持 ** 参数')
+        _check_arg(keyword.value, expr)
+    key = ast.unparse(node)
+    if not node.args and not node.keywords:
+        return HookCall(key, node.func.id, None)
+    args_node = ast.Tuple(
+        elts=[
+            ast.Tuple(elts=node.args, ctx=ast.Load()),
+            ast.Dict(keys=[ast.Constant(k.arg) for k in node.keywords], values=[k.value for k in node.keywords]),
+        ],
+        ctx=ast.Load(),
+    )
+    args_code = compile(ast.fix_missing_locations(ast.Expression(args_node)), _FILENAME, 'eval')
+    return HookCall(key, node.func.id, args_code)
+
+
+class HookRegistry:
+    """hook 函数注册表, 首次使用时从内置及配置的 hook 模块构建, 按 hook 声明的作用域缓存返回值"""
+
+    def __init__(self) -> None:
+        self._namespace: dict[str, Any] | None = None
+        self._memo: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def namespace(self) -> dict[str, Any]:
+        namespace = self._namespace
+        if namespace is None:
+            with self._lock:
+                namespace = self._namespace
+                if namespace is None:
+                    namespace = self._namespace = self._load()
+        return namespace
+
+    @staticmethod
+    def _load() -> dict[str, Any]:
+        namespace: dict[str, Any] = {}
+        for module_name in [_BUILTIN_HOOK_MODULE, *httpfpt_config.HOOK_MODULES]:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError as e:
+                raise HookError(f'hook 模块 {module_name} 导入失败: {e}')
+            names = getattr(module, '__all__', None) or [k for k in vars(module) if not k.startswith('_')]
+            namespace.update({name: getattr(module, name) for name in names})
+            log.debug(f'加载 hook 模块: {module_name}')
+        # 参数求值时不允许使用内置函数
+        namespace['__builtins__'] = {}
+        return namespace
+
+    def _eval_args(self, hook_call: HookCall) -> tuple[tuple, dict]:
+        if hook_call.args_code is None:
+            return (), {}
+        try:
+            return eval(hook_call.args_code, self.namespace)
+        except NameError as e:
+            raise HookError(f'hook 模块中不存在名称: {e.name}')
+        except Exception as e:
+            raise HookError(f'hook 函数 {hook_call.key} 参数求值失败: {e}')
+
+    def call(self, expr: str) -> Any:
+        """
+        执行 hook 调用表达式
+
+        :param expr: 如 func() 或 func(1, b=2)
+        :return:
+        """
+        hook_call = compile_hook_call(expr)
+        func = self.namespace.get(hook_call.name)
+        if not callable(func):
+            raise HookError(f'hook 函数 {hook_call.name} 不存在')
+        scope = getattr(func, '__hook_cache__', HookCacheScopeType.NONE)
+        if scope != HookCacheScopeType.NONE:
+            memo = self._memo.get(scope)
+            if memo is not None and hook_call.key in memo:
+                log.info(f'hook 函数 {hook_call.key} 使用 {scope} 作用域缓存返回值')
+                return memo[hook_call.key]
+        args, kwargs = self._eval_args(hook_call)
+        result = func(*args, **kwargs)
+        if scope != HookCacheScopeType.NONE:
+            with self._lock:
+                self._memo.setdefault(scope, {})[hook_call.key] = result
+        return result
+
+    def release(self, scope: str) -> None:
+        """
+        在作用域结束时清理该作用域的 hook 返回值缓存
+
+        :param scope:
+        :return:
+        """
+        with self._lock:
+            self._memo.pop(scope, None)
+
+    def clear(self) -> None:
+        """
+        清理已构建的注册表及所有缓存, 下次使用时重新构建
+
+        :return:
+        """
+        with self._lock:
+            self._namespace = None
+            self._memo.clear()
+
+
+hook_registry = HookRegistry()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import time
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from httpfpt.utils.request.response_data import ResponseData
+
+# 默认首次重试间隔, 退避倍数及最大重试间隔, 单位秒
+_DEFAULT_INTERVAL = 0.2
+_DEFAULT_BACKOFF = 2.0
+_DEFAULT_MAX_INTERVAL = 5.0
+
+
+class Poller:
+    """
+    轮询断言控制
+
+    断言未通过时按指数退避计算重试间隔, 直到断言通过或超过截止时间, 最后一次重试不会超过截止时间
+    """
+
+    def __init__(self, poll: dict) -> None:
+        self.timeout = float(poll['timeout'])
+        self.interval = float(poll.get('interval') or _DEFAULT_INTERVAL)
+        self.backoff = float(poll.get('backoff') or _DEFAULT_BACKOFF)
+        self.max_interval = float(poll.get('max_interval') or _DEFAULT_MAX_INTERVAL)
+        # 是否在每次重试前重新发送请求, 仅需等待 SQL 断言结果时可关闭
+        self.request = poll.get('request') is not False
+        self.asserts: list = poll['assert']
+        self.attempts = 1
+        self.last_error: Exception | None = None
+        self._start = time.perf_counter()
+        self._deadline = self._start + self.timeout
+
+    @property
+    def elapsed(self) -> float:
+        """已耗时, 单位毫秒"""
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+    def next_delay(self) -> float | None:
+        """
+        获取下次重试前的等待时间, 超过截止时间时返回 None
+
+        :return:
+        """
+        remaining = self._deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        delay = min(self.interval * self.backoff ** (self.attempts - 1), self.max_interval, remaining)
+        self.attempts += 1
+        return round(delay, 3)
+
+    def record(self, response_data: ResponseData, passed: bool) -> None:
+        """
+        记录轮询次数及耗时到响应数据
+
+        :param response_data:
+        :param passed:
+        :return:
+        """
+        stat = response_data['stat']
+        record = {'attempts': self.attempts, 'elapsed': self.elapsed, 'passed': passed}
+        stat['poll'] = [*(stat.get('poll') or []), record]
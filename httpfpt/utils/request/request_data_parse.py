@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import os
 
 from json import dumps as json_dumps
 from string import Template
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import allure
 
@@ -25,11 +28,24 @@ from httpfpt.enums.setup_type import SetupType
 from httpfpt.enums.teardown_type import TeardownType
 from httpfpt.utils.auth_plugins import auth
 from httpfpt.utils.enum_control import get_enum_values
+from httpfpt.utils.request.case_plan import case_plan_cache
 from httpfpt.utils.request.hook_executor import hook_executor
 from httpfpt.utils.request.vars_extractor import var_extractor
 
 _RequestDataParamGetError = (KeyError, TypeError)
 
+# 未设置请求头时, 根据请求体类型自动添加的 Content-Type, 表单请求由引擎自动处理
+_BODY_CONTENT_TYPE = {
+    BodyType.x_www_form_urlencoded: 'application/x-www-form-urlencoded',
+    BodyType.binary: 'application/octet-stream',
+    BodyType.GraphQL: 'application/json',
+    BodyType.TEXT: 'text/plain',
+    BodyType.JavaScript: 'application/javascript',
+    BodyType.JSON: 'application/json',
+    BodyType.HTML: 'text/html',
+    BodyType.XML: 'application/xml',
+}
+
 
 def _error_msg(info: str) -> str:
     msg_template = Template('测试用例数据解析失败, $info')
@@ -42,6 +58,12 @@ class RequestDataParse:
         self.test_steps_check(request_data)
         self.request_data = hook_executor.hook_func_value_replace(request_data)
         self.request_engin = request_engin
+        # 请求数据包含 hook 函数时, 每次执行的返回值可能不同, 不使用执行计划缓存
+        self.plan_key = (
+            case_plan_cache.get_plan_key(self.request_data, request_engin)
+            if self.request_data is request_data
+            else None
+        )
         self._is_run()  # put bottom
 
     @staticmethod
@@ -163,6 +185,17 @@ class RequestDataParse:
             redirects = None
         return redirects
 
+    @property
+    def http2(self) -> bool | None:
+        try:
+            http2 = self.request_data['config']['request']['http2']
+            if http2 is not None:
+                if not isinstance(http2, bool):
+                    raise RequestDataParseError(_error_msg('参数 config:request:http2 不是有效的 bool 类型'))
+        except _RequestDataParamGetError:
+            http2 = None
+        return http2
+
     @property
     def proxies(self) -> dict | None:
         try:
@@ -181,7 +214,7 @@ class RequestDataParse:
                             )
                 if self.request_engin == EnginType.requests:
                     proxies = proxies
-                elif self.request_engin == EnginType.httpx:
+                elif self.request_engin in (EnginType.httpx, EnginType.httpx_async):
                     proxies = {'http://': proxies['http'], 'https://': proxies['https']}
         except _RequestDataParamGetError:
             proxies = None
@@ -348,24 +381,33 @@ class RequestDataParse:
 
     @property
     def url(self) -> str:
+        return self._join_host(self.url_no_parse, self.env)
+
+    @property
+    def url_no_parse(self) -> str:
         try:
             url = self.request_data['test_steps']['request']['url']
         except _RequestDataParamGetError:
             raise RequestDataParseError(_error_msg('缺少 test_steps:request:url 参数'))
         else:
-            if not url.startswith('http'):
-                _env = self.env
-                try:
-                    env_file = os.path.join(httpfpt_path.run_env_dir, _env)
-                    env_dict = get_env_dict(env_file)
-                except Exception as e:
-                    raise RequestDataParseError(f'环境变量 {_env} 读取失败: {e}')
-                host = env_dict.get('host') or env_dict.get('HOST')
-                if host is None:
-                    raise RequestDataParseError(f'环境变量 {env_file} 读取失败, 缺少 HOST 参数')
-                url = host + url
+            if not isinstance(url, str):
+                raise RequestDataParseError(_error_msg('参数 test_steps:request:url 不是有效的 str 类型'))
             return url
 
+    @staticmethod
+    def _join_host(url: str, env: str) -> str:
+        if not url.startswith('http'):
+            try:
+                env_file = os.path.join(httpfpt_path.run_env_dir, env)
+                env_dict = get_env_dict(env_file)
+            except Exception as e:
+                raise RequestDataParseError(f'环境变量 {env} 读取失败: {e}')
+            host = env_dict.get('host') or env_dict.get('HOST')
+            if host is None:
+                raise RequestDataParseError(f'环境变量 {env_file} 读取失败, 缺少 HOST 参数')
+            url = host + url
+        return url
+
     @property
     def params(self) -> dict | bytes | None:
         try:
@@ -380,6 +422,10 @@ class RequestDataParse:
 
     @property
     def headers(self) -> dict | None:
+        return self._auth_headers(self.headers_no_auth)
+
+    @property
+    def headers_no_auth(self) -> dict | None:
         try:
             headers = self.request_data['test_steps']['request']['headers']
         except _RequestDataParamGetError:
@@ -398,20 +444,28 @@ class RequestDataParse:
             if headers is not None:
                 if len(headers) == 0:
                     raise RequestDataParseError(_error_msg('参数 test_steps:request:headers 为空'))
-            if auth.is_auth:
-                bearer_token = None
-                if auth.auth_type == AuthType.TOKEN:
-                    bearer_token = {'Authorization': f'Bearer {auth.bearer_token}'}
-                elif auth.auth_type == AuthType.TOKEN_CUSTOM:
-                    bearer_token = {'Authorization': f'Bearer {auth.bearer_token_custom}'}
-                if headers is not None:
-                    headers.update(bearer_token)  # type: ignore
-                else:
-                    headers = bearer_token
             return headers
 
+    @staticmethod
+    def _auth_headers(headers: dict | None) -> dict | None:
+        if auth.is_auth:
+            bearer_token = None
+            if auth.auth_type == AuthType.TOKEN:
+                bearer_token = {'Authorization': f'Bearer {auth.bearer_token}'}
+            elif auth.auth_type == AuthType.TOKEN_CUSTOM:
+                bearer_token = {'Authorization': f'Bearer {auth.bearer_token_custom}'}
+            if headers is not None:
+                headers.update(bearer_token)  # type: ignore
+            else:
+                headers = bearer_token
+        return headers
+
     @property
     def cookies(self) -> dict | None:
+        return self._auth_cookies(self.cookies_no_auth)
+
+    @property
+    def cookies_no_auth(self) -> dict | None:
         try:
             cookies = self.request_data['test_steps']['request']['cookies']
         except _RequestDataParamGetError:
@@ -419,6 +473,10 @@ class RequestDataParse:
         if cookies is not None:
             if not isinstance(cookies, dict):
                 raise RequestDataParseError(_error_msg('参数 test_steps:request:cookies 不是有效的 dict 类型'))
+        return cookies
+
+    @staticmethod
+    def _auth_cookies(cookies: dict | None) -> dict | None:
         if auth.is_auth:
             if auth.auth_type == AuthType.COOKIE:
                 header_cookie = auth.header_cookie
@@ -460,11 +518,11 @@ class RequestDataParse:
                         if isinstance(body, bytes):
                             body = bytes(body)
                         elif isinstance(body, str):
-                            assert body == IsUrl(file_url=True)
-                            if not os.path.exists(body):
+                            # 支持 file:// 地址或文件路径, 仅校验文件, 发送请求时才打开并流式读取
+                            if body == IsUrl(file_url=True):
+                                body = url2pathname(urlparse(body).path)
+                            if not os.path.isfile(body):
                                 raise RequestDataParseError(f'读取 test_steps:request:body:{body} 失败，文件不存在')
-                            with open(body, 'rb') as f:
-                                body = f.read()
                         else:
                             raise RequestDataParseError('参数 test_steps:request:body 不是有效的 str / bytes 类型')
                     elif body_type == BodyType.GraphQL:
@@ -487,31 +545,48 @@ class RequestDataParse:
 
     @property
     def files(self) -> dict | list | None:
-        files = self.files_no_parse
+        return self._parse_files(self.files_no_parse)
+
+    @staticmethod
+    def _parse_files(files: dict | None) -> dict | list | None:
+        """上传文件路径, 仅校验文件是否存在, 发送请求时才打开, 请求结束后关闭"""
         if files is not None:
-            if len(files) == 1:
-                for k, v in files.items():
-                    try:
-                        if isinstance(v, list):
-                            files = [(f'{k}', open(_, 'rb')) for _ in v]
-                        else:
-                            files = {f'{k}': open(v, 'rb')}
-                    except FileNotFoundError:
-                        raise RequestDataParseError(_error_msg(f'参数 test_steps:request:files:{k} 文件不存在'))
-            else:
-                uploads = []
-                for k, v in files.items():
-                    try:
-                        if isinstance(v, list):
-                            v_files = [(f'{k}', open(_, 'rb')) for _ in v]
-                        else:
-                            v_files = (f'{k}', open(v, 'rb'))
-                        uploads.append(v_files)
-                    except FileNotFoundError:
+            uploads = []
+            for k, v in files.items():
+                for path in v if isinstance(v, list) else [v]:
+                    if not isinstance(path, str) or not os.path.isfile(path):
                         raise RequestDataParseError(_error_msg(f'参数 test_steps:request:files:{k} 文件不存在'))
-                return uploads
+                    uploads.append((f'{k}', path))
+            if len(files) == 1 and not isinstance(next(iter(files.values())), list):
+                return dict(uploads)
+            return uploads
         return files
 
+    @property
+    def download(self) -> dict | None:
+        try:
+            download = self.request_data['test_steps']['request']['download']
+        except _RequestDataParamGetError:
+            download = None
+        if download is not None:
+            if not isinstance(download, dict):
+                raise RequestDataParseError(_error_msg('参数 test_steps:request:download 不是有效的 dict 类型'))
+            download = {
+                'save': download.get('save', False),
+                'hash': download.get('hash', 'sha256'),
+                'max_size': download.get('max_size'),
+                'chunk_size': download.get('chunk_size', 65536),
+            }
+            if not isinstance(download['save'], bool):
+                raise RequestDataParseError(_error_msg('参数 test_steps:request:download:save 不是有效的 bool 类型'))
+            if download['hash'] is not None and download['hash'] not in hashlib.algorithms_available:
+                raise RequestDataParseError(_error_msg('参数 test_steps:request:download:hash 不是支持的摘要算法'))
+            for key in ('max_size', 'chunk_size'):
+                value = download[key]
+                if value is not None and (not isinstance(value, int) or value <= 0):
+                    raise RequestDataParseError(_error_msg(f'参数 test_steps:request:download:{key} 不是有效的正整数'))
+        return download
+
     @property
     def files_no_parse(self) -> dict | None:
         try:
@@ -646,6 +721,8 @@ class RequestDataParse:
                             self._teardown_assert(i, value)
                         elif key == TeardownType.WAIT_TIME:
                             self._teardown_wait_time(i, value)
+                        elif key == TeardownType.POLL:
+                            self._teardown_poll(i, value)
             return teardown
 
     @staticmethod
@@ -706,42 +783,45 @@ class RequestDataParse:
                 )
         return wait_time
 
-    def get_request_data_parsed(self, relate_log: bool = False) -> dict:
+    @staticmethod
+    def _teardown_poll(index: int, poll: dict | None) -> dict | None:
+        if poll is not None:
+            if not isinstance(poll, dict):
+                raise RequestDataParseError(_error_msg(f'参数 test_steps:teardown:poll[{index}] 不是有效的 dict 类型'))
+            for k in ('timeout', 'interval', 'backoff', 'max_interval'):
+                v = poll.get(k)
+                if v is None and k != 'timeout':
+                    continue
+                if isinstance(v, bool) or not isinstance(v, (int, float)) or v <= 0:
+                    raise RequestDataParseError(
+                        _error_msg(f'参数 test_steps:teardown:poll[{index}]:{k} 不是有效的正数')
+                    )
+            if poll.get('request') is not None and not isinstance(poll['request'], bool):
+                raise RequestDataParseError(
+                    _error_msg(f'参数 test_steps:teardown:poll[{index}]:request 不是有效的 bool 类型')
+                )
+            asserts = poll.get('assert')
+            if not isinstance(asserts, list) or not asserts:
+                raise RequestDataParseError(
+                    _error_msg(f'参数 test_steps:teardown:poll[{index}]:assert 不是有效的 list 类型或为空')
+                )
+            for assert_text in asserts:
+                if not isinstance(assert_text, (str, dict)):
+                    raise RequestDataParseError(
+                        _error_msg(f'参数 test_steps:teardown:poll[{index}]:assert 中包含无效的 str / dict 类型')
+                    )
+        return poll
+
+    def compile_plan(self) -> dict:
         """
-        获取所有解析后的请求数据
+        编译用例执行计划, 校验并合并配置与步骤中的静态请求数据
+
+        请求地址中的环境 HOST、认证信息及上传文件在每次执行时解析, 不包含在执行计划中
 
-        :param relate_log:
         :return:
         """
-        case_id = self.case_id
-        if not relate_log:
-            log.info(f'🏷️ ID: {case_id}')
-        # 自动解析 headers
-        headers = self.headers
         body_type = self.body_type
-        body = self.body
-        if headers is None:
-            if body_type:
-                if body_type == BodyType.form_data:
-                    pass  # 表单请求由引擎自动处理
-                elif body_type == BodyType.x_www_form_urlencoded:
-                    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-                elif body_type == BodyType.binary:
-                    headers = {'Content-Type': 'application/octet-stream'}
-                elif body_type == BodyType.GraphQL:
-                    headers = {'Content-Type': 'application/json'}
-                elif body_type == BodyType.TEXT:
-                    headers = {'Content-Type': 'text/plain'}
-                elif body_type == BodyType.JavaScript:
-                    headers = {'Content-Type': 'application/javascript'}
-                elif body_type == BodyType.JSON:
-                    headers = {'Content-Type': 'application/json'}
-                elif body_type == BodyType.HTML:
-                    headers = {'Content-Type': 'text/html'}
-                elif body_type == BodyType.XML:
-                    headers = {'Content-Type': 'application/xml'}
-        # 请求数据整合
-        all_data = {
+        return {
             'allure_epic': self.allure_epic,
             'allure_feature': self.allure_feature,
             'allure_story': self.allure_story,
@@ -750,24 +830,52 @@ class RequestDataParse:
             'timeout': self.timeout,
             'verify': self.verify,
             'redirects': self.redirects,
+            'http2': self.http2,
             'proxies': self.proxies,
             'retry': self.retry,
             'module': self.module,
             'name': self.name,
-            'case_id': case_id,
+            'case_id': self.case_id,
             'description': self.description,
             'method': self.method,
-            'url': self.url,
+            'url': self.url_no_parse,
             'params': self.params,
-            'headers': headers,
-            'cookies': self.cookies,
+            'headers': self.headers_no_auth,
+            'cookies': self.cookies_no_auth,
             'body_type': body_type,
-            'body': body,
-            'files': self.files,
+            'body': self.body,
+            'files': None,
             'files_no_parse': self.files_no_parse,
+            'download': self.download,
             'is_setup': self.is_setup,
             'setup': self.setup,
             'is_teardown': self.is_teardown,
             'teardown': self.teardown,
+            'content_type': _BODY_CONTENT_TYPE.get(body_type) if body_type else None,
         }
+
+    def get_request_data_parsed(self, relate_log: bool = False) -> dict:
+        """
+        获取所有解析后的请求数据
+
+        :param relate_log:
+        :return:
+        """
+        if self.plan_key is None:
+            all_data = self.compile_plan()
+        else:
+            all_data = case_plan_cache.get(self.plan_key, self.compile_plan).materialize()
+        if not relate_log:
+            log.info(f'🏷️ ID: {all_data["case_id"]}')
+        # 自动解析 headers
+        content_type = all_data.pop('content_type')
+        headers = self._auth_headers(all_data['headers'])
+        if headers is None and content_type:
+            headers = {'Content-Type': content_type}
+        all_data.update(
+            url=self._join_host(all_data['url'], all_data['env']),
+            headers=headers,
+            cookies=self._auth_cookies(all_data['cookies']),
+            files=self._parse_files(all_data['files_no_parse']),
+        )
         return all_data
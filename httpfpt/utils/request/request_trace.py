@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import time
+
+from contextvars import ContextVar
+from typing import Any
+
+from httpx import Response as HttpxResponse
+from requests import Response as RequestsResponse
+
+# 当前上下文中最近一次请求的总耗时, 单位: ms
+_last_total: ContextVar[float | None] = ContextVar('last_request_total', default=None)
+
+
+class RequestTrace:
+    """
+    请求阶段耗时追踪, 单位: ms
+
+    httpx 引擎通过 trace 扩展记录各阶段, 其中 DNS 解析包含在 connect 阶段内; requests 引擎仅能区分首字节与下载耗时,
+    未能测量的阶段值为 None; 连接池复用已有连接时, connect 与 tls 为 0
+    """
+
+    def __init__(self) -> None:
+        self.start_time: float | None = None
+        self.end_time: float | None = None
+        self._events: dict[str, float] = {}
+
+    def start(self) -> None:
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._events.clear()
+
+    def end(self) -> None:
+        self.end_time = time.perf_counter()
+        if self.start_time is not None:
+            _last_total.set(round((self.end_time - self.start_time) * 1000, 3))
+
+    @staticmethod
+    def last_total() -> float | None:
+        """
+        获取当前上下文中最近一次请求的总耗时, 不含用例解析、前后置处理及断言, 请求未完成时为 None
+
+        :return:
+        """
+        return _last_total.get()
+
+    @staticmethod
+    def clear_last_total() -> None:
+        _last_total.set(None)
+
+    def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        """httpx trace 回调, 事件名如 connection.connect_tcp.started, http11.receive_response_headers.complete"""
+        self._events[event_name.split('.', 1)[1]] = time.perf_counter()
+
+    async def async_trace(self, event_name: str, info: dict[str, Any]) -> None:
+        """httpx 异步 trace 回调"""
+        self(event_name, info)
+
+    def _span(self, start_event: str, end_event: str) -> float | None:
+        start = self._events.get(start_event)
+        end = self._events.get(end_event)
+        if start is None or end is None:
+            return None
+        return round((end - start) * 1000, 3)
+
+    def get_timing(self, response: RequestsResponse | HttpxResponse) -> dict[str, float | None]:
+        """
+        获取请求阶段耗时
+
+        :param response:
+        :return:
+        """
+        total = round((self.end_time - self.start_time) * 1000, 3) if self.start_time and self.end_time else None
+        timing: dict[str, float | None] = {
+            'dns': None,
+            'connect': None,
+            'tls': None,
+            'ttfb': None,
+            'download': None,
+            'total': total,
+        }
+        if isinstance(response, HttpxResponse) and self._events:
+            timing['connect'] = self._span('connect_tcp.started', 'connect_tcp.complete') or 0.0
+            timing['tls'] = self._span('start_tls.started', 'start_tls.complete') or 0.0
+            headers_complete = self._events.get('receive_response_headers.complete')
+            if headers_complete is not None and self.start_time is not None:
+                timing['ttfb'] = round((headers_complete - self.start_time) * 1000, 3)
+            timing['download'] = self._span('receive_response_headers.complete', 'receive_response_body.complete')
+        elif isinstance(response, RequestsResponse):
+            timing['ttfb'] = round(response.elapsed.total_seconds() * 1000, 3)
+            if total is not None:
+                timing['download'] = round(max(total - timing['ttfb'], 0.0), 3)
+        return timing
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, MutableMapping
+from typing import Any, Callable, Iterator
+
+from httpfpt.utils.jsonpath_query import findall, findall_many, parse_simple_path
+
+_UNLOADED = object()
+
+
+class ResponseData(MutableMapping):
+    """
+    响应数据
+
+    与 dict 用法一致, 通过 set_lazy 设置的字段在首次读取时才加载并缓存, 响应体仅以原始字节保留一份,
+    text 解码与 json 解析只在断言、变量提取或日志实际读取时执行
+    """
+
+    def __init__(self, data: dict | None = None) -> None:
+        self._data: dict[str, Any] = dict(data or {})
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._jsonpath_results: dict[str, list] = {}
+
+    def set_lazy(self, key: str, loader: Callable[[], Any]) -> None:
+        """
+        设置延迟加载字段
+
+        :param key:
+        :param loader:
+        :return:
+        """
+        self._data[key] = _UNLOADED
+        self._loaders[key] = loader
+
+    def is_loaded(self, key: str) -> bool:
+        """
+        字段是否已加载
+
+        :param key:
+        :return:
+        """
+        return self._data.get(key) is not _UNLOADED
+
+    def replace_with(self, other: ResponseData) -> None:
+        """
+        使用新的响应数据替换当前数据, 已持有当前对象的引用随之更新
+
+        :param other:
+        :return:
+        """
+        self._data = dict(other._data)
+        self._loaders = dict(other._loaders)
+        self._jsonpath_results.clear()
+
+    def jsonpath_findall(self, path: str) -> list:
+        """
+        获取 jsonpath 表达式匹配的所有值, 相同表达式的结果在响应数据修改前复用
+
+        :param path:
+        :return:
+        """
+        results = self._jsonpath_results.get(path)
+        if results is None:
+            results = self._jsonpath_results[path] = findall(path, self)
+        return results
+
+    def jsonpath_prefetch(self, paths: Iterable[str]) -> None:
+        """
+        单次遍历预取多个简单路径的 jsonpath 表达式结果, 其他表达式在取值时计算
+
+        :param paths:
+        :return:
+        """
+        paths = [p for p in paths if p not in self._jsonpath_results and parse_simple_path(p) is not None]
+        if paths:
+            self._jsonpath_results.update(findall_many(paths, self))
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        if value is _UNLOADED:
+            value = self._loaders.pop(key)()
+            self._data[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._loaders.pop(key, None)
+        self._jsonpath_results.clear()
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self._loaders.pop(key, None)
+        self._jsonpath_results.clear()
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __str__(self) -> str:
+        return self.__repr__()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from http.cookiejar import Cookie, DefaultCookiePolicy
+from typing import Any
+
+import httpx
+import requests
+
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+from httpfpt.common.errors import SendRequestError
+from httpfpt.common.log import log
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.enums.request.engin import EnginType
+from httpfpt.enums.request.session_scope import SessionScopeType
+from httpfpt.utils.enum_control import get_enum_values
+
+
+class _NoStoreCookiePolicy(DefaultCookiePolicy):
+    """会话 cookie 策略, 不保存服务端设置的 cookie, 重定向所需的 cookie 保存在 requests 为每个请求创建的 cookie jar"""
+
+    def set_ok(self, cookie: Cookie, request: Any) -> bool:
+        return False
+
+
+class SessionManager:
+    """
+    请求会话管理, 按 (引擎, verify, proxies, redirects, http2) 复用连接池, cookie 不在请求间共享
+
+    requests 会话不保存 cookie; httpx 仅复用 transport 连接池, 每次请求使用独立的客户端及 cookie
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def scope(self) -> str:
+        scope = httpfpt_config.REQUEST_SESSION_SCOPE
+        if scope not in get_enum_values(SessionScopeType):
+            raise SendRequestError(f'会话作用域 {scope} 错误, 请使用 case / module / session')
+        return scope
+
+    @property
+    def pool_size(self) -> int:
+        return httpfpt_config.REQUEST_POOL_SIZE
+
+    @staticmethod
+    def _session_key(engin: str, verify: Any, proxies: dict | None, redirects: Any, http2: bool = False) -> tuple:
+        proxies_key = tuple(sorted(proxies.items())) if proxies else None
+        return engin, verify, proxies_key, redirects, http2
+
+    def _create_requests_session(self) -> requests.Session:
+        session = requests.session()
+        session.cookies = RequestsCookieJar(policy=_NoStoreCookiePolicy())
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _http2_check(http2: bool) -> None:
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise SendRequestError('启用 HTTP/2 失败，缺少 h2 依赖，请执行: pip install httpfpt[http2]')
+
+    def _create_httpx_transports(
+        self, verify: Any, proxies: dict | None, http2: bool
+    ) -> tuple[httpx.HTTPTransport, dict[str, httpx.HTTPTransport]]:
+        self._http2_check(http2)
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        transport = httpx.HTTPTransport(verify=verify, http2=http2, limits=limits)
+        mounts = {}
+        if proxies:
+            for pattern, proxy in proxies.items():
+                if proxy:
+                    mounts[pattern] = httpx.HTTPTransport(proxy=proxy, verify=verify, http2=http2, limits=limits)
+        return transport, mounts
+
+    def _create_httpx_async_transports(
+        self, verify: Any, proxies: dict | None, http2: bool
+    ) -> tuple[httpx.AsyncHTTPTransport, dict[str, httpx.AsyncHTTPTransport]]:
+        self._http2_check(http2)
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        transport = httpx.AsyncHTTPTransport(verify=verify, http2=http2, limits=limits)
+        mounts = {}
+        if proxies:
+            for pattern, proxy in proxies.items():
+                if proxy:
+                    mounts[pattern] = httpx.AsyncHTTPTransport(proxy=proxy, verify=verify, http2=http2, limits=limits)
+        return transport, mounts
+
+    def get_requests_session(self, verify: Any, proxies: dict | None, redirects: Any) -> requests.Session:
+        """
+        获取 requests 会话
+
+        :param verify:
+        :param proxies:
+        :param redirects:
+        :return:
+        """
+        key = self._session_key(EnginType.requests, verify, proxies, redirects)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._create_requests_session()
+                self._sessions[key] = session
+                log.debug(f'创建 requests 会话: {key}')
+        return session
+
+    def get_httpx_client(self, verify: Any, proxies: dict | None, redirects: bool, http2: bool = False) -> httpx.Client:
+        """
+        获取 httpx 客户端, 每次调用返回共享连接池的新客户端, 客户端的 cookie 仅在本次请求内有效
+
+        客户端关闭时会关闭共享的连接池, 因此无需关闭, 连接池由会话管理统一释放
+
+        :param verify:
+        :param proxies:
+        :param redirects:
+        :param http2:
+        :return:
+        """
+        key = self._session_key(EnginType.httpx, verify, proxies, redirects, http2)
+        with self._lock:
+            transports = self._sessions.get(key)
+            if transports is None:
+                transports = self._create_httpx_transports(verify, proxies, http2)
+                self._sessions[key] = transports
+                log.debug(f'创建 httpx 连接池: {key}')
+        transport, mounts = transports
+        return httpx.Client(transport=transport, mounts=mounts, follow_redirects=redirects)
+
+    def get_httpx_async_client(
+        self, verify: Any, proxies: dict | None, redirects: bool, http2: bool = False
+    ) -> httpx.AsyncClient:
+        """
+        获取 httpx 异步客户端, 每次调用返回共享连接池的新客户端, 客户端的 cookie 仅在本次请求内有效
+
+        异步连接池与事件循环绑定, 因此按当前事件循环区分, 客户端同样无需关闭
+
+        :param verify:
+        :param proxies:
+        :param redirects:
+        :param http2:
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        key = (*self._session_key(EnginType.httpx_async, verify, proxies, redirects, http2), loop)
+        with self._lock:
+            transports = self._sessions.get(key)
+            if transports is None:
+                transports = self._create_httpx_async_transports(verify, proxies, http2)
+                self._sessions[key] = transports
+                log.debug(f'创建 httpx 异步连接池: {key}')
+        transport, mounts = transports
+        return httpx.AsyncClient(transport=transport, mounts=mounts, follow_redirects=redirects)
+
+    def release(self, scope: SessionScopeType) -> None:
+        """
+        在作用域结束时释放会话, 仅当配置的作用域与之匹配时生效
+
+        :param scope:
+        :return:
+        """
+        if self.scope == scope:
+            self.close_all()
+
+    def close_all(self) -> None:
+        """
+        关闭所有会话
+
+        :return:
+        """
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        for key, session in sessions:
+            try:
+                if isinstance(session, requests.Session):
+                    session.close()
+                    continue
+                transport, mounts = session
+                if isinstance(transport, httpx.AsyncHTTPTransport):
+                    loop = key[-1]
+                    # 事件循环已关闭或正在运行时无法在此同步关闭, 交由垃圾回收处理
+                    if not loop.is_closed() and not loop.is_running():
+                        for t in (transport, *mounts.values()):
+                            loop.run_until_complete(t.aclose())
+                else:
+                    for t in (transport, *mounts.values()):
+                        t.close()
+            except Exception as e:
+                log.warning(f'关闭请求会话失败: {e}')
+
+    async def aclose_all(self) -> None:
+        """
+        关闭当前事件循环下的所有异步连接池
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key in self._sessions if key[-1] is loop]
+            transports = [self._sessions.pop(key) for key in keys]
+        for transport, mounts in transports:
+            for t in (transport, *mounts.values()):
+                try:
+                    await t.aclose()
+                except Exception as e:
+                    log.warning(f'关闭请求会话失败: {e}')
+
+
+session_manager = SessionManager()
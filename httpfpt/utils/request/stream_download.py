@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from typing import IO, AsyncIterator, Iterator
+
+from httpfpt.common.errors import SendRequestError
+from httpfpt.common.log import log
+
+_download_dir: str | None = None
+_download_dir_lock = threading.Lock()
+
+
+def get_download_dir() -> str:
+    """
+    获取本次运行的下载目录, 首次使用时创建
+
+    :return:
+    """
+    global _download_dir
+    with _download_dir_lock:
+        if _download_dir is None:
+            _download_dir = tempfile.mkdtemp(prefix='httpfpt_download_')
+            # 非 pytest 运行 (如压测) 时在进程退出时清理
+            atexit.register(cleanup_download_dir)
+        return _download_dir
+
+
+def cleanup_download_dir() -> None:
+    """
+    删除本次运行的下载目录及其中的所有下载文件
+
+    :return:
+    """
+    global _download_dir
+    with _download_dir_lock:
+        if _download_dir is not None:
+            shutil.rmtree(_download_dir, ignore_errors=True)
+            _download_dir = None
+
+
+class StreamDownload:
+    """
+    流式下载, 分块接收响应体, 边接收边计算摘要与大小, 响应体不缓存在内存中
+
+    save 为 True 时写入本次运行的下载目录, 运行结束时删除, 否则接收后直接丢弃
+    """
+
+    def __init__(
+        self,
+        save: bool = False,
+        hash: str | None = 'sha256',
+        max_size: int | None = None,
+        chunk_size: int = 65536,
+    ) -> None:
+        self.save = save
+        self.hash = hash
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self._hasher: hashlib._Hash | None = None
+        self._file: IO[bytes] | None = None
+        self._path: str | None = None
+        self._size = 0
+        self._start = 0.0
+        self._elapsed = 0.0
+
+    def _reset(self, content_length: str | None) -> None:
+        if self.max_size is not None and content_length and content_length.isdigit():
+            if int(content_length) > self.max_size:
+                raise SendRequestError(f'响应体大小 {content_length} 字节超出下载限制 {self.max_size} 字节')
+        self._hasher = hashlib.new(self.hash) if self.hash else None
+        self._size = 0
+        if self.save:
+            # 重试时覆盖写入同一临时文件
+            if self._path is None:
+                fd, self._path = tempfile.mkstemp(dir=get_download_dir())
+                self._file = os.fdopen(fd, 'wb')
+            else:
+                self._file = open(self._path, 'wb')
+        self._start = time.perf_counter()
+
+    def _write(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        if self.max_size is not None and self._size > self.max_size:
+            raise SendRequestError(f'响应体大小超出下载限制 {self.max_size} 字节')
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+
+    def _finish(self) -> None:
+        self._elapsed = time.perf_counter() - self._start
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        log.info(f'下载完成: {self._size} 字节')
+
+    def consume(self, chunks: Iterator[bytes], content_length: str | None = None) -> None:
+        """
+        接收响应体
+
+        :param chunks:
+        :param content_length:
+        :return:
+        """
+        self._reset(content_length)
+        try:
+            for chunk in chunks:
+                self._write(chunk)
+        finally:
+            self._finish()
+
+    async def aconsume(self, chunks: AsyncIterator[bytes], content_length: str | None = None) -> None:
+        """
+        异步接收响应体
+
+        :param chunks:
+        :param content_length:
+        :return:
+        """
+        self._reset(content_length)
+        try:
+            async for chunk in chunks:
+                self._write(chunk)
+        finally:
+            self._finish()
+
+    def result(self) -> dict:
+        """
+        下载结果
+
+        :return: path: 下载文件路径, 运行结束时删除, size: 字节数, hash: 摘要,
+            elapsed: 下载耗时 ms, throughput: 吞吐量 B/s
+        """
+        return {
+            'path': self._path,
+            'size': self._size,
+            'hash_algorithm': self.hash,
+            'hash': self._hasher.hexdigest() if self._hasher is not None else None,
+            'elapsed': round(self._elapsed * 1000, 3),
+            'throughput': round(self._size / self._elapsed, 2) if self._elapsed else 0.0,
+        }
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+from contextlib import ExitStack, contextmanager
+from typing import IO, AsyncIterator, Iterator
+
+_CHUNK_SIZE = 65536
+
+
+class FileBody:
+    """二进制请求体文件, 发送请求时才打开"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __repr__(self) -> str:
+        return self.path
+
+
+async def _aiter_file(file: IO[bytes]) -> AsyncIterator[bytes]:
+    # 在线程中读取文件, 避免阻塞事件循环
+    while chunk := await asyncio.to_thread(file.read, _CHUNK_SIZE):
+        yield chunk
+
+
+@contextmanager
+def open_upload_files(request_kwargs: dict, async_stream: bool = False) -> Iterator[dict]:
+    """
+    发送请求时打开上传文件, 请求结束后关闭; 文件以流的方式分块读取, 不整体读入内存
+
+    :param request_kwargs: 请求参数, files 为文件路径, data / content 可为 FileBody
+    :param async_stream: 二进制请求体是否转换为异步流, 用于 httpx 异步客户端
+    :return: 可直接用于发送请求的参数
+    """
+    with ExitStack() as stack:
+        kwargs = dict(request_kwargs)
+        files = kwargs.get('files')
+        if files:
+            if isinstance(files, dict):
+                kwargs['files'] = {k: stack.enter_context(open(v, 'rb')) for k, v in files.items()}
+            else:
+                kwargs['files'] = [(k, stack.enter_context(open(v, 'rb'))) for k, v in files]
+        for key in ('data', 'content'):
+            body = kwargs.get(key)
+            if isinstance(body, FileBody):
+                file = stack.enter_context(open(body.path, 'rb'))
+                headers = dict(kwargs.get('headers') or {})
+                # 显式声明长度, 避免 httpx 对流式请求体使用分块传输
+                if not any(k.lower() == 'content-length' for k in headers):
+                    headers['Content-Length'] = str(os.fstat(file.fileno()).st_size)
+                kwargs['headers'] = headers
+                kwargs[key] = _aiter_file(file) if async_stream else file
+        yield kwargs
@@ -1,4 +1,4 @@
-from jsonpath import findall
+from collections.abc import Mapping
 
 from httpfpt.common.env_handler import write_env_vars
 from httpfpt.common.errors import JsonPathFindError, VariableError
@@ -6,9 +6,11 @@ from httpfpt.common.variable_cache import variable_cache
 from httpfpt.common.yaml_handler import write_yaml_vars
 from httpfpt.core.path_conf import httpfpt_path
 from httpfpt.enums.var_type import VarType
+from httpfpt.utils.jsonpath_query import findall
+from httpfpt.utils.request.response_data import ResponseData
 
 
-def record_variables(jsonpath: str, target: dict, key: str, set_type: str, env: str) -> None:
+def record_variables(jsonpath: str, target: Mapping, key: str, set_type: str, env: str) -> None:
     """
     记录变量
 
@@ -19,7 +21,7 @@ def record_variables(jsonpath: str, target: dict, key: str, set_type: str, env:
     :param env:
     :return:
     """
-    value = findall(jsonpath, target)
+    value = target.jsonpath_findall(jsonpath) if isinstance(target, ResponseData) else findall(jsonpath, target)
     if not value:
         raise JsonPathFindError(f'jsonpath 取值失败, 表达式: {jsonpath}')
     value_str = str(value[0])
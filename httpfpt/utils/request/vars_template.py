@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import re
+
+# 字面量或变量名 (以单元素元组表示)
+_Segment = str | tuple[str]
+
+
+@dataclass(frozen=True)
+class StrTemplate:
+    """已编译的字符串模板"""
+
+    segments: tuple[_Segment, ...]
+    # 整个字符串仅为一个变量时的变量名, 渲染时保留变量值的原始类型
+    whole: str | None = None
+
+    def render(self, resolve: Callable[[str], Any], keep_type: bool = True) -> Any:
+        """
+        渲染模板
+
+        :param resolve: 变量解析函数, 接收变量名, 返回变量值
+        :param keep_type: 整个字符串仅为一个变量时, 是否保留变量值的原始类型
+        :return:
+        """
+        if self.whole is not None:
+            value = resolve(self.whole)
+            return value if keep_type else str(value)
+        return ''.join(seg if isinstance(seg, str) else str(resolve(seg[0])) for seg in self.segments)
+
+
+@lru_cache(maxsize=4096)
+def compile_str(pattern: re.Pattern[str], source: str) -> StrTemplate | None:
+    """
+    编译字符串模板, 不含变量时返回 None
+
+    :param pattern: 变量匹配规则, 各分支分组中匹配到的内容为变量名
+    :param source:
+    :return:
+    """
+    segments: list[_Segment] = []
+    pos = 0
+    for match in pattern.finditer(source):
+        var_key = match.group(match.lastindex or 0)
+        if match.start() > pos:
+            segments.append(source[pos : match.start()])
+        segments.append((var_key,))
+        pos = match.end()
+    if not segments:
+        return None
+    if pos < len(source):
+        segments.append(source[pos:])
+    whole = segments[0][0] if len(segments) == 1 and isinstance(segments[0], tuple) else None
+    return StrTemplate(tuple(segments), whole)
+
+
+def render(
+    target: Any,
+    pattern: re.Pattern[str],
+    resolve: Callable[[str], Any],
+    skip: Callable[[Any], bool] | None = None,
+    keep_type: bool = True,
+) -> Any:
+    """
+    单次遍历数据结构并替换变量; 未包含变量的部分原样返回, 不产生副本
+
+    :param target:
+    :param pattern:
+    :param resolve:
+    :param skip: 判断数据是否跳过替换
+    :param keep_type: 整个字符串仅为一个变量时, 是否保留变量值的原始类型
+    :return:
+    """
+    if skip is not None and skip(target):
+        return target
+    if isinstance(target, str):
+        template = compile_str(pattern, target)
+        return target if template is None else template.render(resolve, keep_type)
+    if isinstance(target, dict):
+        rendered_dict = {}
+        changed = False
+        for k, v in target.items():
+            new_k = k
+            if isinstance(k, str):
+                template = compile_str(pattern, k)
+                if template is not None:
+                    new_k = template.render(resolve, keep_type=False)
+            new_v = render(v, pattern, resolve, skip, keep_type)
+            changed = changed or new_k is not k or new_v is not v
+            rendered_dict[new_k] = new_v
+        return rendered_dict if changed else target
+    if isinstance(target, (list, tuple)):
+        rendered_list = [render(v, pattern, resolve, skip, keep_type) for v in target]
+        if all(new is old for new, old in zip(rendered_list, target)):
+            return target
+        return rendered_list if isinstance(target, list) else tuple(rendered_list)
+    return target
@@ -0,0 +1,5 @@
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.enums.storage_backend import StorageBackendType
+
+# 使用内存存储运行测试, 无需 redis 服务, 须在导入存储模块前设置
+httpfpt_config.STORAGE_BACKEND = StorageBackendType.MEMORY
@@ -0,0 +1,125 @@
+import json
+import os
+import pathlib
+
+from collections.abc import Iterator
+
+import pytest
+
+from httpfpt.db.storage import MemoryStorage, storage_client
+from httpfpt.utils.case_data_file import CaseDataFileLoader
+from httpfpt.utils.request import case_data_parse
+from httpfpt.utils.request.case_plan import CasePlanCache
+
+
+@pytest.fixture
+def storage() -> Iterator[MemoryStorage]:
+    assert isinstance(storage_client, MemoryStorage)
+    storage_client.delete_prefix(storage_client.prefix)
+    yield storage_client
+    storage_client.delete_prefix(storage_client.prefix)
+
+
+@pytest.fixture
+def case_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setattr(
+        case_data_parse, 'search_all_case_data_files', lambda: sorted(str(p) for p in tmp_path.iterdir() if p.is_file())
+    )
+    monkeypatch.setattr(CasePlanCache, 'plan_dir', property(lambda self: str(tmp_path / 'case_plan')))
+    monkeypatch.setattr(CaseDataFileLoader, 'snapshot_dir', property(lambda self: str(tmp_path / 'case_snapshot')))
+    return tmp_path
+
+
+@pytest.fixture
+def loaded(monkeypatch: pytest.MonkeyPatch) -> list:
+    loaded = []
+    load = case_data_parse._load_case_data_file
+
+    def spy(filepath: str, pydantic_verify: bool) -> dict:
+        loaded.append(os.path.basename(filepath))
+        return load(filepath, pydantic_verify)
+
+    monkeypatch.setattr(case_data_parse, '_load_case_data_file', spy)
+    return loaded
+
+
+def _write_case(case_dir: pathlib.Path, filename: str, url: str = '/posts/1') -> None:
+    case_data = {
+        'config': {'module': 'm'},
+        'test_steps': {'case_id': filename.split('.')[0], 'request': {'method': 'GET', 'url': url}},
+    }
+    (case_dir / filename).write_text(json.dumps(case_data), encoding='utf-8')
+
+
+def _stored(storage: MemoryStorage, filename: str) -> dict | None:
+    data = storage.get(f'{storage.case_data_prefix}:{filename}')
+    return json.loads(data) if data is not None else None
+
+
+def test_unchanged_files_are_skipped(storage: MemoryStorage, case_dir: pathlib.Path, loaded: list) -> None:
+    _write_case(case_dir, 'a.json')
+    _write_case(case_dir, 'b.json')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert sorted(loaded) == ['a.json', 'b.json']
+    assert _stored(storage, 'a.json')['test_steps']['case_id'] == 'a'
+
+    loaded.clear()
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert loaded == []
+
+
+def test_changed_file_is_refreshed(storage: MemoryStorage, case_dir: pathlib.Path, loaded: list) -> None:
+    _write_case(case_dir, 'a.json')
+    _write_case(case_dir, 'b.json')
+    case_data_parse.case_data_init(pydantic_verify=False)
+
+    loaded.clear()
+    _write_case(case_dir, 'a.json', url='/posts/1000')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert loaded == ['a.json']
+    assert _stored(storage, 'a.json')['test_steps']['request']['url'] == '/posts/1000'
+
+
+def test_version_change_reloads_all_files(
+    storage: MemoryStorage, case_dir: pathlib.Path, loaded: list, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_case(case_dir, 'a.json')
+    case_data_parse.case_data_init(pydantic_verify=False)
+
+    loaded.clear()
+    monkeypatch.setattr(case_data_parse, '__version__', '0.0.0-test')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert loaded == ['a.json']
+
+
+def test_deleted_file_is_removed(storage: MemoryStorage, case_dir: pathlib.Path, loaded: list) -> None:
+    _write_case(case_dir, 'a.json')
+    _write_case(case_dir, 'b.json')
+    case_data_parse.case_data_init(pydantic_verify=False)
+
+    (case_dir / 'b.json').unlink()
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert _stored(storage, 'a.json') is not None
+    assert _stored(storage, 'b.json') is None
+
+    loaded.clear()
+    _write_case(case_dir, 'b.json')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert loaded == ['b.json']
+
+
+def test_stale_snapshots_are_evicted(storage: MemoryStorage, case_dir: pathlib.Path, loaded: list) -> None:
+    snapshot_dir = case_dir / 'case_snapshot'
+    (case_dir / 'a.yaml').write_text('config:\n  module: m\ntest_steps:\n  case_id: a\n', encoding='utf-8')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    snapshots = os.listdir(snapshot_dir)
+    assert len(snapshots) == 1
+
+    (case_dir / 'a.yaml').write_text('config:\n  module: n\ntest_steps:\n  case_id: a\n', encoding='utf-8')
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert len(os.listdir(snapshot_dir)) == 1
+    assert os.listdir(snapshot_dir) != snapshots
+
+    (case_dir / 'a.yaml').unlink()
+    case_data_parse.case_data_init(pydantic_verify=False)
+    assert os.listdir(snapshot_dir) == []
@@ -0,0 +1,56 @@
+import json
+
+from collections.abc import Iterator
+
+import pytest
+
+from httpfpt.db.storage import storage_client
+from httpfpt.utils.case_index import CaseIndex
+
+
+@pytest.fixture
+def index() -> Iterator[CaseIndex]:
+    storage_client.delete_prefix(storage_client.prefix)
+    storage_client.set_many(
+        {
+            f'{storage_client.case_data_prefix}:a.json': json.dumps(
+                {
+                    'config': {'module': 'a'},
+                    'test_steps': [{'case_id': 'a_1', 'request': {'url': '/a/1'}}, {'case_id': 'a_2'}],
+                }
+            ),
+            f'{storage_client.case_data_prefix}:b.json': json.dumps(
+                {
+                    'config': {'module': 'b'},
+                    'test_steps': {'case_id': 'b_1'},
+                }
+            ),
+        }
+    )
+    yield CaseIndex()
+    storage_client.delete_prefix(storage_client.prefix)
+
+
+def test_get_returns_case_step(index: CaseIndex) -> None:
+    assert sorted(index.index) == ['a_1', 'a_2', 'b_1']
+    assert index.get('a_1') == {'config': {'module': 'a'}, 'test_steps': {'case_id': 'a_1', 'request': {'url': '/a/1'}}}
+    assert index.get('b_1') == {'config': {'module': 'b'}, 'test_steps': {'case_id': 'b_1'}}
+    assert index.get('missing') is None
+    assert 'a_2' in index
+
+
+def test_get_returns_copy(index: CaseIndex) -> None:
+    case_data = index.get('a_1')
+    case_data['config']['module'] = 'x'
+    case_data['test_steps']['request']['url'] = '/x'
+    assert index.get('a_1') == {'config': {'module': 'a'}, 'test_steps': {'case_id': 'a_1', 'request': {'url': '/a/1'}}}
+
+
+def test_clear_reloads_index(index: CaseIndex) -> None:
+    assert 'c_1' not in index
+    storage_client.set(
+        f'{storage_client.case_data_prefix}:c.json', json.dumps({'config': {}, 'test_steps': {'case_id': 'c_1'}})
+    )
+    assert 'c_1' not in index
+    index.clear()
+    assert 'c_1' in index
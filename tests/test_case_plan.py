@@ -0,0 +1,80 @@
+import os
+import pathlib
+
+import pytest
+
+from httpfpt.utils.request.case_plan import CasePlanCache
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> CasePlanCache:
+    monkeypatch.setattr(CasePlanCache, 'plan_dir', property(lambda self: str(tmp_path)))
+    return CasePlanCache()
+
+
+def _request_data(case_id: str = 'case_001', url: str = '/api/user') -> dict:
+    return {'config': {'module': 'user'}, 'test_steps': {'case_id': case_id, 'request': {'url': url}}}
+
+
+def test_plan_key_follows_case_data(cache: CasePlanCache) -> None:
+    key = cache.get_plan_key(_request_data(), 'requests')
+    assert key == cache.get_plan_key(_request_data(), 'requests')
+    assert key != cache.get_plan_key(_request_data(url='/api/order'), 'requests')
+    assert key != cache.get_plan_key(_request_data(), 'httpx')
+    assert cache.get_plan_key({'test_steps': {'case_id': 'case_001', 'body': object()}}, 'requests') is None
+
+
+def test_plan_is_compiled_once(cache: CasePlanCache) -> None:
+    calls = []
+    key = cache.get_plan_key(_request_data(), 'requests')
+
+    def compiler() -> dict:
+        calls.append(1)
+        return {'url': '/api/user', 'headers': {'a': '1'}}
+
+    plan = cache.get(key, compiler)
+    assert cache.get(key, compiler) is plan
+    assert calls == [1]
+    data = plan.materialize()
+    data['headers']['a'] = '2'
+    assert plan.materialize() == {'url': '/api/user', 'headers': {'a': '1'}}
+
+
+def test_plan_is_persisted(cache: CasePlanCache) -> None:
+    key = cache.get_plan_key(_request_data(), 'requests')
+    cache.get(key, lambda: {'url': '/api/user'})
+    assert os.listdir(cache.plan_dir) == [f'{key}.json']
+    assert CasePlanCache().get(key, lambda: pytest.fail('plan should be loaded from disk')).materialize() == {
+        'url': '/api/user'
+    }
+
+
+def test_unserializable_plan_is_kept_in_memory(cache: CasePlanCache) -> None:
+    key = cache.get_plan_key(_request_data(), 'requests')
+    plan = cache.get(key, lambda: {'body': b'bytes'})
+    assert not os.path.exists(cache.plan_dir) or not os.listdir(cache.plan_dir)
+    assert plan.materialize() == {'body': b'bytes'}
+    assert plan.materialize() is not plan.materialize()
+
+
+def test_new_plan_replaces_previous_plan_of_case(cache: CasePlanCache) -> None:
+    old_key = cache.get_plan_key(_request_data(), 'requests')
+    cache.get(old_key, lambda: {'url': '/api/user'})
+    other_key = cache.get_plan_key(_request_data(), 'httpx')
+    cache.get(other_key, lambda: {'url': '/api/user'})
+    new_key = cache.get_plan_key(_request_data(url='/api/order'), 'requests')
+    cache.get(new_key, lambda: {'url': '/api/order'})
+    assert sorted(os.listdir(cache.plan_dir)) == sorted([f'{other_key}.json', f'{new_key}.json'])
+
+
+def test_evict_removes_plans_of_deleted_cases(cache: CasePlanCache) -> None:
+    key = cache.get_plan_key(_request_data(), 'requests')
+    cache.get(key, lambda: {'url': '/api/user'})
+    deleted_key = cache.get_plan_key(_request_data(case_id='case_002'), 'requests')
+    cache.get(deleted_key, lambda: {'url': '/api/user'})
+
+    cache.evict(['case_001'])
+    assert os.listdir(cache.plan_dir) == [f'{key}.json']
+    calls = []
+    cache.get(deleted_key, lambda: calls.append(1) or {'url': '/api/user'})
+    assert calls == [1]
@@ -0,0 +1,99 @@
+import sys
+
+import pytest
+
+from httpfpt.common.errors import CorrelateTestCaseError
+from httpfpt.utils.case_scheduler import (
+    build_case_dag,
+    circular_relate_verify,
+    find_circular_relate,
+    get_case_groups,
+    get_relate_case_ids,
+    get_xdist_args,
+)
+
+
+def _step(case_id: str, *relate: str) -> dict:
+    return {'case_id': case_id, 'setup': [{'testcase': r} for r in relate] or None}
+
+
+def test_get_relate_case_ids() -> None:
+    test_steps = {
+        'case_id': 'c',
+        'setup': [
+            {'testcase': 'a'},
+            {'sql': 'select 1'},
+            {'testcase': {'case_id': 'b', 'key': 'token', 'jsonpath': '$.data.token'}},
+        ],
+    }
+    assert get_relate_case_ids(test_steps) == ['a', 'b']
+    assert get_relate_case_ids({'case_id': 'c'}) == []
+
+
+def test_build_case_dag() -> None:
+    cases, dag = build_case_dag(
+        [
+            {'config': {'module': 'm1'}, 'test_steps': _step('a')},
+            {'config': {'module': 'm2'}, 'test_steps': [_step('b', 'a'), _step('c', 'a', 'b')]},
+        ]
+    )
+    assert dag == {'a': [], 'b': ['a'], 'c': ['a', 'b']}
+    assert cases['c'] == {'config': {'module': 'm2'}, 'test_steps': _step('c', 'a', 'b')}
+
+
+@pytest.mark.parametrize(
+    'dag',
+    [
+        {},
+        {'a': [], 'b': ['a'], 'c': ['a', 'b']},
+        # 菱形依赖不是循环
+        {'a': [], 'b': ['a'], 'c': ['a'], 'd': ['b', 'c']},
+        # 不存在的关联用例由执行时校验
+        {'a': ['missing'], 'b': ['a']},
+    ],
+)
+def test_no_circular_relate(dag: dict) -> None:
+    assert find_circular_relate(dag) is None
+    circular_relate_verify(dag)
+
+
+@pytest.mark.parametrize(
+    'dag, expected',
+    [
+        ({'a': ['a']}, ['a', 'a']),
+        ({'a': ['b'], 'b': ['a']}, ['a', 'b', 'a']),
+        ({'a': ['b'], 'b': ['c'], 'c': ['d'], 'd': ['b']}, ['b', 'c', 'd', 'b']),
+        ({'x': [], 'a': ['x', 'b'], 'b': ['c'], 'c': ['a']}, ['a', 'b', 'c', 'a']),
+    ],
+)
+def test_find_circular_relate(dag: dict, expected: list) -> None:
+    assert find_circular_relate(dag) == expected
+    with pytest.raises(CorrelateTestCaseError, match=' -> '.join(expected)):
+        circular_relate_verify(dag)
+
+
+def test_find_deep_circular_relate() -> None:
+    dag = {str(i): [str(i + 1)] for i in range(5000)}
+    dag['5000'] = ['0']
+    circular = find_circular_relate(dag)
+    assert circular is not None
+    assert len(circular) == 5002
+    assert circular[0] == circular[-1]
+
+
+def test_get_case_groups() -> None:
+    dag = {'a': [], 'b': ['a'], 'c': ['b'], 'd': [], 'e': ['f'], 'f': [], 'g': ['missing']}
+    assert get_case_groups(dag) == {'a': 'a', 'b': 'a', 'c': 'a', 'e': 'e', 'f': 'e'}
+
+
+def test_get_xdist_args() -> None:
+    with pytest.raises(ValueError):
+        get_xdist_args(0)
+    pytest.importorskip('xdist')
+    assert get_xdist_args(4) == ['-n', '4', '--dist', 'loadgroup']
+
+
+def test_get_xdist_args_without_xdist(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, 'xdist', None)
+    with pytest.raises(ImportError, match=r'pip install httpfpt\[xdist\]'):
+        get_xdist_args(4)
@@ -0,0 +1,81 @@
+import copy
+import os
+import pathlib
+
+import pytest
+
+from httpfpt.schemas.case_data import CaseData
+from httpfpt.utils.case_validation import CaseValidationCache
+
+CASE_DATA = {
+    'config': {'allure': {'epic': 'e', 'feature': 'f', 'story': 's'}, 'request': {'env': 'dev.env'}, 'module': 'm'},
+    'test_steps': {
+        'name': 'n',
+        'case_id': 'case_001',
+        'description': 'd',
+        'request': {
+            'method': 'GET',
+            'url': '/posts/1',
+            'params': None,
+            'headers': None,
+            'body_type': None,
+            'body': None,
+            'files': None,
+        },
+    },
+}
+
+
+@pytest.fixture
+def cache_file(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    filepath = str(tmp_path / 'case_validation.json')
+    monkeypatch.setattr(CaseValidationCache, 'filepath', property(lambda self: filepath))
+    return filepath
+
+
+@pytest.fixture
+def case_file(tmp_path: pathlib.Path) -> str:
+    filepath = tmp_path / 'case.yaml'
+    filepath.write_text('placeholder', encoding='utf-8')
+    return str(filepath)
+
+
+def test_valid_file_is_not_validated_again(cache_file: str, case_file: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = CaseValidationCache()
+    error, error_count, key = cache.validate(case_file, CASE_DATA, 'hash1')
+    assert (error, error_count) == (None, 0)
+    assert key is not None
+    cache.update({case_file: key})
+    assert os.path.exists(cache_file)
+
+    # 新进程从磁盘读取校验结果
+    monkeypatch.setattr(CaseData, 'model_validate', lambda *args, **kwargs: pytest.fail('should not validate'))
+    assert CaseValidationCache().validate(case_file, CASE_DATA, 'hash1') == (None, 0, None)
+
+
+def test_changed_file_is_validated_again(cache_file: str, case_file: str) -> None:
+    cache = CaseValidationCache()
+    cache.update({case_file: cache.validate(case_file, CASE_DATA, 'hash1')[2]})
+    assert cache.validate(case_file, CASE_DATA, 'hash2')[2] is not None
+
+
+def test_invalid_file(cache_file: str, case_file: str) -> None:
+    cache = CaseValidationCache()
+    cache.update({case_file: cache.validate(case_file, CASE_DATA, 'hash1')[2]})
+    case_data = copy.deepcopy(CASE_DATA)
+    del case_data['test_steps']['case_id']
+    error, error_count, key = cache.validate(case_file, case_data, 'hash2')
+    assert error is not None
+    assert error_count > 0
+    assert key is None
+    cache.update({}, [case_file])
+    assert not CaseValidationCache().is_valid(case_file, cache.get_key('hash1'))
+
+
+def test_deleted_file_is_pruned(cache_file: str, case_file: str) -> None:
+    cache = CaseValidationCache()
+    key = cache.validate(case_file, CASE_DATA, 'hash1')[2]
+    cache.update({case_file: key})
+    os.remove(case_file)
+    cache.update({os.path.abspath(cache_file): 'other'})
+    assert os.path.abspath(case_file) not in CaseValidationCache().results
@@ -0,0 +1,69 @@
+import pytest
+
+from httpfpt.common.errors import AssertSyntaxError
+from httpfpt.utils.code_assert import compile_code_assert
+from httpfpt.utils.request.response_data import ResponseData
+
+
+@pytest.fixture
+def response() -> ResponseData:
+    return ResponseData({'status_code': 200, 'json': {'code': 0, 'data': {'items': [1, 2], 'name': 'httpfpt'}}})
+
+
+@pytest.mark.parametrize(
+    'assert_text',
+    [
+        "assert pm.response.get('status_code') == 200",
+        "assert 200 == pm.response.get('status_code')",
+        "assert pm.response.get('json').get('code') != 1",
+        "assert pm.response.get('json')['data']['items'][0] < 2",
+        "assert pm.response.get('json')['data']['items'][-1] >= 2",
+        "assert 'x' not in pm.response.get('json')['data']['name']",
+        "assert 'http' in pm.response.get('json')['data']['name']",
+        "assert str(pm.response.get('status_code')) == '200'",
+        "assert pm.response.get('json')['data']['items'] == [1, 2]",
+        "assert pm.response.get('json')['data']['items'][:1] == [int('1')]",
+        "assert pm.response.get('json')['data']['name'] == IsStr(min_length=3)",
+        "assert pm.response.get('status_code') == 200, '状态码错误'",
+    ],
+)
+def test_allowed_code_assert(response: ResponseData, assert_text: str) -> None:
+    compile_code_assert(assert_text).execute(response)
+
+
+def test_failed_code_assert_keeps_message(response: ResponseData) -> None:
+    code_assert = compile_code_assert("assert pm.response.get('status_code') == 404, '状态码错误'")
+    assert code_assert.has_msg
+    with pytest.raises(AssertionError, match='状态码错误'):
+        code_assert.execute(response)
+
+
+@pytest.mark.parametrize(
+    'assert_text',
+    [
+        "pm.response.get('status_code') == 200",
+        "assert pm.response.get('status_code') == 200; import os",
+        "assert pm.response.get('status_code')",
+        "assert 1 < pm.response.get('status_code') < 300",
+        "assert pm.response.get('status_code') is 200",
+        "assert response.get('status_code') == 200",
+        "assert pm.response.get('status_code') == __import__('os').getcwd()",
+        "assert pm.response.get('status_code') == open('/etc/passwd').read()",
+        "assert pm.response.get('status_code') == (lambda: 200)()",
+        "assert pm.response.get('status_code') == [x for x in (200,)][0]",
+        'assert pm.response.__class__ == 200',
+        "assert pm.response.get('json').__class__ == dict",
+        "assert pm.response.get('status_code') == '{0.__class__}'.format(1)",
+        "assert pm.response.get('status_code') > IsInt",
+        "assert pm.response.get('status_code') == 200, pm",
+        "assert pm.response.get('status_code') == 200 + 0",
+    ],
+)
+def test_rejected_code_assert(assert_text: str) -> None:
+    with pytest.raises(AssertSyntaxError):
+        compile_code_assert(assert_text)
+
+
+def test_compile_code_assert_is_cached() -> None:
+    text = "assert pm.response.get('status_code') == 200"
+    assert compile_code_assert(text) is compile_code_assert(text)
@@ -0,0 +1,81 @@
+import json
+import math
+import random
+
+import pytest
+
+from httpfpt.utils.load_test.histogram import LatencyHistogram, _bucket_index, _bucket_lowest_value
+
+
+def _exact_percentile(values: list[float], percentile: float) -> float:
+    values = sorted(values)
+    return values[max(math.ceil(percentile / 100 * len(values)), 1) - 1]
+
+
+@pytest.fixture
+def latencies() -> list[float]:
+    rand = random.Random(0)
+    return [round(rand.lognormvariate(3, 1.2), 3) for _ in range(10000)]
+
+
+@pytest.mark.parametrize('value', [0, 1, 2047, 2048, 2049, 4095, 4096, 123456, 10**9])
+def test_bucket_contains_value(value: int) -> None:
+    index = _bucket_index(value)
+    assert _bucket_lowest_value(index) <= value < _bucket_lowest_value(index + 1)
+
+
+def test_empty_histogram() -> None:
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    assert set(histogram.summary().values()) == {0.0}
+
+
+@pytest.mark.parametrize('percentile', [0, 50, 90, 99, 99.9, 100])
+def test_percentile_relative_error(latencies: list[float], percentile: float) -> None:
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    exact = _exact_percentile(latencies, percentile)
+    # 记录时截断到微秒, 允许 1 微秒误差
+    assert exact - 0.001 <= histogram.percentile(percentile) <= exact * (1 + 1 / 1024) + 0.001
+
+
+def test_summary(latencies: list[float]) -> None:
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    summary = histogram.summary()
+    assert summary['min'] == pytest.approx(min(latencies), abs=0.001)
+    assert summary['max'] == pytest.approx(max(latencies), abs=0.001)
+    assert summary['mean'] == pytest.approx(sum(latencies) / len(latencies), abs=0.001)
+    assert summary['p50'] <= summary['p90'] <= summary['p99'] <= summary['p99.9'] <= summary['max']
+
+
+def test_merge_equals_single_histogram(latencies: list[float]) -> None:
+    expected = LatencyHistogram()
+    merged = LatencyHistogram()
+    parts = [LatencyHistogram() for _ in range(4)]
+    for i, latency in enumerate(latencies):
+        expected.record(latency)
+        parts[i % len(parts)].record(latency)
+    merged.merge(LatencyHistogram())
+    for part in parts:
+        merged.merge(part)
+    assert merged.to_dict() == expected.to_dict()
+    assert merged.summary() == expected.summary()
+
+
+def test_round_trip(latencies: list[float]) -> None:
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    data = json.loads(json.dumps(histogram.to_dict()))
+    restored = LatencyHistogram.from_dict(data)
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.summary() == histogram.summary()
+
+
+def test_round_trip_rejects_other_precision() -> None:
+    data = {**LatencyHistogram().to_dict(), 'sub_bucket_bits': 7}
+    with pytest.raises(ValueError):
+        LatencyHistogram.from_dict(data)
@@ -0,0 +1,97 @@
+import sys
+import types
+
+from collections.abc import Iterator
+
+import pytest
+
+from httpfpt.common.errors import HookError
+from httpfpt.core.get_conf import httpfpt_config
+from httpfpt.enums.hook_cache_scope import HookCacheScopeType
+from httpfpt.utils.request.hook_registry import HookRegistry, hook
+
+_MODULE_NAME = 'httpfpt_test_hooks'
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> Iterator[HookRegistry]:
+    calls = []
+    module = types.ModuleType(_MODULE_NAME)
+    module.calls = calls
+    module.limits = types.SimpleNamespace(page_size=20)
+    module.echo = lambda *args, **kwargs: (args, kwargs)
+    for scope in HookCacheScopeType:
+
+        @hook(cache=scope)
+        def counter(value: int = 0, scope: str = scope) -> int:
+            calls.append(scope)
+            return len(calls) + value
+
+        setattr(module, f'counter_{scope.value}', counter)
+    monkeypatch.setitem(sys.modules, _MODULE_NAME, module)
+    monkeypatch.setattr(httpfpt_config, 'HOOK_MODULES', [_MODULE_NAME])
+    yield HookRegistry()
+
+
+@pytest.mark.parametrize(
+    'expr, expected',
+    [
+        ('echo()', ((), {})),
+        ("echo(1, 'a', [1, 2], {'k': None})", ((1, 'a', [1, 2], {'k': None}), {})),
+        ('echo(10 / 2, 7 // 2, 7 % 2, 1 + 2 * 3 - 4)', ((5.0, 3, 1, 3), {})),
+        ('echo(-1, +1, not 0)', ((-1, 1, True), {})),
+        ('echo(limits.page_size, size=limits.page_size * 2)', ((20,), {'size': 40})),
+        ('echo(-limits.page_size, [limits.page_size])', ((-20, [20]), {})),
+    ],
+)
+def test_call_arguments(registry: HookRegistry, expr: str, expected: tuple) -> None:
+    assert registry.call(expr) == expected
+
+
+@pytest.mark.parametrize(
+    'expr',
+    [
+        'echo(',
+        'echo',
+        'limits.page_size()',
+        'echo(*[1])',
+        'echo(**{})',
+        'echo(len([1]))',
+        "echo(f'{limits}')",
+        'echo(2 ** 10)',
+        'echo(limits.__class__)',
+        'echo(missing)',
+        'echo(open)',
+        'echo(1 / 0)',
+        'missing()',
+    ],
+)
+def test_invalid_call(registry: HookRegistry, expr: str) -> None:
+    with pytest.raises(HookError):
+        registry.call(expr)
+
+
+def test_invalid_cache_scope() -> None:
+    with pytest.raises(HookError):
+        hook(cache='forever')
+
+
+def test_no_cache(registry: HookRegistry) -> None:
+    assert registry.call('counter_none()') == 1
+    assert registry.call('counter_none()') == 2
+
+
+@pytest.mark.parametrize('scope', [HookCacheScopeType.CASE, HookCacheScopeType.MODULE, HookCacheScopeType.SESSION])
+def test_cache_scope(registry: HookRegistry, scope: HookCacheScopeType) -> None:
+    assert registry.call(f'counter_{scope.value}()') == 1
+    assert registry.call(f'counter_{scope.value}()') == 1
+    # 参数不同时为不同的调用
+    assert registry.call(f'counter_{scope.value}(10)') == 12
+    for other in HookCacheScopeType:
+        if other != scope:
+            registry.release(other)
+    assert registry.call(f'counter_{scope.value}()') == 1
+
+    registry.release(scope)
+    assert registry.call(f'counter_{scope.value}()') == 3
+    assert registry.call(f'counter_{scope.value}(10)') == 14
@@ -0,0 +1,80 @@
+import pytest
+
+from httpfpt.utils.jsonpath_query import compile_jsonpath, findall, findall_many, parse_simple_path
+
+DATA = {
+    'code': 200,
+    'data': {
+        'items': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}],
+        'total': 2,
+        'a-b': 'dash',
+        'with space': 'space',
+        '0': 'zero key',
+        'empty': None,
+        'text': 'abc',
+    },
+}
+
+
+@pytest.mark.parametrize(
+    'path, expected',
+    [
+        ('$', ()),
+        ('$.code', ('code',)),
+        ('$.data.items[0].id', ('data', 'items', 0, 'id')),
+        ('$.data.items[-1]', ('data', 'items', -1)),
+        ("$['data']['with space']", ('data', 'with space')),
+        ('$["data"].total', ('data', 'total')),
+        ('$.data.a-b', ('data', 'a-b')),
+    ],
+)
+def test_parse_simple_path(path: str, expected: tuple) -> None:
+    assert parse_simple_path(path) == expected
+
+
+@pytest.mark.parametrize('path', ['data.code', '$..id', '$.data.items[*].id', '$.data.items[0:1]', '$.data[?@.id]'])
+def test_parse_simple_path_rejects_complex_path(path: str) -> None:
+    assert parse_simple_path(path) is None
+
+
+@pytest.mark.parametrize(
+    'path',
+    [
+        '$',
+        '$.code',
+        '$.data.items[0].id',
+        '$.data.items[1].name',
+        '$.data.items[-1].id',
+        '$.data.items[5]',
+        '$.data.items[-3]',
+        '$.data.total',
+        '$.data.empty',
+        '$.data.missing',
+        '$.data.missing.deeper',
+        "$['data']['with space']",
+        '$.data[0]',
+        '$.data.text[0]',
+        '$.code.value',
+    ],
+)
+def test_findall_fast_path_matches_python_jsonpath(path: str) -> None:
+    assert parse_simple_path(path) is not None
+    assert findall(path, DATA) == compile_jsonpath(path).findall(DATA)
+
+
+@pytest.mark.parametrize('path', ['$..id', '$.data.items[*].name', '$.data.items[0:1]'])
+def test_findall_complex_path_matches_python_jsonpath(path: str) -> None:
+    assert findall(path, DATA) == compile_jsonpath(path).findall(DATA)
+
+
+def test_findall_many_matches_findall() -> None:
+    paths = [
+        '$.data.items[0].id',
+        '$.data.items[0].name',
+        '$.data.items[1].id',
+        '$.data.total',
+        '$.data.missing',
+        '$..name',
+        '$',
+    ]
+    assert findall_many(paths, DATA) == {path: findall(path, DATA) for path in paths}
@@ -0,0 +1,129 @@
+import pytest
+
+from httpfpt.common.send_request import send_request
+from httpfpt.common.variable_cache import variable_cache
+from httpfpt.db.mysql import mysql_client
+from httpfpt.enums.query_fetch_type import QueryFetchType
+from httpfpt.utils.assert_control import asserter
+
+
+class _Cursor:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+        self.rows: list = []
+
+    def execute(self, sql: str) -> int:
+        self.calls.append(('execute', sql))
+        if sql.startswith('BAD'):
+            raise RuntimeError(sql)
+        self.rows = [{'sql': sql}]
+        return 1
+
+    def fetchall(self) -> list:
+        return self.rows
+
+    def fetchone(self) -> dict:
+        return self.rows[0]
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    def cursor(self, cursor: object = None) -> _Cursor:
+        return _Cursor(self.calls)
+
+    def commit(self) -> None:
+        self.calls.append(('commit',))
+
+    def rollback(self) -> None:
+        self.calls.append(('rollback',))
+
+    def close(self) -> None:
+        self.calls.append(('close',))
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list:
+    calls: list = []
+
+    def init() -> tuple:
+        calls.append(('connect',))
+        conn = _Connection(calls)
+        return conn, conn.cursor()
+
+    monkeypatch.setattr(mysql_client, 'init', init)
+    return calls
+
+
+def test_session_shares_one_connection(calls: list) -> None:
+    with mysql_client.session():
+        assert not mysql_client.is_connected()
+        mysql_client.execute('INSERT INTO t VALUES (1)')
+        mysql_client.query('SELECT 1', QueryFetchType.ONE)
+        assert mysql_client.is_connected()
+    assert calls.count(('connect',)) == 1
+    assert calls[-1] == ('close',)
+
+
+def test_failed_case_keeps_committed_statements(calls: list) -> None:
+    with pytest.raises(AssertionError), mysql_client.session():
+        mysql_client.execute('DELETE FROM t WHERE id = 1')
+        raise AssertionError
+    assert calls == [('connect',), ('execute', 'DELETE FROM t WHERE id = 1'), ('commit',), ('close',)]
+
+
+def test_failed_statement_only_rolls_back_itself(calls: list) -> None:
+    with mysql_client.session():
+        mysql_client.execute('INSERT INTO t VALUES (1)')
+        with pytest.raises(RuntimeError):
+            mysql_client.execute('BAD SQL')
+    assert calls[1:5] == [('execute', 'INSERT INTO t VALUES (1)'), ('commit',), ('execute', 'BAD SQL'), ('rollback',)]
+
+
+def test_query_batch_results_are_used_once(calls: list) -> None:
+    with mysql_client.session():
+        mysql_client.query_batch([('SELECT a', QueryFetchType.ALL), ('SELECT b', QueryFetchType.ONE)])
+        assert mysql_client.query('SELECT b', QueryFetchType.ONE) == {'sql': 'SELECT b'}
+        assert mysql_client.query('SELECT a', QueryFetchType.ALL) == [{'sql': 'SELECT a'}]
+        mysql_client.query('SELECT a', QueryFetchType.ALL)
+    assert [c[1] for c in calls if c[0] == 'execute'] == ['SELECT a', 'SELECT b', 'SELECT a']
+
+
+def test_sql_assert_variables_are_replaced_once(calls: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 每次读取变量时值都不同, 重复替换时断言的查询与批量执行的查询不一致
+    reads = []
+    get = variable_cache.get
+
+    def get_once(key: str, **kwargs: object) -> object:
+        if key == 't_sql_id':
+            reads.append(key)
+            return len(reads)
+        return get(key, **kwargs)
+
+    monkeypatch.setattr(variable_cache, 'get', get_once)
+    asserted = []
+
+    def exec_asserter(response_data: object, assert_text: dict) -> None:
+        asserted.append((assert_text['sql'], mysql_client.query(assert_text['sql'], QueryFetchType.ALL)))
+
+    monkeypatch.setattr(asserter, 'exec_asserter', exec_asserter)
+    parsed_data = {
+        'env': 'dev.env',
+        'teardown': [
+            {'assert': {'sql': 'SELECT ${t_sql_id}', 'jsonpath': '$.sql', 'value': 1}},
+            {'assert': {'sql': 'SELECT 2', 'jsonpath': '$.sql', 'value': 2}},
+        ],
+    }
+    response_data = send_request.init_response_metadata
+    response_data['stat']['timing'] = {'assert': 0.0}
+    with mysql_client.session():
+        for key, value, queries, vars_replaced in send_request._iter_teardown_steps(parsed_data, response_data):
+            mysql_client.query_batch(queries)
+            send_request._exec_teardown_step(parsed_data, response_data, key, value, vars_replaced)
+    assert reads == ['t_sql_id']
+    assert asserted == [('SELECT 1', [{'sql': 'SELECT 1'}]), ('SELECT 2', [{'sql': 'SELECT 2'}])]
+    assert [c[1] for c in calls if c[0] == 'execute'] == ['SELECT 1', 'SELECT 2']
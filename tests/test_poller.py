@@ -0,0 +1,39 @@
+from httpfpt.utils.request.poller import Poller
+from httpfpt.utils.request.response_data import ResponseData
+
+
+def test_defaults() -> None:
+    poller = Poller({'timeout': 10, 'assert': ['assert 1 == 1']})
+    assert (poller.interval, poller.backoff, poller.max_interval) == (0.2, 2.0, 5.0)
+    assert poller.request is True
+    assert Poller({'timeout': 10, 'assert': [], 'request': False}).request is False
+
+
+def test_delay_backs_off_up_to_max_interval() -> None:
+    poller = Poller({'timeout': 100, 'interval': 1, 'backoff': 3, 'max_interval': 10, 'assert': []})
+    assert [poller.next_delay() for _ in range(5)] == [1, 3, 9, 10, 10]
+    assert poller.attempts == 6
+
+
+def test_delay_does_not_pass_deadline() -> None:
+    poller = Poller({'timeout': 0.5, 'interval': 2, 'assert': []})
+    delay = poller.next_delay()
+    assert delay is not None
+    assert 0 < delay <= 0.5
+
+
+def test_no_delay_after_deadline() -> None:
+    poller = Poller({'timeout': 0, 'assert': []})
+    assert poller.next_delay() is None
+    assert poller.attempts == 1
+
+
+def test_record_appends_poll_stat() -> None:
+    response_data = ResponseData({'stat': {'poll': None}})
+    poller = Poller({'timeout': 10, 'assert': []})
+    poller.record(response_data, passed=False)
+    poller.next_delay()
+    poller.record(response_data, passed=True)
+    records = response_data['stat']['poll']
+    assert [(r['attempts'], r['passed']) for r in records] == [(1, False), (2, True)]
+    assert records[1]['elapsed'] >= records[0]['elapsed'] >= 0
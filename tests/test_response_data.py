@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from httpfpt.common.errors import SendRequestError
+from httpfpt.common.send_request import SendRequests
+from httpfpt.utils.request.response_data import ResponseData
+
+
+def _record_response(content: bytes, content_type: str) -> ResponseData:
+    response = httpx.Response(
+        200,
+        content=content,
+        headers={'Content-Type': content_type},
+        request=httpx.Request('GET', 'http://127.0.0.1/'),
+    )
+    response.elapsed = timedelta(milliseconds=5)
+    response_data = SendRequests().init_response_metadata
+    SendRequests._record_response(response, response_data, {})
+    return response_data
+
+
+def test_lazy_field_loads_once() -> None:
+    calls = []
+    response_data = ResponseData({'status_code': 200})
+    response_data.set_lazy('json', lambda: calls.append(1) or {'code': 0})
+    assert not response_data.is_loaded('json')
+    assert len(response_data) == 2
+    assert response_data['json'] == {'code': 0}
+    assert response_data['json'] == {'code': 0}
+    assert response_data.is_loaded('json')
+    assert calls == [1]
+
+
+def test_set_lazy_field_replaces_loader() -> None:
+    response_data = ResponseData()
+    response_data.set_lazy('json', lambda: pytest.fail('loader should not run'))
+    response_data['json'] = {'code': 1}
+    assert response_data['json'] == {'code': 1}
+    del response_data['json']
+    assert 'json' not in response_data
+
+
+def test_record_response_decodes_lazily() -> None:
+    response_data = _record_response(b'{"code": 0}', 'application/json')
+    assert response_data['content'] == b'{"code": 0}'
+    assert not response_data.is_loaded('json')
+    assert not response_data.is_loaded('text')
+    assert response_data['json'] == {'code': 0}
+    assert response_data['text'] == '{"code": 0}'
+
+
+def test_non_json_response_falls_back_to_empty_dict() -> None:
+    response_data = _record_response(b'<html></html>', 'text/html')
+    assert response_data['json'] == {}
+    assert response_data['text'] == '<html></html>'
+
+
+def test_invalid_json_response_raises_on_first_access() -> None:
+    response_data = _record_response(b'not json', 'application/json')
+    with pytest.raises(SendRequestError):
+        _ = response_data['json']
@@ -0,0 +1,77 @@
+import pytest
+
+from httpfpt.utils.load_test.schedule import ArrivalSchedule
+
+
+def test_constant_schedule() -> None:
+    schedule = ArrivalSchedule('constant', 10, 20, 100)
+    times = list(schedule.send_times())
+    assert schedule.end_rate == 20
+    assert len(times) == pytest.approx(200, abs=1)
+    assert times[0] == 0.0
+    assert times[1] == pytest.approx(0.05)
+
+
+def test_ramp_schedule() -> None:
+    schedule = ArrivalSchedule('ramp', 10, 10, 30)
+    assert schedule.rate_at(0) == 10
+    assert schedule.rate_at(5) == 20
+    assert schedule.rate_at(10) == 30
+    assert schedule.rate_at(20) == 30
+    # 平均速率 20 次/s
+    assert len(list(schedule.send_times())) == pytest.approx(200, rel=0.02)
+
+
+def test_step_schedule() -> None:
+    schedule = ArrivalSchedule('step', 9, 10, 30, steps=3)
+    assert [schedule.rate_at(t) for t in (0, 2.9, 3, 5.9, 6, 9)] == [10, 10, 20, 20, 30, 30]
+    times = list(schedule.send_times())
+    assert len([t for t in times if t < 3]) == pytest.approx(30, abs=1)
+    assert len([t for t in times if 3 <= t < 6]) == pytest.approx(60, abs=1)
+    assert len([t for t in times if t >= 6]) == pytest.approx(90, abs=1)
+
+
+def test_single_step_schedule_keeps_start_rate() -> None:
+    schedule = ArrivalSchedule('step', 10, 10, 30)
+    assert schedule.rate_at(9) == 10
+
+
+def test_send_times_are_increasing_within_duration() -> None:
+    times = list(ArrivalSchedule('ramp', 5, 1, 50).send_times())
+    assert times == sorted(times)
+    assert len(set(times)) == len(times)
+    assert times[-1] < 5
+
+
+@pytest.mark.parametrize(
+    'rate, start_rate, end_rate',
+    [
+        ('50', 50, 50),
+        ('10:100', 10, 100),
+        ('0.5:2.5', 0.5, 2.5),
+    ],
+)
+def test_parse_rate(rate: str, start_rate: float, end_rate: float) -> None:
+    schedule = ArrivalSchedule.parse('ramp', 10, rate)
+    assert (schedule.start_rate, schedule.end_rate) == (start_rate, end_rate)
+
+
+@pytest.mark.parametrize('rate', ['abc', '10:', '1:2:3'])
+def test_parse_invalid_rate(rate: str) -> None:
+    with pytest.raises(ValueError):
+        ArrivalSchedule.parse('ramp', 10, rate)
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {'schedule': 'poisson', 'duration': 10, 'start_rate': 10},
+        {'schedule': 'constant', 'duration': 0, 'start_rate': 10},
+        {'schedule': 'constant', 'duration': 10, 'start_rate': 0},
+        {'schedule': 'ramp', 'duration': 10, 'start_rate': 10, 'end_rate': -1},
+        {'schedule': 'step', 'duration': 10, 'start_rate': 10, 'end_rate': 20, 'steps': 0},
+    ],
+)
+def test_invalid_schedule(kwargs: dict) -> None:
+    with pytest.raises(ValueError):
+        ArrivalSchedule(**kwargs)
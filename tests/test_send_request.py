@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+from typing import Any
+
+import pytest
+
+from httpfpt.common.send_request import SendRequests
+from httpfpt.enums.request.engin import EnginType
+from httpfpt.enums.teardown_type import TeardownType
+
+
+def test_async_request_runs_blocking_steps_off_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    sender = SendRequests()
+    threads: dict[str, int] = {}
+
+    def record(name: str, result: Any = None) -> Any:
+        threads[name] = threading.get_ident()
+        return result
+
+    async def send_async(*args: Any, **kwargs: Any) -> dict:
+        threads['send'] = threading.get_ident()
+        return {'stat': {'timing': {}}}
+
+    parsed_data = {'is_setup': False, 'is_teardown': True}
+    monkeypatch.setattr(sender, '_parse_request_data', lambda *args: record('parse', (parsed_data, 0.0)))
+    monkeypatch.setattr(sender, '_prepare_request', lambda *args: record('prepare', ({}, {})))
+    monkeypatch.setattr(sender, '_send_async', send_async)
+    monkeypatch.setattr(sender, '_handle_response', lambda *args: record('response'))
+    monkeypatch.setattr(
+        sender,
+        '_iter_teardown_steps',
+        lambda *args: iter(
+            [
+                (TeardownType.EXTRACT, {}, [], False),
+                (TeardownType.ASSERT, 'pm.test', [], False),
+            ]
+        ),
+    )
+    monkeypatch.setattr(sender, '_exec_teardown_item', lambda _p, _r, key, *args: record(key))
+
+    async def run() -> int:
+        await sender._send_request_async({}, request_engin=EnginType.httpx_async, log_data=False, relate_log=False)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert threads.pop('send') == loop_thread
+    assert set(threads) == {'parse', 'prepare', 'response', TeardownType.EXTRACT, TeardownType.ASSERT}
+    assert loop_thread not in threads.values()
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from httpfpt.utils.request.session_manager import session_manager
+
+
+class _CookieHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == '/login':
+            # 登录后重定向, 重定向请求需携带登录时设置的 cookie
+            self.send_response(302)
+            self.send_header('Set-Cookie', f'user={parse_qs(url.query)["user"][0]}; Path=/')
+            self.send_header('Location', '/whoami')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = (self.headers.get('Cookie') or '').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def base_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CookieHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    session_manager.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_cookies_are_isolated(base_url: str) -> None:
+    barrier = threading.Barrier(2)
+
+    def case(user: str) -> None:
+        session = session_manager.get_requests_session(False, None, True)
+        assert session.get(f'{base_url}/login?user={user}').text == f'user={user}'
+        barrier.wait(timeout=5)
+        assert session.get(f'{base_url}/whoami').text == ''
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(case, ['a', 'b']))
+    assert session_manager.get_requests_session(False, None, True).cookies.get_dict() == {}
+
+
+def test_httpx_cookies_are_isolated(base_url: str) -> None:
+    barrier = threading.Barrier(2)
+
+    def case(user: str) -> None:
+        client = session_manager.get_httpx_client(False, None, True)
+        assert client.get(f'{base_url}/login?user={user}').text == f'user={user}'
+        barrier.wait(timeout=5)
+        assert session_manager.get_httpx_client(False, None, True).get(f'{base_url}/whoami').text == ''
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(case, ['a', 'b']))
+
+
+def test_httpx_async_cookies_are_isolated(base_url: str) -> None:
+    async def login(user: str) -> str:
+        client = session_manager.get_httpx_async_client(False, None, True)
+        return (await client.get(f'{base_url}/login?user={user}')).text
+
+    async def whoami() -> str:
+        client = session_manager.get_httpx_async_client(False, None, True)
+        return (await client.get(f'{base_url}/whoami')).text
+
+    async def run() -> None:
+        try:
+            assert await asyncio.gather(login('a'), login('b')) == ['user=a', 'user=b']
+            assert await asyncio.gather(whoami(), whoami()) == ['', '']
+        finally:
+            await session_manager.aclose_all()
+
+    asyncio.run(run())
@@ -0,0 +1,44 @@
+import pathlib
+import time
+
+from collections.abc import Iterator
+
+import pytest
+
+from httpfpt.db.storage import BaseStorage, MemoryStorage, SQLiteStorage
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def storage(request: pytest.FixtureRequest, tmp_path: pathlib.Path) -> Iterator[BaseStorage]:
+    if request.param == 'memory':
+        yield MemoryStorage()
+    else:
+        storage = SQLiteStorage(str(tmp_path / 'storage.sqlite3'))
+        yield storage
+        if storage._conn is not None:
+            storage._conn.close()
+
+
+def test_values_are_stored_as_str(storage: BaseStorage) -> None:
+    storage.set_many({'httpfpt:a': 1, 'httpfpt:b': b'b', 'httpfpt:c': 'c'})
+    assert storage.get_many(['httpfpt:a', 'httpfpt:b', 'httpfpt:c', 'httpfpt:d']) == ['1', 'b', 'c', None]
+
+
+def test_expired_value_is_missing(storage: BaseStorage, monkeypatch: pytest.MonkeyPatch) -> None:
+    storage.set('httpfpt:token', 'x', ex=10)
+    assert storage.get('httpfpt:token') == 'x'
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 11)
+    assert storage.get('httpfpt:token', logging=False) is None
+    assert storage.scan_keys('httpfpt:token') == []
+
+
+def test_prefix_operations(storage: BaseStorage) -> None:
+    storage.set_many({'httpfpt:case_data:a': 'a', 'httpfpt:case_data:b': 'b', 'httpfpt:token:a': 't'})
+    assert sorted(storage.get_prefix('httpfpt:case_data')) == ['a', 'b']
+
+    storage.delete_prefix('httpfpt', exclude='httpfpt:token')
+    assert storage.scan_keys('httpfpt') == ['httpfpt:token:a']
+
+    storage.delete('httpfpt:token:a')
+    assert storage.scan_keys('httpfpt') == []
@@ -0,0 +1,36 @@
+import asyncio
+import pathlib
+
+from collections.abc import AsyncIterator
+
+from httpfpt.utils.request.upload_file import FileBody, open_upload_files
+
+
+def test_files_are_opened_at_send_time(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'a')
+    with open_upload_files({'files': {'file': str(path)}, 'data': None}) as kwargs:
+        file = kwargs['files']['file']
+        assert file.read() == b'a'
+    assert file.closed
+
+
+def test_binary_body_is_streamed(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / 'a.bin'
+    path.write_bytes(b'x' * 100000)
+    with open_upload_files({'content': FileBody(str(path)), 'headers': {'A': '1'}}) as kwargs:
+        assert kwargs['headers'] == {'A': '1', 'Content-Length': '100000'}
+        assert kwargs['content'].read() == b'x' * 100000
+
+
+def test_async_binary_body_is_streamed(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / 'a.bin'
+    path.write_bytes(b'x' * 100000)
+
+    async def read(stream: AsyncIterator[bytes]) -> list[bytes]:
+        return [chunk async for chunk in stream]
+
+    with open_upload_files({'content': FileBody(str(path))}, async_stream=True) as kwargs:
+        chunks = asyncio.run(read(kwargs['content']))
+    assert [len(chunk) for chunk in chunks] == [65536, 34464]
+    assert b''.join(chunks) == b'x' * 100000
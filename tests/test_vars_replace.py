@@ -0,0 +1,108 @@
+from collections.abc import Iterator
+
+import pytest
+
+from httpfpt.common.errors import VariableError
+from httpfpt.common.send_request import SendRequests, send_request
+from httpfpt.common.variable_cache import variable_cache
+from httpfpt.enums.request.body import BodyType
+from httpfpt.enums.request.engin import EnginType
+from httpfpt.utils.request.vars_extractor import var_extractor
+
+
+@pytest.fixture
+def variables() -> Iterator[None]:
+    variable_cache.set('t_user_id', 7)
+    variable_cache.set('t_enabled', True)
+    variable_cache.set('t_token', 'abc', tag='relate_testcase')
+    yield
+    variable_cache.delete('t_user_id')
+    variable_cache.delete('t_enabled')
+    variable_cache.delete('t_token', tag='relate_testcase')
+
+
+def test_whole_value_keeps_type(variables: None) -> None:
+    target = {
+        'body': {'id': '${t_user_id}', 'enabled': '$t_enabled', 'ids': ['${t_user_id}']},
+        'params': {'name': 'user-${t_user_id}'},
+    }
+    assert var_extractor.vars_replace(target, 'dev.env') == {
+        'body': {'id': 7, 'enabled': True, 'ids': [7]},
+        'params': {'name': 'user-7'},
+    }
+
+
+def test_env_variable(variables: None) -> None:
+    assert var_extractor.vars_replace({'url': '${host}/users/${t_user_id}'}, 'dev.env') == {
+        'url': 'https://jsonplaceholder.typicode.com/users/7'
+    }
+
+
+def test_string_target_is_stringified(variables: None) -> None:
+    assert var_extractor.vars_replace('${t_user_id}', 'dev.env') == '7'
+
+
+def test_unchanged_data_is_not_copied(variables: None) -> None:
+    static = {'a': [1, {'b': 'c'}]}
+    target = {'static': static, 'body': {'id': '${t_user_id}'}}
+    assert var_extractor.vars_replace(target, 'dev.env')['static'] is static
+    assert var_extractor.vars_replace(static, 'dev.env') is static
+
+
+def test_missing_variable(variables: None) -> None:
+    with pytest.raises(VariableError):
+        var_extractor.vars_replace({'body': '${t_missing}'}, 'dev.env')
+
+
+def test_relate_variable_is_replaced_and_cleared(variables: None) -> None:
+    target = {'headers': {'Authorization': 'Bearer ^{t_token}'}, 'body': {'token': '^t_token'}}
+    assert var_extractor.relate_vars_replace(target) == {
+        'headers': {'Authorization': 'Bearer abc'},
+        'body': {'token': 'abc'},
+    }
+    assert variable_cache.get('t_token', default=None, tag='relate_testcase') is None
+
+
+def test_str_request_fields_are_stringified(variables: None) -> None:
+    target = {'url': '${t_user_id}', 'headers': {'X-Id': '${t_user_id}', 'X-Enabled': '$t_enabled'}}
+    assert var_extractor.vars_replace(target, 'dev.env', keep_type=False) == {
+        'url': '7',
+        'headers': {'X-Id': '7', 'X-Enabled': 'True'},
+    }
+
+
+def test_relate_str_request_fields_are_stringified(variables: None) -> None:
+    variable_cache.set('t_relate_id', 8, tag='relate_testcase')
+    target = {'headers': {'X-Id': '^t_relate_id'}, 'cookies': {'id': '^{t_relate_id}'}, 'body': {'id': '^t_relate_id'}}
+    assert var_extractor.relate_vars_replace(target) == {
+        'headers': {'X-Id': '8'},
+        'cookies': {'id': '8'},
+        'body': {'id': 8},
+    }
+
+
+def test_prepare_request_keeps_headers_str(variables: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SendRequests, 'allure_dynamic_data', staticmethod(lambda parsed_data: None))
+    parsed_data = {
+        'env': 'dev.env',
+        'timeout': 10,
+        'verify': False,
+        'proxies': None,
+        'redirects': True,
+        'retry': None,
+        'http2': False,
+        'download': None,
+        'method': 'POST',
+        'url': '${host}/users/${t_user_id}',
+        'params': None,
+        'headers': {'X-Id': '${t_user_id}'},
+        'cookies': {'enabled': '$t_enabled'},
+        'body_type': BodyType.JSON,
+        'body': {'id': '${t_user_id}'},
+        'files': None,
+    }
+    _, request_data = send_request._prepare_request(parsed_data, EnginType.requests, log_data=False)
+    assert request_data['url'] == 'https://jsonplaceholder.typicode.com/users/7'
+    assert request_data['headers'] == {'X-Id': '7'}
+    assert request_data['cookies'] == {'enabled': 'True'}
+    assert request_data['json'] == {'id': 7}